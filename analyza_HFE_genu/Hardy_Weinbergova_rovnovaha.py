@@ -1,79 +1,140 @@
-import os
+import numpy as np
 import pandas as pd
 from scipy.stats import chi2
+from .kodovanie_genotypov import ziskaj_kody, matica_poctov, genotypy
+from .intervaly_spolahlivosti import intervaly_genotypov
+from .vysledky_analyz import novy_vysledok, uloz_vysledok
 
-# Pomocná mapa pre premenovanie genotypov
-genotyp_label = {
-    "wt/wt": "wt/wt (normal)",
-    "wt/mut": "wt/mut (heterozygot)",
-    "mut/mut": "mut/mut (mutant)"
-}
+# Maximálny počet buniek pomocnej matice pri exaktnom teste (obmedzuje pamäť)
+MAX_BUNIEK_EXAKTNEHO_TESTU = 4_000_000
 
-def generate_hwe_tables(df):
-    output_dir = "tabulky"
-    os.makedirs(output_dir, exist_ok=True)
+def hwe_test_matica(pocty, metoda="chi2"):
+    """HWE test pre všetky riadky matice počtov (lokusy x [wt/wt, wt/mut, mut/mut]) naraz.
 
-    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+    metoda: "chi2" (chí-kvadrát, 1 stupeň voľnosti) alebo "exaktny" (Wigginton a kol., 2005).
+    """
+    pocty = np.atleast_2d(np.asarray(pocty, dtype=np.int64))
+    n = pocty.sum(axis=1)
 
-    mutacie = {
-        "H63D": "HFE C187G (H63D) [HFE]",
-        "S65C": "HFE A193T (S65C) [HFE]",
-        "C282Y": "HFE G845A (C282Y) [HFE]"
-    }
-
-    genotyp_map = {
-        "normal": "wt/wt",
-        "heterozygot": "wt/mut",
-        "homozygot": "mut/mut",
-        "mutácia": "mut/mut",
-        "mutant": "mut/mut",
-        "patogénna": "mut/mut"
-    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = (2 * pocty[:, 0] + pocty[:, 1]) / (2 * n)
+        q = 1 - p
+        ocakavane = np.column_stack([p ** 2 * n, 2 * p * q * n, q ** 2 * n])
+        prispevky = np.where(ocakavane > 0, (pocty - ocakavane) ** 2 / ocakavane, 0.0)
+
+    chi2_stat = prispevky.sum(axis=1)
+    chi2_stat[n == 0] = np.nan
+
+    if metoda == "chi2":
+        p_hodnota = chi2.sf(chi2_stat, df=1)
+    elif metoda == "exaktny":
+        p_hodnota = hwe_exaktny_test(pocty)
+    else:
+        raise ValueError(f"Neznáma metóda HWE testu: {metoda}")
+
+    vysledok = pd.DataFrame({"n": n, "frekvencia_wt": p, "frekvencia_mut": q})
+    for i, genotyp in enumerate(genotypy):
+        vysledok[f"ocakavane_{genotyp}"] = ocakavane[:, i]
+    vysledok["chi2"] = chi2_stat
+    vysledok["p_hodnota"] = p_hodnota
+    return vysledok
+
+def hwe_exaktny_test(pocty, max_buniek=MAX_BUNIEK_EXAKTNEHO_TESTU):
+    """Exaktné p-hodnoty HWE pre všetky lokusy; lokusy sa spracúvajú po blokoch."""
+    pocty = np.atleast_2d(np.asarray(pocty, dtype=np.int64))
+    n = pocty.sum(axis=1)
+    het = pocty[:, 1]
+    vzacne = np.minimum(2 * pocty[:, 0] + het, 2 * pocty[:, 2] + het)
+
+    p_hodnoty = np.full(len(pocty), np.nan)
+    poradie = np.argsort(vzacne, kind="stable")
+    poradie = poradie[n[poradie] > 0]
+
+    # Bloky lokusov s podobným počtom vzácnych alel, aby matica nebola zbytočne široká
+    zaciatok = 0
+    while zaciatok < len(poradie):
+        koniec = zaciatok + 1
+        while koniec < len(poradie) and \
+                (koniec + 1 - zaciatok) * (vzacne[poradie[koniec]] // 2 + 1) <= max_buniek:
+            koniec += 1
+        blok = poradie[zaciatok:koniec]
+        p_hodnoty[blok] = _exaktny_test_blok(n[blok], vzacne[blok], het[blok])
+        zaciatok = koniec
+
+    return p_hodnoty
+
+def _exaktny_test_blok(n, vzacne, het):
+    # Možné počty heterozygotov h = vzacne % 2, +2, +4, ... <= vzacne
+    stlpcov = int(vzacne.max()) // 2 + 1
+    h = (vzacne % 2)[:, None] + 2 * np.arange(stlpcov)[None, :]
+    platne = h <= vzacne[:, None]
+
+    # Rekurencia P(h + 2) / P(h) = 4 * hom_vzacne * hom_caste / ((h + 1) * (h + 2))
+    hom_vzacne = (vzacne[:, None] - h) / 2
+    hom_caste = n[:, None] - h - hom_vzacne
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pomer = np.log(4 * hom_vzacne * hom_caste) - np.log((h + 1) * (h + 2))
+    log_pomer = np.where(platne[:, 1:], log_pomer[:, :-1], -np.inf)
+
+    log_p = np.zeros(h.shape)
+    log_p[:, 1:] = np.cumsum(log_pomer, axis=1)
+    log_p[~platne] = -np.inf
+    log_p -= log_p.max(axis=1, keepdims=True)
+
+    pravd = np.exp(log_p)
+    pravd /= pravd.sum(axis=1, keepdims=True)
+
+    pozorovane = pravd[np.arange(len(n)), (het - vzacne % 2) // 2]
+    # Súčet pravdepodobností tabuliek nanajvýš tak pravdepodobných ako pozorovaná
+    extremne = pravd <= pozorovane[:, None] * (1 + 1e-7)
+    return np.minimum((pravd * extremne).sum(axis=1), 1.0)
+
+def tabulka_hwe(mutacie, pocty, metoda="chi2", metoda_is="wilson"):
+    """Tabuľka výsledkov HWE testu z matice počtov genotypov (riadky v poradí mutácií)."""
+    pocty = np.asarray(pocty)
+    testy = hwe_test_matica(pocty, metoda=metoda)
+    alela_od, alela_do = intervaly_genotypov(pocty, metoda=metoda_is)["alela"]
 
     vysledky = []
 
-    for mut_nazov, stlpec in mutacie.items():
-        if stlpec not in df.columns:
+    for i, mut_nazov in enumerate(mutacie):
+        test = testy.iloc[i]
+        if test["n"] == 0:
             continue
 
-        mapped = df[stlpec].str.strip().str.lower().map(genotyp_map)
-
-        counts = mapped.value_counts()
-        obs_wtwt = counts.get("wt/wt", 0)
-        obs_wtmut = counts.get("wt/mut", 0)
-        obs_mutmut = counts.get("mut/mut", 0)
-        n = obs_wtwt + obs_wtmut + obs_mutmut
-
-        if n == 0:
-            continue
-
-        p = (2 * obs_wtwt + obs_wtmut) / (2 * n)
-        q = 1 - p
-
-        exp_wtwt = p ** 2 * n
-        exp_wtmut = 2 * p * q * n
-        exp_mutmut = q ** 2 * n
-
-        chi2_stat = ((obs_wtwt - exp_wtwt) ** 2 / exp_wtwt if exp_wtwt > 0 else 0) + \
-                    ((obs_wtmut - exp_wtmut) ** 2 / exp_wtmut if exp_wtmut > 0 else 0) + \
-                    ((obs_mutmut - exp_mutmut) ** 2 / exp_mutmut if exp_mutmut > 0 else 0)
-
-        p_value = 1 - chi2.cdf(chi2_stat, df=1)
-
-        vysledok_text = "Odchýlka" if p_value < 0.05 else "Súlad"
+        obs_wtwt, obs_wtmut, obs_mutmut = pocty[i]
+        vysledok_text = "Odchýlka" if test["p_hodnota"] < 0.05 else "Súlad"
 
         vysledky.append({
             "Mutácia": mut_nazov,
             "Pozorované wt/wt (normal)": obs_wtwt,
             "Pozorované wt/mut (heterozygot)": obs_wtmut,
             "Pozorované mut/mut (mutant)": obs_mutmut,
-            "Očakávané wt/wt (normal)": round(exp_wtwt, 2),
-            "Očakávané wt/mut (heterozygot)": round(exp_wtmut, 2),
-            "Očakávané mut/mut (mutant)": round(exp_mutmut, 2),
-            "Chi²": round(chi2_stat, 4),
-            "p-hodnota": round(p_value, 4),
+            "Očakávané wt/wt (normal)": round(test["ocakavane_wt/wt"], 2),
+            "Očakávané wt/mut (heterozygot)": round(test["ocakavane_wt/mut"], 2),
+            "Očakávané mut/mut (mutant)": round(test["ocakavane_mut/mut"], 2),
+            "Frekvencia mut alely": round(test["frekvencia_mut"], 4),
+            "95% IS dolná": round(alela_od[i], 4),
+            "95% IS horná": round(alela_do[i], 4),
+            "Chi²": round(test["chi2"], 4),
+            "p-hodnota": round(test["p_hodnota"], 4),
             "Výsledok": vysledok_text
         })
 
-    vysledky_df = pd.DataFrame(vysledky)
-    vysledky_df.to_csv(os.path.join(output_dir, "hardy_weinberg_test.csv"), index=False, sep=";", encoding="utf-8-sig")
+    return pd.DataFrame(vysledky)
+
+def generate_hwe_tables(df, kody=None, metoda="chi2", metoda_is="wilson", ulozit=True):
+    vysledok = novy_vysledok()
+
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+
+    kody = ziskaj_kody(df, kody)
+
+    mutacie = [mut for mut in ["H63D", "S65C", "C282Y"] if mut in kody.columns]
+    pocty = matica_poctov(kody[mutacie].to_numpy())
+
+    vysledok["tabulky"]["hardy_weinberg_test.csv"] = tabulka_hwe(mutacie, pocty, metoda=metoda, metoda_is=metoda_is)
+
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
@@ -0,0 +1,2 @@
+# Analýzy HFE génu. Moduly sa importujú priamo (analyza_HFE_genu.asociacny_sken ...),
+# balík zámerne nič nenačítava vopred – ťažké knižnice si berie až modul, ktorý ich potrebuje.
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import chi2
+from .kodovanie_genotypov import ziskaj_kody, genotypy, LOKUSY
+from .vysledky_analyz import novy_vysledok, obrazok, uloz_vysledok
+
+# Asociačný sken: každý kód MKCH-10 (a každá kapitola podľa písmena kódu) proti genotypu
+# každej mutácie. Všetky tabuľky genotyp x diagnóza vzniknú jedným súčinom riedkych
+# one-hot matíc, chi² a pomery šancí sa počítajú naraz nad celým poľom tabuliek.
+# Exaktné p-hodnoty pre jednotlivé kódy dáva testuj_vsetky_diagnozy (suvislost_HFE_mut).
+
+# Hranica pre FDR (Benjamini-Hochberg) a počet najvýznamnejších výsledkov v reporte
+HRANICA_FDR = 0.05
+POCET_V_REPORTE = 20
+
+# Pri veľmi veľa diagnózach sa súčin počíta po blokoch stĺpcov
+DIAGNOZ_V_DAVKE = 5000
+
+
+def _one_hot(kody, pocet):
+    """Riedka matica pacienti x kategórie; záporný kód (neznáme) nemá žiadnu jednotku."""
+    kody = np.asarray(kody)
+    riadky = np.flatnonzero(kody >= 0)
+    return sparse.csr_matrix(
+        (np.ones(len(riadky), dtype=np.int64), (riadky, kody[riadky])),
+        shape=(len(kody), pocet)
+    )
+
+
+def kody_diagnoz(diagnozy):
+    """Normalizované kódy MKCH-10 a kapitoly (písmeno kódu): (kód riadku, kódy, kapitola riadku, kapitoly)."""
+    kategorie = diagnozy.astype("category")
+    normalizovane = kategorie.cat.categories.astype(str).str.strip().str.upper()
+    kody_kategorii, unikatne = pd.factorize(normalizovane.where(normalizovane != "", None), sort=True)
+    kody_kategorii = np.append(kody_kategorii, -1)[kategorie.cat.codes.to_numpy()]
+
+    kapitoly_kodov, kapitoly = pd.factorize(pd.Index(unikatne).str[0], sort=True)
+    kapitola_riadku = np.append(kapitoly_kodov, -1)[kody_kategorii]
+    return kody_kategorii, list(unikatne), kapitola_riadku, list(kapitoly)
+
+
+def pocty_tabuliek(kody_genotypov, kody_diag, pocet_diagnoz):
+    """Počty (lokusy x genotypy x diagnózy) pacientov s danou diagnózou a počty (lokusy x genotypy) so známou diagnózou."""
+    pocet_lokusov = kody_genotypov.shape[1]
+    # Stĺpec one-hot genotypov pre lokus i a genotyp g je 3*i + g
+    lokus = np.arange(pocet_lokusov) * len(genotypy)
+    kody_stlpcov = np.where(kody_genotypov >= 0, kody_genotypov + lokus, -1)
+    riadky, stlpce = np.nonzero(kody_stlpcov >= 0)
+    one_hot_genotypov = sparse.csr_matrix(
+        (np.ones(len(riadky), dtype=np.int64), (riadky, kody_stlpcov[riadky, stlpce])),
+        shape=(len(kody_genotypov), pocet_lokusov * len(genotypy))
+    ).T.tocsr()
+
+    one_hot_diagnoz = _one_hot(kody_diag, pocet_diagnoz).tocsc()
+    s_diagnozou = np.hstack([
+        (one_hot_genotypov @ one_hot_diagnoz[:, od:od + DIAGNOZ_V_DAVKE]).toarray()
+        for od in range(0, pocet_diagnoz, DIAGNOZ_V_DAVKE)
+    ]) if pocet_diagnoz else np.zeros((pocet_lokusov * len(genotypy), 0), dtype=np.int64)
+
+    # Každý pacient so známou diagnózou je práve v jednom stĺpci, pacienti bez diagnózy sa nerátajú
+    s_diagnozou = s_diagnozou.reshape(pocet_lokusov, len(genotypy), pocet_diagnoz)
+    return s_diagnozou, s_diagnozou.sum(axis=-1)
+
+
+def chi2_pola_tabuliek(tabulky):
+    """Pearsonova chi² pre pole tabuliek (... x riadky x stĺpce) naraz; vráti (chi², df, p).
+
+    Stupne voľnosti sa rátajú len z neprázdnych riadkov a stĺpcov každej tabuľky,
+    tabuľka s menej ako 2 neprázdnymi riadkami alebo stĺpcami má p = NaN.
+    """
+    tabulky = np.asarray(tabulky, dtype=np.float64)
+    riadky = tabulky.sum(axis=-1, keepdims=True)
+    stlpce = tabulky.sum(axis=-2, keepdims=True)
+    n = tabulky.sum(axis=(-2, -1), keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ocakavane = riadky * stlpce / n
+        cleny = np.where(ocakavane > 0, (tabulky - ocakavane) ** 2 / ocakavane, 0.0)
+    statistika = cleny.sum(axis=(-2, -1))
+
+    df = (np.count_nonzero(riadky[..., 0] > 0, axis=-1) - 1) * (np.count_nonzero(stlpce[..., 0, :] > 0, axis=-1) - 1)
+    p = np.where(df > 0, chi2.sf(statistika, np.maximum(df, 1)), np.nan)
+    return statistika, df, p
+
+
+def chi2_tabuliek(s_diagnozou, spolu):
+    """Chi² pre všetky tabuľky genotyp x [má diagnózu, nemá] naraz (lokusy x diagnózy)."""
+    bez_diagnozy = spolu[:, :, None] - s_diagnozou
+    # (lokusy x genotypy x diagnózy x 2) -> (lokusy x diagnózy x genotypy x 2)
+    return chi2_pola_tabuliek(np.moveaxis(np.stack([s_diagnozou, bez_diagnozy], axis=-1), 1, 2))
+
+
+def pomer_sanci(s_diagnozou, spolu):
+    """Pomer šancí nosičov (wt/mut + mut/mut) oproti wt/wt s Haldaneovou korekciou a 95 % CI (Woolf)."""
+    a = s_diagnozou[:, 1:].sum(axis=1) + 0.5
+    b = (spolu[:, 1:].sum(axis=1)[:, None] - s_diagnozou[:, 1:].sum(axis=1)) + 0.5
+    c = s_diagnozou[:, 0] + 0.5
+    d = (spolu[:, 0][:, None] - s_diagnozou[:, 0]) + 0.5
+    log_or = np.log(a * d / (b * c))
+    se = np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+    return np.exp(log_or), np.exp(log_or - 1.96 * se), np.exp(log_or + 1.96 * se)
+
+
+def benjamini_hochberg(p):
+    """q-hodnoty podľa Benjaminiho-Hochberga; NaN p-hodnoty sa do počtu testov nerátajú."""
+    p = np.asarray(p, dtype=np.float64)
+    q = np.full(p.shape, np.nan)
+    platne = ~np.isnan(p)
+    m = platne.sum()
+    if m == 0:
+        return q
+    poradie = np.argsort(p[platne])
+    upravene = p[platne][poradie] * m / np.arange(1, m + 1)
+    upravene = np.minimum.accumulate(upravene[::-1])[::-1]
+    q_platne = np.empty(m)
+    q_platne[poradie] = np.minimum(upravene, 1.0)
+    q[platne] = q_platne
+    return q
+
+
+def asociacny_sken(df, kody=None):
+    """Všetky mutácie x všetky kódy MKCH-10 a kapitoly; tabuľka zoradená podľa p-hodnoty."""
+    kody = ziskaj_kody(df, kody)
+    mutacie = [mut for mut in LOKUSY if mut in kody.columns]
+    kody_genotypov = kody[mutacie].to_numpy()
+    kod_riadku, kody_mkch, kapitola_riadku, kapitoly = kody_diagnoz(df["diagnoza MKCH-10"])
+
+    casti = []
+    for uroven, kody_diag, popisky in [("kód", kod_riadku, kody_mkch), ("kapitola", kapitola_riadku, kapitoly)]:
+        s_diagnozou, spolu = pocty_tabuliek(kody_genotypov, kody_diag, len(popisky))
+        statistika, stupne, p = chi2_tabuliek(s_diagnozou, spolu)
+        odds, dolna, horna = pomer_sanci(s_diagnozou, spolu)
+        casti.append(pd.DataFrame({
+            "Mutácia": np.repeat(mutacie, len(popisky)),
+            "Úroveň": uroven,
+            "Diagnóza": np.tile(popisky, len(mutacie)),
+            "Počet s diagnózou": s_diagnozou.sum(axis=1).ravel(),
+            "Chi²": statistika.ravel(),
+            "df": stupne.ravel(),
+            "p-hodnota": p.ravel(),
+            "OR nosičov": odds.ravel(),
+            "OR 2.5 %": dolna.ravel(),
+            "OR 97.5 %": horna.ravel(),
+        }))
+
+    vysledky = pd.concat(casti, ignore_index=True)
+    vysledky["q-hodnota"] = benjamini_hochberg(vysledky["p-hodnota"])
+    return vysledky.sort_values(["p-hodnota", "Mutácia", "Diagnóza"], na_position="last").reset_index(drop=True)
+
+
+def volcano_graf(vysledky, hranica_fdr=HRANICA_FDR, popisat=10):
+    """Volcano graf: log2 OR nosičov oproti -log10 p, významné po FDR zvýraznené."""
+    # matplotlib sa načíta až pri kreslení, samotný sken ho nepotrebuje
+    from matplotlib.figure import Figure
+
+    testovane = vysledky.dropna(subset=["p-hodnota"])
+    x = np.log2(testovane["OR nosičov"])
+    y = -np.log10(testovane["p-hodnota"].clip(lower=1e-300))
+    vyznamne = testovane["q-hodnota"] < hranica_fdr
+
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    ax.scatter(x[~vyznamne], y[~vyznamne], s=12, color="grey", alpha=0.6, label="nevýznamné")
+    ax.scatter(x[vyznamne], y[vyznamne], s=18, color="crimson", label=f"q < {hranica_fdr}")
+    ax.axhline(-np.log10(0.05), color="black", linestyle="--", linewidth=0.8)
+    ax.axvline(0, color="black", linewidth=0.5)
+    for _, riadok in testovane.head(popisat).iterrows():
+        ax.annotate(f"{riadok['Mutácia']} {riadok['Diagnóza']}",
+                    (np.log2(riadok["OR nosičov"]), -np.log10(max(riadok["p-hodnota"], 1e-300))),
+                    fontsize=7, xytext=(3, 3), textcoords="offset points")
+    ax.set_title("Asociačný sken: mutácie HFE x diagnózy MKCH-10")
+    ax.set_xlabel("log2 pomer šancí nosičov")
+    ax.set_ylabel("-log10 p-hodnota")
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def generate_asociacny_sken(df, kody=None, dpi=100, format="png", ulozit=True):
+    from .graficka_reprezentacia import styl_grafov
+
+    vysledok = novy_vysledok()
+
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+    vysledky = asociacny_sken(df, kody)
+
+    vysledok["tabulky"]["asociacny_sken.csv"] = vysledky
+    # p- a q-hodnoty skenu bývajú veľmi malé, v reporte sa zapisujú vo vedeckom zápise
+    top = vysledky.head(POCET_V_REPORTE).round(4)
+    for col in ["p-hodnota", "q-hodnota"]:
+        top[col] = vysledky[col].head(POCET_V_REPORTE).map("{:.2e}".format)
+    vysledok["tabulky"]["asociacny_sken_top.csv"] = top
+
+    with styl_grafov():
+        vysledok["grafy"][f"asociacny_sken_volcano.{format}"] = obrazok(volcano_graf(vysledky), dpi=dpi, format=format)
+
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
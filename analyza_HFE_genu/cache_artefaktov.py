@@ -0,0 +1,113 @@
+import os
+import glob
+import json
+import pickle
+import hashlib
+import tempfile
+from functools import lru_cache
+import pandas as pd
+
+# Predvolený priečinok cache a jej maximálna veľkosť v bajtoch
+ADRESAR_CACHE = ".cache_artefaktov"
+MAX_VELKOST_CACHE = 200 * 1024 * 1024
+
+# Položka cache je zapicklovaný výsledok fázy (tabuľky, grafy v pamäti, texty)
+PRIPONA = ".pkl"
+
+
+@lru_cache(maxsize=None)
+def verzia_kodu(adresar=os.path.dirname(os.path.abspath(__file__)), dalsie_subory=()):
+    """Hash zdrojových kódov analýz – zmena kódu zneplatní všetky artefakty.
+
+    dalsie_subory: zdrojáky mimo balíka, ktoré tiež určujú výsledok (napr. zapojenie fáz).
+    """
+    h = hashlib.sha256()
+    for cesta in sorted(glob.glob(os.path.join(adresar, "*.py"))) + sorted(dalsie_subory):
+        h.update(os.path.basename(cesta).encode("utf-8"))
+        with open(cesta, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def hash_datasetu(df):
+    """Hash obsahu datasetu (názvy stĺpcov aj hodnoty) bez ohľadu na to, odkiaľ sa načítal."""
+    h = hashlib.sha256()
+    h.update(json.dumps([str(col) for col in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def kluc_artefaktu(hash_dat, faza, parametre=None, zdroje=()):
+    """Kľúč artefaktu z (obsah datasetu, fáza a jej parametre, verzia kódu).
+
+    zdroje: ďalšie zdrojové súbory volajúceho, ktorých zmena má artefakt zneplatniť.
+    """
+    popis = {
+        "dataset": hash_dat,
+        "faza": faza,
+        "parametre": parametre or {},
+        "kod": verzia_kodu(dalsie_subory=tuple(zdroje)),
+    }
+    return hashlib.sha256(json.dumps(popis, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def obnov(kluc, adresar_cache=ADRESAR_CACHE):
+    """Výsledok fázy z cache; None, ak v cache nie je."""
+    cesta = os.path.join(adresar_cache, kluc + PRIPONA)
+    try:
+        with open(cesta, "rb") as f:
+            vysledok = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+
+    # Čas posledného použitia pre LRU (položku mohol medzitým zmazať upratovanie iného behu)
+    try:
+        os.utime(cesta)
+    except FileNotFoundError:
+        pass
+    return vysledok
+
+
+def uloz(kluc, vysledok, adresar_cache=ADRESAR_CACHE, max_velkost=MAX_VELKOST_CACHE):
+    """Uloží výsledok fázy do cache pod daným kľúčom a uprace najstaršie položky."""
+    os.makedirs(adresar_cache, exist_ok=True)
+    cesta = os.path.join(adresar_cache, kluc + PRIPONA)
+    if os.path.exists(cesta):
+        return
+
+    # Zápis do dočasného súboru a premenovanie, aby súbežné behy nevideli polovičnú položku
+    fd, docasny = tempfile.mkstemp(dir=adresar_cache, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(vysledok, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(docasny, cesta)
+    except OSError:
+        if os.path.exists(docasny):
+            os.remove(docasny)
+        raise
+
+    uprac(adresar_cache, max_velkost)
+
+
+def uprac(adresar_cache=ADRESAR_CACHE, max_velkost=MAX_VELKOST_CACHE):
+    """Maže najdlhšie nepoužité položky, kým celková veľkosť cache neklesne pod limit."""
+    polozky = []
+    for e in os.scandir(adresar_cache):
+        if not e.name.endswith(PRIPONA):
+            continue
+        try:
+            stat = e.stat()
+        except FileNotFoundError:
+            # Položku zmazal súbežný beh
+            continue
+        polozky.append((stat.st_mtime, stat.st_size, e.path))
+
+    celkom = sum(velkost for _, velkost, _ in polozky)
+    for _, velkost, cesta in sorted(polozky):
+        if celkom <= max_velkost:
+            break
+        try:
+            os.remove(cesta)
+        except FileNotFoundError:
+            pass
+        celkom -= velkost
@@ -1,51 +1,66 @@
-import os
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from .priprava_datasetu import rok_vysetrenia
+from .vysledky_analyz import novy_vysledok, obrazok, uloz_vysledok
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-def generate_mkch10_analysis(df):
-    output_dir_tab = "tabulky"
-    output_dir_graf = "grafy"
-    os.makedirs(output_dir_tab, exist_ok=True)
-    os.makedirs(output_dir_graf, exist_ok=True)
+# Skupiny diagnóz podľa prvého písmena kódu MKCH-10
+skupiny = {
+    "K": "Gastro a pečeň",
+    "E": "Metabolické",
+    "D": "Hematológia",
+    "B": "Infekcie",
+    "C": "Novotvary",
+    "Z": "Iné zdravotné faktory"
+}
 
-    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+# Skupiny v poradí ich kódu, posledná zahŕňa ostatné aj chýbajúce diagnózy
+popisky_skupin = list(skupiny.values()) + ["Ostatné/Neznáme"]
 
-    df["mkch_skupina"] = df["diagnoza MKCH-10"].str[0].str.upper()
+def kody_skupin(diagnozy):
+    """Kód skupiny (index do popisky_skupin) pre každú diagnózu; mapujú sa len unikátne kódy MKCH-10."""
+    kategorie = diagnozy.astype("category")
+    kody_kategorii = (
+        kategorie.cat.categories.astype(str).str[0].str.upper()
+        .map({skupina: i for i, skupina in enumerate(skupiny)}).fillna(len(skupiny)).to_numpy(dtype=np.intp)
+    )
+    return np.append(kody_kategorii, len(skupiny))[kategorie.cat.codes.to_numpy()]
 
-    skupiny = {
-        "K": "Gastro a pečeň",
-        "E": "Metabolické",
-        "D": "Hematológia",
-        "B": "Infekcie",
-        "C": "Novotvary",
-        "Z": "Iné zdravotné faktory"
-    }
-    df["diag_skupina"] = df["mkch_skupina"].map(skupiny).fillna("Ostatné/Neznáme")
+def skupina_a_rok(df):
+    """Skupina diagnózy a rok vyšetrenia pre každého pacienta."""
+    diag_skupina = pd.Series(np.array(popisky_skupin, dtype=object)[kody_skupin(df["diagnoza MKCH-10"])], index=df.index)
+    return diag_skupina, rok_vysetrenia(df)
 
-    if "validovany_vysledok" in df.columns:
-        df["rok"] = pd.to_datetime(df["validovany_vysledok"], errors="coerce", dayfirst=True).dt.year
-    else:
-        df["rok"] = pd.NaT
+def generate_mkch10_analysis(df, dpi=100, format="png", ulozit=True):
+    # Kreslenie sa načíta až tu – skupiny diagnóz (kocka, dashboard) ho nepotrebujú
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    from .graficka_reprezentacia import styl_grafov
+
+    vysledok = novy_vysledok()
+
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+
+    df["mkch_skupina"] = df["diagnoza MKCH-10"].str[0].str.upper()
+    df["diag_skupina"], df["rok"] = skupina_a_rok(df)
 
     diag_vyvoj = df.groupby(["rok", "diag_skupina"]).size().reset_index(name="pocet")
     diag_vyvoj = diag_vyvoj.dropna(subset=["rok"])
 
-    # Uloženie agregácie
-    diag_vyvoj.to_csv(os.path.join(output_dir_tab, "vyvoj_skupin_diagnoz.csv"), index=False, sep=";", encoding="utf-8-sig")
+    # Agregácia
+    vysledok["tabulky"]["vyvoj_skupin_diagnoz.csv"] = diag_vyvoj
 
     # Vizualizácia
-    sns.set(style="whitegrid")
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(data=diag_vyvoj, x="rok", y="pocet", hue="diag_skupina", marker="o")
-    plt.title("Vývoj výskytu skupín diagnóz podľa rokov")
-    plt.xlabel("Rok vyšetrenia")
-    plt.ylabel("Počet pacientov")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir_graf, "vyvoj_skupin_diagnoz.png"))
-    plt.close()
+    with styl_grafov():
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        sns.lineplot(data=diag_vyvoj, x="rok", y="pocet", hue="diag_skupina", marker="o", ax=ax)
+        ax.set_title("Vývoj výskytu skupín diagnóz podľa rokov")
+        ax.set_xlabel("Rok vyšetrenia")
+        ax.set_ylabel("Počet pacientov")
+        fig.tight_layout()
+        vysledok["grafy"][f"vyvoj_skupin_diagnoz.{format}"] = obrazok(fig, dpi=dpi, format=format)
 
     # Detekcia zastaralých kódov
     zastarale_kody_info = {
@@ -71,5 +86,8 @@ def generate_mkch10_analysis(df):
             })
 
     if zastarale_records:
-        zastarale_df = pd.DataFrame(zastarale_records)
-        zastarale_df.to_csv(os.path.join(output_dir_tab, "zastarale_kody_diagnoz.csv"), index=False, sep=";", encoding="utf-8-sig")
+        vysledok["tabulky"]["zastarale_kody_diagnoz.csv"] = pd.DataFrame(zastarale_records)
+
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from .priprava_datasetu import STLPEC_ROKU, parsuj_datum, parsuj_vek
+from .kocka_agregatov import STLPCE_POHLAVIA
+
+# Index kohorty sa postaví raz pre dataset: zbalené bitmapy pre pohlavie a zoradené stĺpce
+# pre rozsahové dotazy (vek, dátum prijatia vzorky, kód MKCH-10). Výber kohorty je potom
+# len niekoľko binárnych vyhľadávaní a AND nad bitmapami, bez maskovania celého DataFrame.
+
+# Znak väčší ako čokoľvek v kóde MKCH-10 – horná hranica pri hľadaní podľa prefixu
+_KONIEC_PREFIXU = "\U0010ffff"
+
+
+def _zoradeny_stlpec(hodnoty):
+    poradie = np.argsort(hodnoty, kind="stable")
+    return {"poradie": poradie, "hodnoty": hodnoty[poradie]}
+
+
+def _bitmapa(maska):
+    return np.packbits(maska)
+
+
+def _bitmapa_rozsahu(stlpec, n, od, do, vratane_do=True):
+    """Bitmapa riadkov s hodnotou v <od, do> (resp. <od, do) pri vratane_do=False)."""
+    zaciatok = np.searchsorted(stlpec["hodnoty"], od, side="left")
+    koniec = np.searchsorted(stlpec["hodnoty"], do, side="right" if vratane_do else "left")
+    maska = np.zeros(n, dtype=bool)
+    maska[stlpec["poradie"][zaciatok:koniec]] = True
+    return _bitmapa(maska)
+
+
+def indexuj_kohortu(df):
+    """Predpočíta bitmapy a zoradené stĺpce pre dotazy nad kohortou."""
+    n = len(df)
+    index = {"n": n}
+
+    stlpec_pohlavia = next((col for col in STLPCE_POHLAVIA if col in df.columns), None)
+    pohlavie = df[stlpec_pohlavia].astype("category") if stlpec_pohlavia else pd.Series(pd.Categorical([None] * n))
+    kody_pohlavia = pohlavie.cat.codes.to_numpy()
+    index["pohlavie"] = {
+        str(popisok): _bitmapa(kody_pohlavia == i) for i, popisok in enumerate(pohlavie.cat.categories)
+    }
+
+    # Vek aj zo surových reťazcov ("59,70") v presnosti float32 ako po parsuj_vek; neplatný je NaN
+    vek = np.full(n, np.nan, dtype=np.float32)
+    if "vek" in df.columns:
+        hodnoty, platne, _ = parsuj_vek(df["vek"])
+        vek[platne] = hodnoty[platne]
+    index["vek"] = _zoradeny_stlpec(vek)
+
+    datumy = df[STLPEC_ROKU] if STLPEC_ROKU in df.columns else pd.Series(pd.NaT, index=df.index)
+    if not pd.api.types.is_datetime64_any_dtype(datumy):
+        datumy = parsuj_datum(datumy)[0]
+    index["datum"] = _zoradeny_stlpec(datumy.to_numpy(dtype="datetime64[us]"))
+
+    # Kódy MKCH-10 sa zoradia len ako unikátne hodnoty, riadky sa radia podľa poradia svojho kódu
+    kategorie = df["diagnoza MKCH-10"].astype("category")
+    normalizovane = kategorie.cat.categories.astype(str).str.strip().str.upper().to_numpy(dtype=str)
+    kody_diagnoz = np.unique(np.append(normalizovane, ""))
+    poradie_kategorii = np.searchsorted(kody_diagnoz, normalizovane)
+    poradie_riadkov = np.append(poradie_kategorii, 0)[kategorie.cat.codes.to_numpy()]
+    index["diagnoza"] = _zoradeny_stlpec(poradie_riadkov)
+    index["kody_diagnoz"] = kody_diagnoz
+    return index
+
+
+def rozsah_datumov(index):
+    """Najmenší a najväčší známy dátum prijatia vzorky (alebo None, ak dátumy chýbajú)."""
+    datumy = index["datum"]["hodnoty"]
+    zname = datumy[~np.isnat(datumy)]
+    if len(zname) == 0:
+        return None
+    return pd.Timestamp(zname[0]).date(), pd.Timestamp(zname[-1]).date()
+
+
+def vyber_kohortu(index, vek=None, pohlavie=None, prefix_diag=None, datum=None):
+    """Boolovská maska riadkov kohorty; None pri filtri znamená bez obmedzenia.
+
+    vek a datum sú dvojice (od, do) vrátane hraníc, pohlavie zoznam popiskov,
+    prefix_diag reťazec alebo zoznam prefixov kódu MKCH-10 (napr. "K7").
+    Vek sa berie v dovŕšených rokoch ako vekové skupiny kocky: do=60 zahŕňa aj vek 60,5
+    (vek < do + 1), rovnako ako skupina "60-69".
+    """
+    n = index["n"]
+    bitmapy = []
+
+    if vek is not None:
+        bitmapy.append(_bitmapa_rozsahu(index["vek"], n, np.float32(vek[0]), np.float32(vek[1] + 1), vratane_do=False))
+
+    if pohlavie is not None:
+        prazdna = np.zeros((n + 7) // 8, dtype=np.uint8)
+        bitmapy.append(np.bitwise_or.reduce([index["pohlavie"].get(str(p), prazdna) for p in pohlavie] + [prazdna]))
+
+    if prefix_diag:
+        prefixy = [prefix_diag] if isinstance(prefix_diag, str) else prefix_diag
+        kody_diagnoz = index["kody_diagnoz"]
+        bitmapy.append(np.bitwise_or.reduce([
+            _bitmapa_rozsahu(
+                index["diagnoza"], n,
+                np.searchsorted(kody_diagnoz, p.strip().upper()),
+                np.searchsorted(kody_diagnoz, p.strip().upper() + _KONIEC_PREFIXU),
+                vratane_do=False,
+            )
+            for p in prefixy
+        ]))
+
+    if datum is not None:
+        od = np.datetime64(pd.Timestamp(datum[0]), "us")
+        # Horná hranica je koniec dňa
+        do = np.datetime64(pd.Timestamp(datum[1]), "us") + np.timedelta64(1, "D")
+        bitmapy.append(_bitmapa_rozsahu(index["datum"], n, od, do, vratane_do=False))
+
+    if not bitmapy:
+        return np.ones(n, dtype=bool)
+    return np.unpackbits(np.bitwise_and.reduce(bitmapy), count=n).astype(bool)
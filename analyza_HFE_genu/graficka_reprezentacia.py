@@ -1,88 +1,116 @@
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.figure import Figure
 import seaborn as sns
+from .kodovanie_genotypov import ziskaj_kody, dekoduj
+from .kocka_agregatov import STLPCE_POHLAVIA
+from .priprava_datasetu import parsuj_vek
+from .vysledky_analyz import novy_vysledok, obrazok, uloz_vysledok
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-def generate_graphs(df):
-    # Priečinok na uloženie grafov
-    output_dir = "grafy"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    sns.set(style="whitegrid")
-
-    # Oprava preklepu v názve stĺpca
-    if "pohavie" in df.columns and "pohlavie" not in df.columns:
-        df = df.rename(columns={"pohavie": "pohlavie"})
-
-    # Mapovanie mutácií
-    mutacie = {
-        "H63D": "HFE C187G (H63D) [HFE]",
-        "S65C": "HFE A193T (S65C) [HFE]",
-        "C282Y": "HFE G845A (C282Y) [HFE]"
-    }
-
-    # Mapovanie genotypov
-    genotyp_map = {
-        "normal": "wt/wt",
-        "heterozygot": "wt/mut",
-        "homozygot": "mut/mut"
-    }
-
-    # Aplikuj mapovanie na genotypy
-    for mut_key, col_name in mutacie.items():
-        if col_name in df.columns:
-            df[mut_key] = df[col_name].str.strip().str.lower().map(genotyp_map)
-
-    # Extrakcia veku
-    df["vek"] = df["vek"].astype(str).str.replace(',', '.', regex=False).str.extract(r"(\d+\.\d+)").astype(float)
+MUTACIE = ["H63D", "S65C", "C282Y"]
+TYPY_GRAFOV = ["rozdelenie", "vek_vs_genotyp", "pohlavie_vs_genotyp", "pecen_vs_genotyp"]
+PORADIE_GENOTYPOV = ["wt/wt", "wt/mut", "mut/mut"]
 
-    # Pečeňové diagnózy
-    df["pecen_diag"] = df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"])
+# Dáta pre grafy v pracovnom procese (nastaví ich inicializátor poolu)
+_data_grafov = None
+
+@contextmanager
+def styl_grafov():
+    """Štýl grafov bez trvalej zmeny globálnych rcParams volajúceho."""
+    with matplotlib.rc_context():
+        sns.set_theme(style="whitegrid")
+        yield
+
+def _inicializuj_worker(data):
+    global _data_grafov
+    _data_grafov = data
+    sns.set_theme(style="whitegrid")
+
+def _nakresli(typ, mut, data):
+    # Figure bez pyplot – žiadny globálny stav, vykresľuje sa cez Agg
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
 
-    ### 1. Rozdelenie genotypov
-    for mut in ["H63D", "S65C", "C282Y"]:
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.countplot(x=df[mut], order=["wt/wt", "wt/mut", "mut/mut"], ax=ax)
+    if typ == "rozdelenie":
+        sns.countplot(x=data[mut], order=PORADIE_GENOTYPOV, ax=ax)
         ax.set_title(f"Rozdelenie genotypov – {mut}")
-        ax.set_xlabel("Genotyp")
         ax.set_ylabel("Počet pacientov")
-        plt.tight_layout()
-        fig.savefig(os.path.join(output_dir, f"rozdelenie_{mut}.png"))
-        plt.close(fig)
-
-    ### 2. Genotyp vs. vek
-    for mut in ["H63D", "S65C", "C282Y"]:
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.boxplot(x=df[mut], y=df["vek"], order=["wt/wt", "wt/mut", "mut/mut"], ax=ax)
+    elif typ == "vek_vs_genotyp":
+        sns.boxplot(x=data[mut], y=data["vek"], order=PORADIE_GENOTYPOV, ax=ax)
         ax.set_title(f"Vek pacientov podľa genotypu – {mut}")
-        ax.set_xlabel("Genotyp")
         ax.set_ylabel("Vek")
-        plt.tight_layout()
-        fig.savefig(os.path.join(output_dir, f"vek_vs_genotyp_{mut}.png"))
-        plt.close(fig)
-
-    ### 3. Genotyp vs. pohlavie
-    for mut in ["H63D", "S65C", "C282Y"]:
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.countplot(data=df, x=mut, hue="pohlavie", order=["wt/wt", "wt/mut", "mut/mut"], ax=ax)
+    elif typ == "pohlavie_vs_genotyp":
+        sns.countplot(data=data, x=mut, hue="pohlavie", order=PORADIE_GENOTYPOV, ax=ax)
         ax.set_title(f"Genotyp vs. Pohlavie – {mut}")
-        ax.set_xlabel("Genotyp")
         ax.set_ylabel("Počet pacientov")
         ax.legend(title="Pohlavie")
-        plt.tight_layout()
-        fig.savefig(os.path.join(output_dir, f"pohlavie_vs_genotyp_{mut}.png"))
-        plt.close(fig)
-
-    ### 4. Genotyp vs. pečeňová diagnóza
-    for mut in ["H63D", "S65C", "C282Y"]:
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.countplot(data=df, x=mut, hue="pecen_diag", order=["wt/wt", "wt/mut", "mut/mut"], ax=ax)
+    elif typ == "pecen_vs_genotyp":
+        sns.countplot(data=data, x=mut, hue="pecen_diag", order=PORADIE_GENOTYPOV, ax=ax)
         ax.set_title(f"Genotyp vs. Ochorenia pečene – {mut}")
-        ax.set_xlabel("Genotyp")
         ax.set_ylabel("Počet pacientov")
         ax.legend(title="Pečeňová diagnóza", labels=["Nie", "Áno"])
-        plt.tight_layout()
-        fig.savefig(os.path.join(output_dir, f"pecen_vs_genotyp_{mut}.png"))
-        plt.close(fig)
+    else:
+        raise ValueError(f"Neznámy typ grafu: {typ}")
+
+    ax.set_xlabel("Genotyp")
+    fig.tight_layout()
+    return fig
+
+def _vykresli_graf(typ, mut, dpi, format, data=None):
+    """Vykreslí jeden graf; vráti názov súboru, obrázok v pamäti a čas vykreslenia."""
+    if data is None:
+        data = _data_grafov
+    zaciatok = time.perf_counter()
+    nazov = f"{typ}_{mut}.{format}"
+    fig = _nakresli(typ, mut, data)
+    return nazov, obrazok(fig, dpi=dpi, format=format), time.perf_counter() - zaciatok
+
+def generate_graphs(df, kody=None, dpi=100, format="png", max_workers=None, ulozit=True):
+    """Grafy genotypov ako výsledok analýzy; "casy" obsahuje čas vykreslenia jednotlivých grafov."""
+    vysledok = novy_vysledok()
+
+    # Do grafov ide len malá tabuľka s potrebnými stĺpcami
+    kody = ziskaj_kody(df, kody)
+    data = pd.DataFrame(index=df.index)
+    for mut_key in MUTACIE:
+        if mut_key in kody.columns:
+            data[mut_key] = dekoduj(kody[mut_key])
+
+    # Vek (aj celé čísla ako "59"); neplatné hodnoty sa v grafoch vynechajú
+    vek, platne, _ = parsuj_vek(df["vek"])
+    data["vek"] = vek.where(platne)
+    # Pohlavie pod ktorýmkoľvek z používaných názvov stĺpca (aj s preklepom "pohavie")
+    stlpec_pohlavia = next((col for col in STLPCE_POHLAVIA if col in df.columns), None)
+    if stlpec_pohlavia is not None:
+        data["pohlavie"] = df[stlpec_pohlavia]
+
+    # Pečeňové diagnózy
+    data["pecen_diag"] = df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"])
+
+    typy = [typ for typ in TYPY_GRAFOV if typ != "pohlavie_vs_genotyp" or "pohlavie" in data.columns]
+    ulohy = [(typ, mut) for typ in typy for mut in MUTACIE if mut in data.columns]
+
+    if max_workers is None:
+        max_workers = min(len(ulohy), os.cpu_count() or 1)
+
+    if max_workers <= 1:
+        with styl_grafov():
+            grafy = [_vykresli_graf(typ, mut, dpi, format, data) for typ, mut in ulohy]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializuj_worker, initargs=(data,)) as executor:
+            buduce = [executor.submit(_vykresli_graf, typ, mut, dpi, format) for typ, mut in ulohy]
+            grafy = [f.result() for f in buduce]
+
+    vysledok["grafy"] = {nazov: graf for nazov, graf, _ in grafy}
+    # Časy vykreslenia jednotlivých grafov
+    vysledok["casy"] = pd.DataFrame([(nazov, cas) for nazov, _, cas in grafy], columns=["Graf", "Čas [s]"])
+
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from .kodovanie_genotypov import ziskaj_kody, genotypy, LOKUSY
+from .vysledky_analyz import novy_vysledok, uloz_vysledok
+
+# Viaclokusová analýza: genotyp pacienta vo všetkých lokusoch ako jedno číslo v trojkovej
+# sústave (prvý lokus je najvyšší rád, rovnako ako np.ravel_multi_index), haplotyp ako
+# číslo v dvojkovej sústave (alela 1 = mutovaná). Všetky kombinácie sa generujú cez
+# np.unravel_index, takže počet lokusov nie je nikde v kóde pevne daný.
+
+POCET_ALEL = 2
+
+# Zastavenie EM algoritmu
+MAX_ITERACII_EM = 1000
+TOLERANCIA_EM = 1e-10
+
+
+def zakoduj_kombinacie(kody_matica):
+    """Kód kombinácie genotypov (pacienti x lokusy -> 0..3^L-1); -1 ak je niektorý genotyp neznámy."""
+    kody_matica = np.asarray(kody_matica)
+    zname = (kody_matica >= 0).all(axis=1)
+    vysledok = np.full(len(kody_matica), -1, dtype=np.int64)
+    vysledok[zname] = np.ravel_multi_index(kody_matica[zname].T.astype(np.intp), (len(genotypy),) * kody_matica.shape[1])
+    return vysledok
+
+
+def pocty_kombinacii(kody_matica):
+    """Spoločné rozdelenie genotypov všetkých lokusov jedným bincount (dĺžka 3^L)."""
+    kody_matica = np.asarray(kody_matica)
+    kombinacie = zakoduj_kombinacie(kody_matica)
+    return np.bincount(kombinacie[kombinacie >= 0], minlength=len(genotypy) ** kody_matica.shape[1])
+
+
+def tabulka_kombinacii(pocty, mutacie):
+    """Neprázdne kombinácie genotypov s počtom a podielom, zoradené podľa počtu."""
+    pocty = np.asarray(pocty)
+    genotypy_lokusov = np.unravel_index(np.arange(len(pocty)), (len(genotypy),) * len(mutacie))
+    tab = pd.DataFrame({mut: np.array(genotypy)[g] for mut, g in zip(mutacie, genotypy_lokusov)})
+    tab["Počet"] = pocty
+    tab["Podiel (%)"] = (100 * pocty / max(pocty.sum(), 1)).round(2)
+    return tab[tab["Počet"] > 0].sort_values("Počet", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def frekvencie_alel(pocty, pocet_lokusov):
+    """Frekvencia mutovanej alely v každom lokuse z počtov kombinácií genotypov."""
+    pocty = np.asarray(pocty, dtype=np.float64)
+    genotypy_lokusov = np.array(np.unravel_index(np.arange(len(pocty)), (len(genotypy),) * pocet_lokusov))
+    return genotypy_lokusov @ pocty / (2 * pocty.sum())
+
+
+def _kompatibilne_pary(pocet_lokusov):
+    """Všetky usporiadané dvojice haplotypov (h1, h2) a kombinácia genotypov, ktorú tvoria."""
+    pocet_haplotypov = POCET_ALEL ** pocet_lokusov
+    alely = np.column_stack(np.unravel_index(np.arange(pocet_haplotypov), (POCET_ALEL,) * pocet_lokusov))
+    # Genotyp lokusu je súčet alel oboch haplotypov, každá dvojica určuje práve jednu kombináciu
+    h1, h2 = np.meshgrid(np.arange(pocet_haplotypov), np.arange(pocet_haplotypov), indexing="ij")
+    h1, h2 = h1.ravel(), h2.ravel()
+    kombinacia = np.ravel_multi_index((alely[h1] + alely[h2]).T, (len(genotypy),) * pocet_lokusov)
+    return kombinacia, h1, h2, alely
+
+
+def haplotypy_em(pocty, pocet_lokusov, max_iteracii=MAX_ITERACII_EM, tolerancia=TOLERANCIA_EM):
+    """Frekvencie haplotypov z počtov kombinácií genotypov EM algoritmom (fáza nie je známa).
+
+    Jeden krok EM je niekoľko bincount nad všetkými dvojicami haplotypov naraz.
+    Vráti (frekvencie dĺžky 2^L, počet iterácií).
+    """
+    pocty = np.asarray(pocty, dtype=np.float64)
+    kombinacia, h1, h2, alely = _kompatibilne_pary(pocet_lokusov)
+    pocet_haplotypov = len(alely)
+    if pocty.sum() == 0:
+        return np.full(pocet_haplotypov, np.nan), 0
+
+    # Dvojice pre kombinácie, ktoré sa v dátach nevyskytujú, nič neprispievajú
+    pozorovane = pocty[kombinacia] > 0
+    kombinacia, h1, h2 = kombinacia[pozorovane], h1[pozorovane], h2[pozorovane]
+    vaha = pocty[kombinacia]
+
+    # Štart z frekvencií alel za predpokladu väzbovej rovnováhy
+    podiel_mut = frekvencie_alel(pocty, pocet_lokusov)
+    frekvencie = np.prod(np.where(alely == 1, podiel_mut, 1 - podiel_mut), axis=1)
+
+    for iteracia in range(1, max_iteracii + 1):
+        p_dvojice = frekvencie[h1] * frekvencie[h2]
+        p_kombinacie = np.bincount(kombinacia, weights=p_dvojice, minlength=len(pocty))
+        aposteriorna = vaha * p_dvojice / p_kombinacie[kombinacia]
+        nove = (
+            np.bincount(h1, weights=aposteriorna, minlength=pocet_haplotypov)
+            + np.bincount(h2, weights=aposteriorna, minlength=pocet_haplotypov)
+        ) / (2 * pocty.sum())
+        zmena = np.abs(nove - frekvencie).max()
+        frekvencie = nove
+        if zmena < tolerancia:
+            break
+    return frekvencie, iteracia
+
+
+def tabulka_haplotypov(frekvencie, mutacie):
+    """Haplotypy (alela v každom lokuse) s odhadnutou frekvenciou, zoradené zostupne."""
+    alely = np.unravel_index(np.arange(len(frekvencie)), (POCET_ALEL,) * len(mutacie))
+    tab = pd.DataFrame({mut: np.array(["wt", "mut"])[a] for mut, a in zip(mutacie, alely)})
+    tab["Frekvencia"] = np.round(frekvencie, 6)
+    return tab.sort_values("Frekvencia", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def vazbova_nerovnovaha(frekvencie, mutacie):
+    """D, D' a r² pre všetky dvojice lokusov z frekvencií haplotypov (maticovo, bez cyklu cez dvojice)."""
+    alely = np.column_stack(np.unravel_index(np.arange(len(frekvencie)), (POCET_ALEL,) * len(mutacie))).astype(np.float64)
+    p = alely.T @ frekvencie
+    p_ab = alely.T @ (alely * frekvencie[:, None])
+    d = p_ab - np.outer(p, p)
+
+    q = 1 - p
+    d_max = np.where(d > 0, np.minimum(np.outer(p, q), np.outer(q, p)), np.minimum(np.outer(p, p), np.outer(q, q)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d_prime = np.where(d_max > 0, d / d_max, np.nan)
+        r2 = d ** 2 / np.outer(p * q, p * q)
+
+    i, j = np.triu_indices(len(mutacie), k=1)
+    return pd.DataFrame({
+        "Lokus A": np.array(mutacie)[i],
+        "Lokus B": np.array(mutacie)[j],
+        "D": d[i, j].round(6),
+        "D'": d_prime[i, j].round(4),
+        "r²": r2[i, j].round(6),
+    })
+
+
+def analyza_lokusov(pocty, mutacie):
+    """Kombinácie genotypov, haplotypy (EM) a väzbová nerovnováha z počtov kombinácií."""
+    frekvencie, iteracie = haplotypy_em(pocty, len(mutacie))
+    return {
+        "kombinacie": tabulka_kombinacii(pocty, mutacie),
+        "haplotypy": tabulka_haplotypov(frekvencie, mutacie),
+        "vazbova_nerovnovaha": vazbova_nerovnovaha(frekvencie, mutacie),
+        "iteracie_em": iteracie,
+    }
+
+
+def generate_haplotypy(df, kody=None, ulozit=True):
+    vysledok = novy_vysledok()
+
+    kody = ziskaj_kody(df, kody)
+    mutacie = [mut for mut in LOKUSY if mut in kody.columns]
+    lokusy = analyza_lokusov(pocty_kombinacii(kody[mutacie].to_numpy()), mutacie)
+
+    vysledok["tabulky"]["kombinacie_genotypov.csv"] = lokusy["kombinacie"]
+    vysledok["tabulky"]["haplotypy.csv"] = lokusy["haplotypy"]
+    vysledok["tabulky"]["vazbova_nerovnovaha.csv"] = lokusy["vazbova_nerovnovaha"]
+
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
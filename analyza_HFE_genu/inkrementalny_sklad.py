@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import sqlite3
+import numpy as np
+import pandas as pd
+from .priprava_datasetu import vycisti_dataset
+from .kodovanie_genotypov import zakoduj_genotypy, pocty_genotypov, genotypy
+from .Hardy_Weinbergova_rovnovaha import tabulka_hwe
+from .percentualne_ohodnotenie_mutaci import tabulka_percent, pocty_prenasacov, text_prenasacov
+from .suvislost_HFE_mut import pocty_genotyp_priznak, tabulka_z_poctov, vyhodnot_tabulku
+from .diagnozy_MKCH_10 import skupina_a_rok
+from .vysledky_analyz import novy_vysledok, uloz_vysledok
+
+# Perzistentný sklad: očistené riadky, index ID pacientov a postačujúce štatistiky
+ADRESAR_SKLADU = "sem_SSBU/sklad"
+DATASET = "dataset.csv"
+INDEX_ID = "id.sqlite"
+STATISTIKY = "statistiky.json"
+
+MUTACIE = ["H63D", "S65C", "C282Y"]
+
+
+def prazdne_statistiky():
+    return {
+        # Veľkosť dataset.csv v bajtoch, ku ktorej štatistiky patria (potvrdený stav skladu)
+        "velkost_datasetu": 0,
+        "pocet_pacientov": 0,
+        "genotypy": {mut: [0] * len(genotypy) for mut in MUTACIE},
+        "prenasaci": 0,
+        "predispozicia": 0,
+        "pecen": {mut: [[0, 0] for _ in genotypy] for mut in MUTACIE},
+        "vyvoj": {}
+    }
+
+
+def statistiky_davky(df):
+    """Postačujúce štatistiky pre jednu očistenú dávku (všetky sa dajú sčítať)."""
+    df = df.copy()
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+    kody = zakoduj_genotypy(df)
+    pecen_diag = df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"])
+
+    stat = prazdne_statistiky()
+    stat["pocet_pacientov"] = len(df)
+    for mut in MUTACIE:
+        if mut in kody.columns:
+            stat["genotypy"][mut] = pocty_genotypov(kody[mut]).tolist()
+            stat["pecen"][mut] = pocty_genotyp_priznak(kody[mut], pecen_diag).tolist()
+    if all(mut in kody.columns for mut in MUTACIE):
+        stat["prenasaci"], stat["predispozicia"] = pocty_prenasacov(kody)
+
+    diag_skupina, rok = skupina_a_rok(df)
+    vyvoj = pd.DataFrame({"rok": rok, "diag_skupina": diag_skupina}).dropna(subset=["rok"])
+    for (r, skupina), pocet in vyvoj.groupby(["rok", "diag_skupina"]).size().items():
+        stat["vyvoj"][f"{int(r)}|{skupina}"] = int(pocet)
+    return stat
+
+
+def pripocitaj(stat, delta):
+    """Pripočíta štatistiky dávky k uloženým štatistikám (na mieste)."""
+    stat["pocet_pacientov"] += delta["pocet_pacientov"]
+    stat["prenasaci"] += delta["prenasaci"]
+    stat["predispozicia"] += delta["predispozicia"]
+    for mut in MUTACIE:
+        stat["genotypy"][mut] = (np.add(stat["genotypy"][mut], delta["genotypy"][mut])).tolist()
+        stat["pecen"][mut] = (np.add(stat["pecen"][mut], delta["pecen"][mut])).tolist()
+    for kluc, pocet in delta["vyvoj"].items():
+        stat["vyvoj"][kluc] = stat["vyvoj"].get(kluc, 0) + pocet
+    return stat
+
+
+def nacitaj_statistiky(adresar=ADRESAR_SKLADU):
+    try:
+        with open(os.path.join(adresar, STATISTIKY), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return prazdne_statistiky()
+
+
+def _uloz_statistiky(stat, adresar):
+    cesta = os.path.join(adresar, STATISTIKY)
+    with open(cesta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(stat, f, ensure_ascii=False)
+    os.replace(cesta + ".tmp", cesta)
+
+
+def _otvor_index(adresar):
+    con = sqlite3.connect(os.path.join(adresar, INDEX_ID))
+    con.execute("CREATE TABLE IF NOT EXISTS pacienti (id TEXT PRIMARY KEY)")
+    return con
+
+
+def _obnov_sklad(con, stat, adresar):
+    """Vráti sklad do potvrdeného stavu po prerušenom pridávaní dávky.
+
+    Potvrdením dávky je zápis štatistík: riadky dataset.csv za zapísanou veľkosťou
+    patria nepotvrdenej dávke a odrežú sa; index ID sa podľa potreby znovu
+    zostaví z dataset.csv (prerušenie medzi zápisom štatistík a indexu).
+    """
+    dataset_cesta = os.path.join(adresar, DATASET)
+    velkost = stat.get("velkost_datasetu")
+    if velkost is not None and os.path.exists(dataset_cesta) and os.path.getsize(dataset_cesta) > velkost:
+        os.truncate(dataset_cesta, velkost)
+
+    pocet_v_indexe = con.execute("SELECT COUNT(*) FROM pacienti").fetchone()[0]
+    if pocet_v_indexe != stat["pocet_pacientov"]:
+        ids = pd.read_csv(dataset_cesta, sep=";", encoding="utf-8", usecols=["id"], dtype=str)["id"] \
+            if os.path.exists(dataset_cesta) and stat["pocet_pacientov"] > 0 else []
+        con.execute("DELETE FROM pacienti")
+        con.executemany("INSERT INTO pacienti VALUES (?)", ((i,) for i in ids))
+        con.commit()
+
+
+def _zarovnaj_na_hlavicku(nove, dataset_cesta):
+    """Stĺpce dávky v poradí hlavičky dataset.csv; iné stĺpce by súbor poškodili."""
+    if not os.path.exists(dataset_cesta) or os.path.getsize(dataset_cesta) == 0:
+        return nove
+    hlavicka = list(pd.read_csv(dataset_cesta, sep=";", encoding="utf-8", nrows=0).columns)
+    if sorted(hlavicka) != sorted(nove.columns):
+        raise ValueError(
+            f"Stĺpce dávky {list(nove.columns)} sa nezhodujú so stĺpcami skladu {hlavicka}"
+        )
+    return nove[hlavicka]
+
+
+def pridaj_davku(surova_davka, adresar=ADRESAR_SKLADU):
+    """Očistí novú dávku, pripojí nové riadky (podľa 'id') a aktualizuje štatistiky.
+
+    Cena je úmerná veľkosti dávky – história sa nenačítava, ID sa hľadajú v indexe.
+    Dávka je potvrdená zápisom štatistík; prerušené pridávanie sa pri ďalšom volaní vráti späť.
+    """
+    os.makedirs(adresar, exist_ok=True)
+
+    df = vycisti_dataset(surova_davka)
+    df = df.assign(id=df["id"].str.strip()).drop_duplicates(subset="id")
+
+    con = _otvor_index(adresar)
+    try:
+        stat = nacitaj_statistiky(adresar)
+        _obnov_sklad(con, stat, adresar)
+
+        con.execute("CREATE TEMP TABLE davka (id TEXT)")
+        con.executemany("INSERT INTO davka VALUES (?)", ((i,) for i in df["id"]))
+        existujuce = {r[0] for r in con.execute("SELECT davka.id FROM davka JOIN pacienti ON davka.id = pacienti.id")}
+        nove = df[~df["id"].isin(existujuce)]
+
+        if len(nove) > 0:
+            dataset_cesta = os.path.join(adresar, DATASET)
+            nove = _zarovnaj_na_hlavicku(nove, dataset_cesta)
+            stat = pripocitaj(stat, statistiky_davky(nove))
+
+            with open(dataset_cesta, "a", encoding="utf-8", newline="") as f:
+                nove.to_csv(f, header=f.tell() == 0, index=False, sep=";")
+                f.flush()
+                os.fsync(f.fileno())
+            stat["velkost_datasetu"] = os.path.getsize(dataset_cesta)
+            _uloz_statistiky(stat, adresar)
+            con.executemany("INSERT INTO pacienti VALUES (?)", ((i,) for i in nove["id"]))
+            con.commit()
+    finally:
+        con.close()
+
+    return {"nove": len(nove), "duplicitne": len(df) - len(nove)}
+
+
+def tabulky_zo_statistik(stat):
+    """Výsledné tabuľky (rovnaké ako z generate_* funkcií) len z uložených štatistík."""
+    pocty = np.array([stat["genotypy"][mut] for mut in MUTACIE])
+    tabulky = {
+        "hardy_weinberg_test": tabulka_hwe(MUTACIE, pocty),
+        "percenta_genotypov": tabulka_percent({mut: stat["genotypy"][mut] for mut in ["C282Y", "H63D", "S65C"]}),
+    }
+
+    summary = []
+    for mut in MUTACIE:
+        kont_tab = tabulka_z_poctov(stat["pecen"][mut], nazov=mut)
+        tabulky[f"suvislost_{mut}"] = kont_tab
+        summary.append(vyhodnot_tabulku(mut, kont_tab))
+    tabulky["vysledky_suvislosti"] = pd.DataFrame(summary)
+
+    vyvoj = [
+        {"rok": int(kluc.split("|", 1)[0]), "diag_skupina": kluc.split("|", 1)[1], "pocet": pocet}
+        for kluc, pocet in stat["vyvoj"].items()
+    ]
+    tabulky["vyvoj_skupin_diagnoz"] = pd.DataFrame(vyvoj, columns=["rok", "diag_skupina", "pocet"]) \
+        .sort_values(["rok", "diag_skupina"]).reset_index(drop=True)
+    return tabulky
+
+
+def vysledok_zo_skladu(adresar=ADRESAR_SKLADU):
+    """Výsledok analýzy (rovnaké tabuľky a text ako z generate_* funkcií) zo štatistík skladu."""
+    vysledok = novy_vysledok()
+    stat = nacitaj_statistiky(adresar)
+    for nazov, tabulka in tabulky_zo_statistik(stat).items():
+        vysledok["tabulky"][f"{nazov}.csv"] = tabulka
+    vysledok["texty"]["prenasic_predispozicia.txt"] = text_prenasacov(
+        stat["prenasaci"], stat["predispozicia"], max(stat["pocet_pacientov"], 1)
+    )
+    return vysledok
+
+
+def uloz_tabulky_zo_skladu(adresar=ADRESAR_SKLADU, adresar_vystupu="."):
+    """Zapíše tabuľky zo štatistík skladu do rovnakých súborov ako generate_* funkcie."""
+    return uloz_vysledok(vysledok_zo_skladu(adresar), adresar_vystupu)
+
+
+if __name__ == "__main__":
+    # Použitie: python -m analyza_HFE_genu.inkrementalny_sklad nova_davka.csv [dalsia_davka.csv ...]
+    for cesta in sys.argv[1:]:
+        davka = pd.read_csv(cesta, sep=";", encoding="utf-8-sig", dtype=str)
+        vysledok = pridaj_davku(davka)
+        print(f"{cesta}: {vysledok['nove']} nových, {vysledok['duplicitne']} duplicitných riadkov")
+    uloz_tabulky_zo_skladu()
@@ -0,0 +1,91 @@
+import numpy as np
+from scipy.stats import beta, norm
+
+# Intervaly spoľahlivosti pre podiely (genotypy, frekvencie alel, prenášači). Analytické
+# intervaly (Wilson, Clopper-Pearson) sú rýchla predvoľba; bootstrap ťahá všetky
+# replikácie naraz ako multinomické výbery nad počtami, nie po pacientoch.
+
+ALFA = 0.05
+POCET_BOOTSTRAP = 10_000
+METODY = ["wilson", "clopper-pearson", "bootstrap"]
+
+
+def wilson(k, n, alfa=ALFA):
+    """Wilsonov interval pre podiel k/n (vektorovo); pri n = 0 vráti NaN."""
+    k, n = np.asarray(k, dtype=np.float64), np.asarray(n, dtype=np.float64)
+    z = norm.ppf(1 - alfa / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = k / n
+        stred = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+        polomer = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+    return np.clip(stred - polomer, 0, 1), np.clip(stred + polomer, 0, 1)
+
+
+def clopper_pearson(k, n, alfa=ALFA):
+    """Exaktný Clopper-Pearsonov interval pre podiel k/n (vektorovo)."""
+    k, n = np.asarray(k, dtype=np.float64), np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        dolna = np.where(k > 0, beta.ppf(alfa / 2, k, n - k + 1), 0.0)
+        horna = np.where(k < n, beta.ppf(1 - alfa / 2, k + 1, n - k), 1.0)
+    neplatne = n <= 0
+    return np.where(neplatne, np.nan, dolna), np.where(neplatne, np.nan, horna)
+
+
+def bootstrap_poctov(pocty, pocet=POCET_BOOTSTRAP, seed=0):
+    """Bootstrap replikácie počtov: (pocet x ... x kategórie) multinomických výberov naraz.
+
+    pocty má kategórie v poslednej osi (napr. lokusy x genotypy); každý riadok sa prevzorkuje
+    so svojím n, čo je to isté ako ťahať n pacientov s vrátením.
+    """
+    pocty = np.asarray(pocty, dtype=np.int64)
+    n = pocty.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pravd = np.where(n[..., None] > 0, pocty / n[..., None], 0.0)
+    # Riadky bez pacientov ostanú nulové, multinomické rozdelenie ich nemá čím vzorkovať
+    pravd[n == 0, 0] = 1.0
+    return np.random.default_rng(seed).multinomial(n, pravd, size=(pocet, *n.shape))
+
+
+def percentilovy_interval(replikacie, alfa=ALFA):
+    """Percentilový interval z replikácií v prvej osi."""
+    return tuple(np.nanquantile(replikacie, [alfa / 2, 1 - alfa / 2], axis=0))
+
+
+def interval_podielu(k, n, metoda="wilson", alfa=ALFA, pocet_bootstrap=POCET_BOOTSTRAP, seed=0):
+    """Interval pre podiel k/n zvolenou metódou; bootstrap pre podiel je binomický výber."""
+    if metoda == "wilson":
+        return wilson(k, n, alfa)
+    if metoda == "clopper-pearson":
+        return clopper_pearson(k, n, alfa)
+    if metoda == "bootstrap":
+        k, n = np.asarray(k, dtype=np.int64), np.asarray(n, dtype=np.int64)
+        replikacie = bootstrap_poctov(np.stack([k, n - k], axis=-1), pocet_bootstrap, seed)[..., 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return percentilovy_interval(replikacie / n, alfa)
+    raise ValueError(f"Neznáma metóda intervalu spoľahlivosti: {metoda}")
+
+
+def intervaly_genotypov(pocty, metoda="wilson", alfa=ALFA, pocet_bootstrap=POCET_BOOTSTRAP, seed=0):
+    """Intervaly pre podiely genotypov (lokusy x 3) aj frekvenciu mutovanej alely (lokusy).
+
+    Vráti slovník {"genotypy": (dolná, horná), "alela": (dolná, horná)}; pri bootstrape
+    pochádzajú oba z tých istých replikácií počtov genotypov.
+    """
+    pocty = np.atleast_2d(np.asarray(pocty, dtype=np.int64))
+    n = pocty.sum(axis=1)
+    alely_mut = 2 * pocty[:, 2] + pocty[:, 1]
+
+    if metoda != "bootstrap":
+        return {
+            "genotypy": interval_podielu(pocty, n[:, None], metoda, alfa),
+            "alela": interval_podielu(alely_mut, 2 * n, metoda, alfa),
+        }
+
+    replikacie = bootstrap_poctov(pocty, pocet_bootstrap, seed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        podiely = replikacie / n[:, None]
+        alela = (2 * replikacie[..., 2] + replikacie[..., 1]) / (2 * n)
+    return {
+        "genotypy": percentilovy_interval(podiely, alfa),
+        "alela": percentilovy_interval(alela, alfa),
+    }
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from .kodovanie_genotypov import genotypy, ziskaj_kody
+from .suvislost_HFE_mut import PECENOVE_DIAGNOZY
+from .diagnozy_MKCH_10 import popisky_skupin, kody_skupin
+from .priprava_datasetu import MAX_VEK, parsuj_vek, rok_vysetrenia
+
+# Kocka počtov pacientov: genotyp troch mutácií x pohlavie x veková skupina x skupina MKCH-10
+# x pečeňová diagnóza x rok. Tabuľky a grafy dashboardu sú jej rezy a marginály.
+MUTACIE = ["H63D", "S65C", "C282Y"]
+DIMENZIE = MUTACIE + ["pohlavie", "vekova_skupina", "skupina_diag", "pecen_diag", "rok"]
+
+# Popisok pre chýbajúcu hodnotu (každá dimenzia okrem pečene a skupiny diagnóz ho má na konci)
+NEZNAME = "neznáme"
+
+# Vekové skupiny po desaťročiach, posledná končí na MAX_VEK (napr. 0-9, ..., 110-120)
+SIRKA_VEKOVEJ_SKUPINY = 10
+POCET_VEKOVYCH_SKUPIN = MAX_VEK // SIRKA_VEKOVEJ_SKUPINY
+HRANICE_VEKU = [
+    (i * SIRKA_VEKOVEJ_SKUPINY, i * SIRKA_VEKOVEJ_SKUPINY + SIRKA_VEKOVEJ_SKUPINY - 1)
+    for i in range(POCET_VEKOVYCH_SKUPIN - 1)
+] + [((POCET_VEKOVYCH_SKUPIN - 1) * SIRKA_VEKOVEJ_SKUPINY, MAX_VEK)]
+VEKOVE_SKUPINY = [f"{od}-{do}" for od, do in HRANICE_VEKU]
+
+STLPCE_POHLAVIA = ["Pohlavie", "pohlavie", "pohavie"]
+
+
+def _kody_dimenzie(hodnoty, popisky):
+    """Kódy 0..k-1 pre hodnoty z popisky, k pre chýbajúce; vráti (kódy, popisky vrátane NEZNAME)."""
+    kody = pd.Categorical(hodnoty, categories=popisky).codes.astype(np.intp)
+    kody[kody < 0] = len(popisky)
+    return kody, list(popisky) + [NEZNAME]
+
+
+def postav_kocku(df, kody=None):
+    """Jedným bincount spočíta pacientov v každej bunke kocky; vráti {"pocty", "popisky", "bunky"}.
+
+    bunky je index bunky pre každého pacienta, takže kocku pre ľubovoľnú podmnožinu
+    pacientov vytvorí kocka_pre_riadky jedným bincount bez opätovného kódovania.
+    """
+    kody = ziskaj_kody(df, kody)
+    n = len(df)
+    indexy, popisky = [], {}
+
+    for mut in MUTACIE:
+        kody_mut = kody[mut].to_numpy().astype(np.intp) if mut in kody.columns else np.full(n, -1, dtype=np.intp)
+        indexy.append(np.where(kody_mut >= 0, kody_mut, len(genotypy)))
+        popisky[mut] = list(genotypy) + [NEZNAME]
+
+    stlpec_pohlavia = next((col for col in STLPCE_POHLAVIA if col in df.columns), None)
+    pohlavie = df[stlpec_pohlavia] if stlpec_pohlavia else pd.Series(np.nan, index=df.index)
+    kody_dim, popisky["pohlavie"] = _kody_dimenzie(pohlavie, sorted(pohlavie.dropna().unique()))
+    indexy.append(kody_dim)
+
+    # Vek aj zo surových reťazcov ("59,70"); neplatný vek patrí medzi neznáme
+    vek = np.full(n, np.nan)
+    if "vek" in df.columns:
+        hodnoty, platne, _ = parsuj_vek(df["vek"])
+        vek[platne] = hodnoty[platne]
+    skupina_veku = np.clip(vek // SIRKA_VEKOVEJ_SKUPINY, 0, len(VEKOVE_SKUPINY) - 1)
+    indexy.append(np.where(np.isnan(vek), len(VEKOVE_SKUPINY), skupina_veku).astype(np.intp))
+    popisky["vekova_skupina"] = VEKOVE_SKUPINY + [NEZNAME]
+
+    indexy.append(kody_skupin(df["diagnoza MKCH-10"]))
+    popisky["skupina_diag"] = list(popisky_skupin)
+
+    indexy.append(df["diagnoza MKCH-10"].isin(PECENOVE_DIAGNOZY).to_numpy().astype(np.intp))
+    popisky["pecen_diag"] = [False, True]
+
+    rok = rok_vysetrenia(df).to_numpy(dtype="float64")
+    roky = np.unique(rok[~np.isnan(rok)])
+    indexy.append(np.where(np.isnan(rok), len(roky), np.searchsorted(roky, rok)).astype(np.intp))
+    popisky["rok"] = [int(r) for r in roky] + [NEZNAME]
+
+    tvar = tuple(len(popisky[dim]) for dim in DIMENZIE)
+    bunky = np.ravel_multi_index(indexy, tvar)
+    pocty = np.bincount(bunky, minlength=int(np.prod(tvar))).reshape(tvar)
+    return {"pocty": pocty, "popisky": popisky, "bunky": bunky}
+
+
+def kocka_pre_riadky(kocka, riadky):
+    """Kocka len pre vybraných pacientov (boolovská maska alebo indexy riadkov)."""
+    pocty = np.bincount(kocka["bunky"][riadky], minlength=kocka["pocty"].size).reshape(kocka["pocty"].shape)
+    return {"pocty": pocty, "popisky": kocka["popisky"], "bunky": kocka["bunky"][riadky]}
+
+
+def vyrez(kocka, **filtre):
+    """Rez kocky: pre každú dimenziu zoznam ponechaných popiskov (ostatné dimenzie ostávajú celé)."""
+    pocty = kocka["pocty"]
+    popisky = dict(kocka["popisky"])
+    for dim, ponechat in filtre.items():
+        ponechat = set(ponechat)
+        vyber = [i for i, p in enumerate(popisky[dim]) if p in ponechat]
+        pocty = np.take(pocty, vyber, axis=DIMENZIE.index(dim))
+        popisky[dim] = [popisky[dim][i] for i in vyber]
+    return {"pocty": pocty, "popisky": popisky, "bunky": None}
+
+
+def vekove_skupiny(od=0, do=MAX_VEK):
+    """Popisky vekových skupín, ktoré celé ležia v intervale <od, do>."""
+    return [popisok for popisok, (zaciatok, koniec) in zip(VEKOVE_SKUPINY, HRANICE_VEKU) if zaciatok >= od and koniec <= do]
+
+
+def marginal(kocka, dimenzie):
+    """Súčet cez všetky ostatné dimenzie; osi výsledku sú v poradí dimenzie."""
+    osi = [DIMENZIE.index(dim) for dim in dimenzie]
+    ostatne = tuple(i for i in range(len(DIMENZIE)) if i not in osi)
+    sucet = kocka["pocty"].sum(axis=ostatne)
+    # Po sčítaní ostanú osi v pôvodnom poradí, preusporiadajú sa podľa požiadavky
+    return np.transpose(sucet, np.argsort(np.argsort(osi)))
+
+
+def tabulka(kocka, riadky, stlpce=None, bez_neznamych=True):
+    """Marginála ako Series (jedna dimenzia) alebo DataFrame (riadky x stĺpce) s popiskami."""
+    dimenzie = [riadky] if stlpce is None else [riadky, stlpce]
+    pocty = marginal(kocka, dimenzie)
+    osi = [pd.Index(kocka["popisky"][dim], name=dim) for dim in dimenzie]
+    vysledok = pd.Series(pocty, index=osi[0]) if stlpce is None else pd.DataFrame(pocty, index=osi[0], columns=osi[1])
+    if bez_neznamych:
+        vysledok = vysledok.drop(index=NEZNAME, errors="ignore")
+        if stlpce is not None:
+            vysledok = vysledok.drop(columns=NEZNAME, errors="ignore")
+    return vysledok
+
+
+def matica_genotypov(kocka, mutacie=MUTACIE):
+    """Matica počtov (mutácie x [wt/wt, wt/mut, mut/mut]) bez neznámych genotypov."""
+    return np.array([marginal(kocka, [mut])[:len(genotypy)] for mut in mutacie])
+
+
+def kontingencna(kocka, mut):
+    """Počty 3 x 2 (genotyp x pečeňová diagnóza) pre jednu mutáciu."""
+    return marginal(kocka, [mut, "pecen_diag"])[:len(genotypy)]
+
+
+def vyvoj(kocka):
+    """Počet pacientov podľa roku a skupiny diagnóz (ako vyvoj_skupin_diagnoz.csv)."""
+    pocty = tabulka(kocka, "rok", "skupina_diag")
+    dlhy = pocty.stack().rename("pocet").reset_index().rename(columns={"skupina_diag": "diag_skupina"})
+    return dlhy[dlhy["pocet"] > 0].sort_values(["rok", "diag_skupina"]).reset_index(drop=True)
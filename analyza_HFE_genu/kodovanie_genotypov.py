@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Mutácie a časť názvu stĺpca, podľa ktorej sa stĺpec v datasete nájde
+mutacie_vzory = {
+    "H63D": "C187G",
+    "S65C": "A193T",
+    "C282Y": "G845A"
+}
+
+# Genotypy v poradí ich kódu (počet mutovaných alel)
+genotypy = ["wt/wt", "wt/mut", "mut/mut"]
+
+# Pomocná mapa pre premenovanie genotypov
+genotyp_label = {
+    "wt/wt": "wt/wt (normal)",
+    "wt/mut": "wt/mut (heterozygot)",
+    "mut/mut": "mut/mut (mutant)"
+}
+
+# Mapovanie výsledkov laboratória na kód genotypu, neznáma hodnota má kód -1
+genotyp_map = {
+    "normal": 0,
+    "heterozygot": 1,
+    "homozygot": 2,
+    "mutácia": 2,
+    "mutant": 2,
+    "patogénna": 2
+}
+
+NEZNAMY = -1
+
+# Každý lokus zaberá v maske 3 bity (wt/wt, wt/mut, mut/mut), neznámy genotyp nemá žiadny bit.
+# Poloha lokusu v maske je pevná podľa poradia v mutacie_vzory (aj keď niektorý stĺpec chýba).
+BITOV_NA_LOKUS = 3
+LOKUSY = list(mutacie_vzory)
+
+
+def najdi_stlpce_mutacii(stlpce):
+    """Vráti slovník mutácia -> názov stĺpca (funguje pred aj po normalizácii názvov)."""
+    najdene = {}
+    for mut, vzor in mutacie_vzory.items():
+        zhoda = [col for col in stlpce if vzor in col and "HFE" in col]
+        if zhoda:
+            najdene[mut] = zhoda[0]
+    return najdene
+
+
+def zakoduj_stlpec(series):
+    """Zakóduje stĺpec s výsledkami na int8 kódy 0/1/2, neznáme hodnoty na -1."""
+    # Normalizujú sa len unikátne hodnoty, nie každá bunka zvlášť
+    kategorie = series.astype("category")
+    kody_kategorii = (
+        kategorie.cat.categories.astype(str).str.strip().str.lower()
+        .map(genotyp_map).fillna(NEZNAMY).to_numpy(dtype=np.int8)
+    )
+    kody = kategorie.cat.codes.to_numpy()
+    vysledok = np.full(len(kody), NEZNAMY, dtype=np.int8)
+    platne = kody >= 0
+    vysledok[platne] = kody_kategorii[kody[platne]]
+    return vysledok
+
+
+def bitova_maska(kody):
+    """Zbalí int8 kódy (pacienti x lokusy) do jednej bitovej masky na pacienta."""
+    kody = np.asarray(kody)
+    maska = np.zeros(kody.shape[0], dtype=np.uint32)
+    for i in range(kody.shape[1]):
+        stlpec = kody[:, i]
+        znamy = stlpec >= 0
+        bity = np.left_shift(np.uint32(1), (BITOV_NA_LOKUS * i + stlpec[znamy]).astype(np.uint32))
+        maska[znamy] |= bity
+    return maska
+
+
+def zakoduj_genotypy(df):
+    """Zakóduje všetky HFE stĺpce naraz; vráti int8 stĺpce podľa mutácií a stĺpec 'maska'."""
+    stlpce = najdi_stlpce_mutacii(df.columns)
+    kody = pd.DataFrame(
+        {mut: zakoduj_stlpec(df[col]) for mut, col in stlpce.items()},
+        index=df.index
+    )
+    vsetky_lokusy = np.column_stack([
+        kody[mut].to_numpy() if mut in kody.columns else np.full(len(df), NEZNAMY, dtype=np.int8)
+        for mut in LOKUSY
+    ])
+    kody["maska"] = bitova_maska(vsetky_lokusy)
+    return kody
+
+
+def ziskaj_kody(df, kody=None):
+    """Použije už zakódované genotypy, ak sú k dispozícii, inak ich zakóduje z datasetu."""
+    if kody is not None:
+        return kody
+    return zakoduj_genotypy(df)
+
+
+def pocty_genotypov(kody):
+    """Počty wt/wt, wt/mut, mut/mut (neznáme genotypy sa nerátajú)."""
+    kody = np.asarray(kody)
+    return np.bincount(kody[kody >= 0], minlength=len(genotypy))
+
+
+def dekoduj(kody, popisky=None):
+    """Prevedie kódy späť na Categorical s textovými genotypmi (napr. pre grafy)."""
+    kategorie = genotypy if popisky is None else [popisky.get(g, g) for g in genotypy]
+    return pd.Categorical.from_codes(np.asarray(kody), categories=kategorie)
+
+
+def matica_poctov(kody_matica):
+    """Matica počtov (lokusy x 3) z matice kódov (pacienti x lokusy) jedným bincount."""
+    kody_matica = np.asarray(kody_matica)
+    pocet_lokusov = kody_matica.shape[1]
+    lokus = np.broadcast_to(np.arange(pocet_lokusov), kody_matica.shape)
+    znamy = kody_matica >= 0
+    return np.bincount(
+        lokus[znamy] * len(genotypy) + kody_matica[znamy],
+        minlength=pocet_lokusov * len(genotypy)
+    ).reshape(pocet_lokusov, len(genotypy))
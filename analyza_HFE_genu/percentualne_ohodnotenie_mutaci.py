@@ -1,70 +1,66 @@
-import os
+import numpy as np
 import pandas as pd
+from .kodovanie_genotypov import ziskaj_kody, pocty_genotypov, genotypy, genotyp_label
+from .pravidla_genotypov import pocty_pravidiel, PREDVOLENE_PRAVIDLA
+from .intervaly_spolahlivosti import intervaly_genotypov, wilson
+from .vysledky_analyz import novy_vysledok, uloz_vysledok
 
-def generate_percenta_genotypov(df):
-    output_dir = "tabulky"
-    os.makedirs(output_dir, exist_ok=True)
-
-    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
-
-    mutacie = {
-        "C282Y": "HFE G845A (C282Y) [HFE]",
-        "H63D": "HFE C187G (H63D) [HFE]",
-        "S65C": "HFE A193T (S65C) [HFE]"
-    }
-
-    genotyp_map = {
-        "normal": "wt/wt",
-        "heterozygot": "wt/mut",
-        "homozygot": "mut/mut"
-    }
-
-    genotyp_label = {
-        "wt/wt": "wt/wt (normal)",
-        "wt/mut": "wt/mut (heterozygot)",
-        "mut/mut": "mut/mut (mutant)"
-    }
-
+def tabulka_percent(pocty_podla_mutacie, metoda_is="wilson"):
+    """Tabuľka percent genotypov s 95 % intervalom spoľahlivosti zo slovníka mutácia -> [wt/wt, wt/mut, mut/mut]."""
     vysledky = []
+    if not pocty_podla_mutacie:
+        return pd.DataFrame(vysledky)
 
-    for mut_key, stlpec in mutacie.items():
-        if stlpec not in df.columns:
-            continue
-
-        genotypy = df[stlpec].str.strip().str.lower().map(genotyp_map)
+    dolne, horne = intervaly_genotypov(np.array(list(pocty_podla_mutacie.values())), metoda=metoda_is)["genotypy"]
 
-        total = len(genotypy.dropna())
-        counts = genotypy.value_counts()
+    for i, (mut_key, counts) in enumerate(pocty_podla_mutacie.items()):
+        total = sum(counts)
 
-        for genotyp, pocet in counts.items():
+        for j, (genotyp, pocet) in enumerate(zip(genotypy, counts)):
+            if pocet == 0:
+                continue
             vysledky.append({
                 "Mutácia": mut_key,
                 "Genotyp": genotyp_label.get(genotyp, genotyp),
                 "Počet pacientov": pocet,
-                "Percento": round((pocet / total) * 100, 2)
+                "Percento": round((pocet / total) * 100, 2),
+                "95% IS dolná (%)": round(dolne[i, j] * 100, 2),
+                "95% IS horná (%)": round(horne[i, j] * 100, 2)
             })
 
-    # Prenášači a predispozícia - celkové sumárne hodnoty
-    pren = df[
-        (df[mutacie["C282Y"]].str.strip().str.lower() == "heterozygot") |
-        (df[mutacie["H63D"]].str.strip().str.lower() == "heterozygot") |
-        (df[mutacie["S65C"]].str.strip().str.lower() == "heterozygot")
-    ]
-    predispozicia = df[
-        (df[mutacie["C282Y"]].str.strip().str.lower() == "homozygot") |
-        (
-            (df[mutacie["C282Y"]].str.strip().str.lower() == "heterozygot") &
-            (df[mutacie["H63D"]].str.strip().str.lower() == "heterozygot")
-        )
-    ]
+    return pd.DataFrame(vysledky)
+
+def pocty_prenasacov(kody):
+    """Počet prenášačov (aspoň jeden heterozygot) a pacientov s genetickou predispozíciou na HH."""
+    pocty = pocty_pravidiel(kody["maska"], PREDVOLENE_PRAVIDLA)
+    return int(pocty["Prenášači"]), int(pocty["Predispozícia HH"])
+
+def text_prenasacov(pren, predispozicia, n):
+    (pren_od, pred_od), (pren_do, pred_do) = wilson([pren, predispozicia], n)
+    return (
+        f"Prenášači: {pren} pacientov ({(pren/n)*100:.2f}%, 95% IS {pren_od*100:.2f}–{pren_do*100:.2f}%)\n"
+        f"Genetická predispozícia na HH: {predispozicia} pacientov ({(predispozicia/n)*100:.2f}%, "
+        f"95% IS {pred_od*100:.2f}–{pred_do*100:.2f}%)\n"
+    )
 
-    vysledky_df = pd.DataFrame(vysledky)
+def generate_percenta_genotypov(df, kody=None, metoda_is="wilson", ulozit=True):
+    vysledok = novy_vysledok()
+
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
 
-    # Exportuj tabuľku
-    vysledky_df.to_csv(os.path.join(output_dir, "percenta_genotypov.csv"), index=False, sep=";", encoding="utf-8-sig")
+    kody = ziskaj_kody(df, kody)
+
+    pocty = {
+        mut_key: pocty_genotypov(kody[mut_key])
+        for mut_key in ["C282Y", "H63D", "S65C"]
+        if mut_key in kody.columns
+    }
+    vysledok["tabulky"]["percenta_genotypov.csv"] = tabulka_percent(pocty, metoda_is=metoda_is)
+
+    # Prenášači a predispozícia - celkové sumárne hodnoty
+    pren, predispozicia = pocty_prenasacov(kody)
+    vysledok["texty"]["prenasic_predispozicia.txt"] = text_prenasacov(pren, predispozicia, len(df))
 
-    # Ulož sumár info o prenášačoch a predispozícii
-    summary_path = os.path.join(output_dir, "prenasic_predispozicia.txt")
-    with open(summary_path, "w", encoding="utf-8") as f:
-        f.write(f"Prenášači: {len(pren)} pacientov ({(len(pren)/len(df))*100:.2f}%)\n")
-        f.write(f"Genetická predispozícia na HH: {len(predispozicia)} pacientov ({(len(predispozicia)/len(df))*100:.2f}%)\n")
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from .kodovanie_genotypov import genotypy, LOKUSY, BITOV_NA_LOKUS
+
+# Rizikové kategórie genotypov zadané ako dáta v disjunktívnej normálnej forme:
+# pravidlo platí, ak platí aspoň jedna konjunkcia; konjunkcia {mutácia: [povolené genotypy]}
+# platí, ak má pacient pri každej uvedenej mutácii niektorý z povolených genotypov.
+PREDVOLENE_PRAVIDLA = {
+    "Prenášači": [
+        {"C282Y": ["wt/mut"]},
+        {"H63D": ["wt/mut"]},
+        {"S65C": ["wt/mut"]},
+    ],
+    "Predispozícia HH": [
+        {"C282Y": ["mut/mut"]},
+        {"C282Y": ["wt/mut"], "H63D": ["wt/mut"]},
+    ],
+    "C282Y/S65C zložený heterozygot": [
+        {"C282Y": ["wt/mut"], "S65C": ["wt/mut"]},
+    ],
+    "H63D homozygot": [
+        {"H63D": ["mut/mut"]},
+    ],
+}
+
+# Všetky možné hodnoty masky (3 lokusy x 3 bity = 512)
+POCET_MASIEK = 1 << (BITOV_NA_LOKUS * len(LOKUSY))
+
+
+def _bity_konjunkcie(konjunkcia):
+    """Pre každý lokus konjunkcie zoznam bitov povolených genotypov."""
+    bity = []
+    for mut, povolene in konjunkcia.items():
+        if mut not in LOKUSY:
+            raise ValueError(f"Neznáma mutácia v pravidle: {mut}")
+        nezname = set(povolene) - set(genotypy)
+        if nezname:
+            raise ValueError(f"Neznámy genotyp v pravidle pre {mut}: {sorted(nezname)}")
+        bity.append([BITOV_NA_LOKUS * LOKUSY.index(mut) + genotypy.index(g) for g in povolene])
+    return bity
+
+
+def skompiluj_pravidla(pravidla=PREDVOLENE_PRAVIDLA):
+    """Pravdivostná tabuľka (POCET_MASIEK x počet pravidiel) – pravidlá sa vyhodnotia pre každú masku raz."""
+    masky = np.arange(POCET_MASIEK, dtype=np.uint32)
+    bity_masiek = ((masky[:, None] >> np.arange(BITOV_NA_LOKUS * len(LOKUSY), dtype=np.uint32)) & 1).astype(bool)
+
+    tabulka = np.zeros((POCET_MASIEK, len(pravidla)), dtype=bool)
+    for j, konjunkcie in enumerate(pravidla.values()):
+        for konjunkcia in konjunkcie:
+            plati = np.ones(POCET_MASIEK, dtype=bool)
+            for bity_lokusu in _bity_konjunkcie(konjunkcia):
+                plati &= bity_masiek[:, bity_lokusu].any(axis=1)
+            tabulka[:, j] |= plati
+    return tabulka
+
+
+def vyhodnot_pravidla(maska, pravidla=PREDVOLENE_PRAVIDLA):
+    """Príslušnosť každého pacienta ku všetkým pravidlám naraz (pacienti x pravidlá)."""
+    index = maska.index if isinstance(maska, pd.Series) else None
+    return pd.DataFrame(skompiluj_pravidla(pravidla)[np.asarray(maska)], columns=list(pravidla), index=index)
+
+
+def pocty_pravidiel(maska, pravidla=PREDVOLENE_PRAVIDLA):
+    """Počet pacientov pre každé pravidlo z jedného bincount cez hodnoty masky."""
+    pocty_masiek = np.bincount(np.asarray(maska), minlength=POCET_MASIEK)
+    return pd.Series(pocty_masiek @ skompiluj_pravidla(pravidla), index=list(pravidla))
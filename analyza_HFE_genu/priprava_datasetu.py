@@ -1,28 +1,172 @@
+import time
+import argparse
+from contextlib import ExitStack
+import numpy as np
 import pandas as pd
 
-# Nacitanie CSV so spravnym oddelovacom
-df = pd.read_csv("SSBU25_dataset.csv", sep=";", engine="python", encoding="utf-8-sig", dtype=str)
+# Pocet riadkov suroveho exportu spracovanych naraz
+VELKOST_CASTI = 100_000
 
-# Spojenie datum+cas pre 'validovany vysledok' a 'prijem vzorky'
-df['validovany_vysledok'] = df.iloc[:, 1].fillna('') + ' ' + df.iloc[:, 2].fillna('')
-df['prijem_vzorky'] = df.iloc[:, 3].fillna('') + ' ' + df.iloc[:, 4].fillna('')
+# Najvyssi prijatelny vek pacienta
+MAX_VEK = 120
 
-# Vymazanie povodnych datum+cas stlpcov + unnamed stlpce
-stlpce_na_mazanie = ['Unnamed: 3', 'Unnamed: 5'] + [col for col in df.columns if "Unnamed" in col]
-df = df.drop(columns=stlpce_na_mazanie + [df.columns[1], df.columns[2], df.columns[3], df.columns[4]])
+def parsuj_vek(vek):
+    """Vektorizovane parsovanie veku ("59,70", "59.7" aj "59").
 
-# Odstranenie riadkov s prazdnym ID
-df = df[df['id'].notna() & (df['id'].str.strip() != "")]
+    Vrati (vek ako float32, maska platnych hodnot, tabulka odmietnutych hodnot s dovodom).
+    """
+    if pd.api.types.is_numeric_dtype(vek):
+        cisla = vek.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        # Roznych hodnot veku je malo - parsuju sa len unikatne a rozvinu sa cez kody
+        kody, unikatne = pd.factorize(vek)
+        text = pd.Series(unikatne, dtype="string").str.strip().str.replace(",", ".", regex=False)
+        hodnoty = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        cisla = np.append(hodnoty, np.nan)[kody]
 
-# Validacia veku: kontrolujeme len prvu zlozku (napr. 59 z "59,70")
-def is_valid_age(age_str):
-    try:
-        age_main = float(age_str.split(',')[0].replace(',', '.'))
-        return age_main <= 120
-    except:
-        return False
+    ciselne = np.isfinite(cisla)
+    platne = ciselne & (cisla >= 0) & (cisla <= MAX_VEK)
 
-df = df[df['vek'].apply(is_valid_age)]
+    odmietnute = pd.DataFrame({
+        "vek": vek[~platne],
+        "dovod": np.where(ciselne[~platne], "mimo rozsahu", "nečíselný"),
+    })
+    return pd.Series(cisla.astype("float32"), index=vek.index, name=vek.name), platne, odmietnute
 
-# Ulozenie upraveneho datasetu
-df.to_csv("SSBU25_dataset_cleaned.csv", index=False, sep=";", encoding="utf-8-sig")
+# Datumove stlpce a ich formaty v poradi, v akom sa skusaju (export laboratoria, nas CSV, ISO)
+STLPCE_DATUMOV = ["validovany_vysledok", "prijem_vzorky"]
+FORMATY_DATUMOV = ["%d.%m.%Y", "%H:%M %d.%m.%Y", "%d.%m.%Y %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]
+
+# Jediny stlpec, z ktoreho sa berie rok pre vsetky casove zoskupenia (report aj aplikacia)
+STLPEC_ROKU = "prijem_vzorky"
+
+def parsuj_datum(hodnoty):
+    """Parsovanie datumov s explicitnymi formatmi; co nesedi na ziadny, ide cez vseobecny parser.
+
+    Vrati (datetime64, pocet chybajucich hodnot, pocet neparsovatelnych hodnot).
+    """
+    # Parsuju sa len unikatne retazce, vysledok sa rozvinie cez kody (ako pri veku)
+    kody, unikatne = pd.factorize(hodnoty)
+    text = pd.Series(unikatne, dtype="string").str.strip()
+    text = text.mask(text == "")
+    datumy = pd.Series(pd.NaT, index=text.index, dtype="datetime64[us]")
+
+    zostava = text.notna().to_numpy(copy=True)
+    for format in FORMATY_DATUMOV:
+        if not zostava.any():
+            break
+        datumy[zostava] = pd.to_datetime(text[zostava], format=format, errors="coerce")
+        zostava = zostava & datumy.isna().to_numpy()
+
+    if zostava.any():
+        datumy[zostava] = pd.to_datetime(text[zostava], dayfirst=True, format="mixed", errors="coerce")
+
+    # Kod -1 (NaN) ukazuje na pridanu chybajucu hodnotu na konci
+    hodnoty_datumov = np.append(datumy.to_numpy(), np.datetime64("NaT", "us"))[kody]
+    chyba_text = np.append(text.isna().to_numpy(), True)[kody]
+    chybajuce = int(chyba_text.sum())
+    neparsovatelne = int(np.isnat(hodnoty_datumov).sum()) - chybajuce
+    return pd.Series(hodnoty_datumov, index=hodnoty.index, name=hodnoty.name), chybajuce, neparsovatelne
+
+def normalizuj_datumy(df, hlasenie=None):
+    """Datumove stlpce ako datetime64 (parsuju sa raz); do hlasenia doplni pocty chyb."""
+    chyby = []
+    for col in STLPCE_DATUMOV:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            datumy, chybajuce, neparsovatelne = parsuj_datum(df[col])
+            df = df.assign(**{col: datumy})
+            chyby.append({"stlpec": col, "chybajuce": chybajuce, "neparsovatelne": neparsovatelne})
+    if hlasenie is not None:
+        hlasenie["datumy"] = pd.DataFrame(chyby, columns=["stlpec", "chybajuce", "neparsovatelne"]).set_index("stlpec")
+    return df
+
+def rok_vysetrenia(df):
+    """Rok vysetrenia pre kazdy riadok z jedineho stlpca STLPEC_ROKU."""
+    if STLPEC_ROKU not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    datumy = df[STLPEC_ROKU]
+    if not pd.api.types.is_datetime64_any_dtype(datumy):
+        datumy = parsuj_datum(datumy)[0]
+    return datumy.dt.year
+
+def vycisti_dataset(df, hlasenie=None):
+    """Ocisti surovy export laboratoria (nacitany ako stringy).
+
+    Ak je zadany slovnik hlasenie, doplni sa don tabulka odmietnutych hodnot veku
+    a pocty neparsovatelnych datumov.
+    """
+    # Spojenie datum+cas pre 'validovany vysledok' a 'prijem vzorky'
+    df['validovany_vysledok'] = df.iloc[:, 1].fillna('') + ' ' + df.iloc[:, 2].fillna('')
+    df['prijem_vzorky'] = df.iloc[:, 3].fillna('') + ' ' + df.iloc[:, 4].fillna('')
+
+    # Vymazanie povodnych datum+cas stlpcov + unnamed stlpce
+    stlpce_na_mazanie = ['Unnamed: 3', 'Unnamed: 5'] + [col for col in df.columns if "Unnamed" in col]
+    df = df.drop(columns=stlpce_na_mazanie + [df.columns[1], df.columns[2], df.columns[3], df.columns[4]], errors="ignore")
+
+    # Odstranenie riadkov s prazdnym ID
+    df = df[df['id'].notna() & (df['id'].str.strip() != "")]
+
+    # Vek sa parsuje raz, dalej sa pracuje s ciselnym stlpcom
+    vek, platne, odmietnute = parsuj_vek(df['vek'])
+    df = df.assign(vek=vek)[platne]
+    if hlasenie is not None:
+        hlasenie["vek"] = odmietnute
+
+    # Datumy sa parsuju raz, dalej sa pracuje s datetime64
+    return normalizuj_datumy(df, hlasenie)
+
+def vycisti_po_castiach(vstup, vystup, velkost_casti=VELKOST_CASTI, aj_csv=False):
+    """Ocisti surovy export po castiach a priebezne ich zapisuje do vystupu.
+
+    Pamat je ohranicena velkostou jednej casti, nie velkostou celeho exportu.
+    """
+    # ulozisko_datasetu pouziva parsovanie z tohto modulu, preto import az tu
+    from .ulozisko_datasetu import zapisovac_datasetu
+
+    zaciatok = time.perf_counter()
+    precitane = zapisane = 0
+    odmietnute = []
+    chyby_datumov = []
+
+    citac = pd.read_csv(vstup, sep=";", engine="c", encoding="utf-8-sig", dtype=str, chunksize=velkost_casti)
+    with ExitStack() as zasobnik:
+        zapisovace = [zasobnik.enter_context(zapisovac_datasetu(vystup))]
+        if aj_csv and not vystup.endswith(".csv"):
+            zapisovace.append(zasobnik.enter_context(zapisovac_datasetu(vystup.rsplit(".", 1)[0] + ".csv")))
+
+        for cast in citac:
+            precitane += len(cast)
+            hlasenie = {}
+            cast = vycisti_dataset(cast, hlasenie)
+            odmietnute.append(hlasenie["vek"])
+            chyby_datumov.append(hlasenie["datumy"])
+            for zapis in zapisovace:
+                zapis(cast)
+            zapisane += len(cast)
+
+    trvanie = time.perf_counter() - zaciatok
+    return {
+        "precitane": precitane,
+        "zapisane": zapisane,
+        "odmietnuty_vek": pd.concat(odmietnute) if odmietnute else pd.DataFrame(columns=["vek", "dovod"]),
+        "chyby_datumov": pd.concat(chyby_datumov).groupby(level=0).sum() if chyby_datumov else pd.DataFrame(),
+        "sekundy": trvanie,
+        "riadkov_za_sekundu": precitane / trvanie if trvanie > 0 else float("inf"),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Očistenie surového exportu laboratória po častiach.")
+    parser.add_argument("vstup", nargs="?", default="SSBU25_dataset.csv")
+    parser.add_argument("vystup", nargs="?", default="SSBU25_dataset_cleaned.parquet")
+    parser.add_argument("--csv", action="store_true", help="uložiť aj CSV kópiu")
+    parser.add_argument("--velkost-casti", type=int, default=VELKOST_CASTI)
+    args = parser.parse_args()
+
+    # Ulozenie upraveneho datasetu (otypovany Parquet, s prepinacom --csv aj CSV)
+    vysledok = vycisti_po_castiach(args.vstup, args.vystup, args.velkost_casti, aj_csv=args.csv)
+    print(f"{vysledok['precitane']} riadkov načítaných, {vysledok['zapisane']} zapísaných "
+          f"za {vysledok['sekundy']:.2f} s ({vysledok['riadkov_za_sekundu']:.0f} riadkov/s)")
+    for dovod, pocet in vysledok["odmietnuty_vek"]["dovod"].value_counts().items():
+        print(f"Odmietnutý vek ({dovod}): {pocet} riadkov")
+    for stlpec, chyby in vysledok["chyby_datumov"].iterrows():
+        print(f"{stlpec}: {chyby['chybajuce']} chýbajúcich, {chyby['neparsovatelne']} neparsovateľných dátumov")
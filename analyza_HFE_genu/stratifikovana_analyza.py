@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, norm
+from .kodovanie_genotypov import genotypy
+from .Hardy_Weinbergova_rovnovaha import hwe_test_matica
+from .intervaly_spolahlivosti import intervaly_genotypov, wilson
+from .asociacny_sken import chi2_pola_tabuliek
+from .kocka_agregatov import MUTACIE, NEZNAME, postav_kocku, marginal
+from .vysledky_analyz import novy_vysledok, uloz_vysledok
+
+# Stratifikovaná analýza: tabuľky genotyp x pečeňová diagnóza pre každé strátum sú jedna
+# marginála kocky (kocka vznikla jedným bincount), všetky štatistiky sa rátajú naraz
+# nad poľom strát. Strátum s neznámou hodnotou niektorého stratifikátora sa vynechá.
+STRATIFIKATORY = {
+    "vekova_skupina": "Veková skupina",
+    "pohlavie": "Pohlavie",
+    "rok": "Rok",
+}
+
+# Stratifikátory v reporte
+PREDVOLENE_STRATIFIKATORY = ["vekova_skupina", "pohlavie"]
+
+
+def tabulky_strat(kocka, stratifikatory, mut):
+    """Tabuľky genotyp x pečeňová diagnóza (strátá x 3 x 2) a MultiIndex strát."""
+    pocty = marginal(kocka, list(stratifikatory) + [mut, "pecen_diag"])
+    urovne = []
+    for os_, dim in enumerate(stratifikatory):
+        zname = [i for i, p in enumerate(kocka["popisky"][dim]) if p != NEZNAME]
+        pocty = np.take(pocty, zname, axis=os_)
+        urovne.append([kocka["popisky"][dim][i] for i in zname])
+    pocty = pocty[..., :len(genotypy), :]
+    index = pd.MultiIndex.from_product(urovne, names=[STRATIFIKATORY.get(dim, dim) for dim in stratifikatory])
+    return pocty.reshape(-1, len(genotypy), 2), index
+
+
+def _styri_polia(tabulky):
+    """Nosiči (wt/mut + mut/mut) vs. wt/wt x pečeň áno/nie: (a, b, c, d) pre každé strátum."""
+    a = tabulky[:, 1:, 1].sum(axis=1)  # nosič s pečeňovou diagnózou
+    b = tabulky[:, 1:, 0].sum(axis=1)  # nosič bez diagnózy
+    c = tabulky[:, 0, 1]               # wt/wt s diagnózou
+    d = tabulky[:, 0, 0]               # wt/wt bez diagnózy
+    return a.astype(np.float64), b.astype(np.float64), c.astype(np.float64), d.astype(np.float64)
+
+
+def cochran_mantel_haenszel(tabulky):
+    """CMH test (s korekciou na spojitosť) a Mantel-Haenszelov spoločný OR s 95 % IS (Robins-Breslow-Greenland)."""
+    a, b, c, d = _styri_polia(tabulky)
+    n = a + b + c + d
+    platne = n > 1
+    a, b, c, d, n = a[platne], b[platne], c[platne], d[platne], n[platne]
+
+    ocakavane = (a + b) * (a + c) / n
+    rozptyl = (a + b) * (c + d) * (a + c) * (b + d) / (n ** 2 * (n - 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistika = (abs(a.sum() - ocakavane.sum()) - 0.5) ** 2 / rozptyl.sum()
+
+        r, s = a * d / n, b * c / n
+        p_, q_ = (a + d) / n, (b + c) / n
+        odds = r.sum() / s.sum()
+        var_log = (
+            (p_ * r).sum() / (2 * r.sum() ** 2)
+            + (p_ * s + q_ * r).sum() / (2 * r.sum() * s.sum())
+            + (q_ * s).sum() / (2 * s.sum() ** 2)
+        )
+    polomer = norm.ppf(0.975) * np.sqrt(var_log)
+    return {
+        "Počet strát": int(platne.sum()),
+        "CMH chi²": statistika,
+        "p-hodnota": chi2.sf(statistika, 1) if np.isfinite(statistika) else np.nan,
+        "MH OR": odds,
+        "OR 2.5 %": np.exp(np.log(odds) - polomer),
+        "OR 97.5 %": np.exp(np.log(odds) + polomer),
+    }
+
+
+def stratifikovana_analyza(kocka, stratifikatory=PREDVOLENE_STRATIFIKATORY, mutacie=MUTACIE, metoda_is="wilson"):
+    """HWE, frekvencie alel, prenášači a súvislosť s pečeňou pre každé strátum a mutáciu + CMH.
+
+    Vráti {"strata": tabuľka strát x mutácie, "cmh": tabuľka spojená cez strátá pre každú mutáciu}.
+    """
+    casti, cmh = [], []
+    for mut in mutacie:
+        tabulky, index = tabulky_strat(kocka, stratifikatory, mut)
+        genotypy_strat = tabulky.sum(axis=2)
+        n = genotypy_strat.sum(axis=1)
+
+        hwe = hwe_test_matica(genotypy_strat)
+        alela_od, alela_do = intervaly_genotypov(genotypy_strat, metoda=metoda_is)["alela"]
+        prenasaci = genotypy_strat[:, 1:].sum(axis=1)
+        prenasaci_od, prenasaci_do = wilson(prenasaci, n)
+        chi2_pecen, _, p_pecen = chi2_pola_tabuliek(tabulky)
+        a, b, c, d = _styri_polia(tabulky)
+
+        tab = pd.DataFrame({
+            "Mutácia": mut,
+            "n": n,
+            **{f"Počet {g}": genotypy_strat[:, i] for i, g in enumerate(genotypy)},
+            "Frekvencia mut alely": hwe["frekvencia_mut"].to_numpy(),
+            "Alela 95% IS dolná": alela_od,
+            "Alela 95% IS horná": alela_do,
+            "HWE chi²": hwe["chi2"].to_numpy(),
+            "HWE p-hodnota": hwe["p_hodnota"].to_numpy(),
+            "Prenášači (%)": 100 * prenasaci / np.where(n > 0, n, np.nan),
+            "Prenášači 95% IS dolná (%)": 100 * prenasaci_od,
+            "Prenášači 95% IS horná (%)": 100 * prenasaci_do,
+            "Pečeň chi²": chi2_pecen,
+            "Pečeň p-hodnota": p_pecen,
+            "OR nosičov (pečeň)": (a + 0.5) * (d + 0.5) / ((b + 0.5) * (c + 0.5)),
+        }, index=index)
+        casti.append(tab[n > 0])
+        cmh.append({"Mutácia": mut, **cochran_mantel_haenszel(tabulky)})
+
+    strata = pd.concat(casti).reset_index() if casti else pd.DataFrame()
+    return {"strata": strata.round(4), "cmh": pd.DataFrame(cmh).round(4)}
+
+
+def generate_stratifikovana_analyza(df, kody=None, stratifikatory=PREDVOLENE_STRATIFIKATORY, ulozit=True):
+    vysledok = novy_vysledok()
+
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+    stratifikacia = stratifikovana_analyza(postav_kocku(df, kody), stratifikatory)
+
+    vysledok["tabulky"]["stratifikacia.csv"] = stratifikacia["strata"]
+    vysledok["tabulky"]["stratifikacia_cmh.csv"] = stratifikacia["cmh"]
+
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
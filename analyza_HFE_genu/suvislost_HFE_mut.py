@@ -1,82 +1,254 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from scipy.stats import chi2_contingency
+from .kodovanie_genotypov import ziskaj_kody, najdi_stlpce_mutacii, genotypy, genotyp_label
+from .vysledky_analyz import novy_vysledok, uloz_vysledok
 
-def generate_suvislosti_diag(df):
-    output_dir = "tabulky"
-    os.makedirs(output_dir, exist_ok=True)
+# Kódy MKCH-10 považované za pečeňové ochorenie
+PECENOVE_DIAGNOZY = ["K76.0", "K75.9"]
 
-    # Vyčistenie názvov stĺpcov
-    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+# Chi² aproximácia sa použije len vtedy, keď sú všetky očakávané počty aspoň takéto
+MIN_OCAKAVANA = 5
 
-    # Príprava pečeňových diagnóz
-    df["pecen_diag"] = df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"])
+# Počet permutácií Monte-Carlo testu, strop enumerácie exaktného testu a veľkosť dávky permutácií
+POCET_PERMUTACII = 10_000
+MAX_TABULIEK_EXAKTNEHO = 2_000_000
+PRVKOV_V_DAVKE = 2_000_000
 
-    # Mapovanie mutácií
-    mutacie = {
-        "H63D": "HFE C187G (H63D) [HFE]",
-        "S65C": "HFE A193T (S65C) [HFE]",
-        "C282Y": "HFE G845A (C282Y) [HFE]"
-    }
+def pocty_genotyp_priznak(kody_mutacie, priznak):
+    """Matica počtov 3 x 2 (genotyp x príznak) z int8 kódov jedným bincount."""
+    kody_mutacie = np.asarray(kody_mutacie)
+    priznak = np.asarray(priznak, dtype=bool)
+    znamy = kody_mutacie >= 0
+    return np.bincount(
+        kody_mutacie[znamy] * 2 + priznak[znamy],
+        minlength=len(genotypy) * 2
+    ).reshape(len(genotypy), 2)
 
-    # Mapovanie genotypov
-    genotyp_map = {
-        "normal": "wt/wt",
-        "heterozygot": "wt/mut",
-        "homozygot": "mut/mut",
-        "mutácia": "mut/mut",
-        "mutant": "mut/mut",
-        "patogénna": "mut/mut"
-    }
+def kontingencna_tabulka(kody_mutacie, priznak, nazov=None):
+    """Tabuľka genotyp x príznak z int8 kódov; prázdne riadky a stĺpce sa vynechajú."""
+    return tabulka_z_poctov(pocty_genotyp_priznak(kody_mutacie, priznak), nazov)
+
+def tabulka_z_poctov(pocty, nazov=None):
+    """Tabuľka genotyp x pečeňová diagnóza z matice počtov 3 x 2."""
+    tab = pd.DataFrame(
+        np.asarray(pocty),
+        index=pd.Index([genotyp_label[g] for g in genotypy], name=nazov),
+        columns=pd.Index([False, True], name="pecen_diag")
+    )
+    return tab.loc[tab.sum(axis=1) > 0, tab.sum(axis=0) > 0]
+
+def _bez_prazdnych(pocty):
+    """Vynechá riadky a stĺpce s nulovým súčtom."""
+    pocty = np.asarray(pocty, dtype=np.int64)
+    return pocty[pocty.sum(axis=1) > 0][:, pocty.sum(axis=0) > 0]
+
+def _log_kombinacie(n, k):
+    from scipy.special import gammaln
+    return gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1)
+
+def freeman_halton(pocty, max_tabuliek=MAX_TABULIEK_EXAKTNEHO):
+    """Exaktný Freeman-Haltonov test pre tabuľku r x 2 enumeráciou všetkých tabuliek s rovnakými okrajmi.
+
+    Prvý stĺpec má pri pevných okrajoch multivariátne hypergeometrické rozdelenie. Vráti None,
+    ak by tabuliek bolo viac ako max_tabuliek.
+    """
+    pocty = np.asarray(pocty, dtype=np.int64)
+    # Posledný riadok je daný okrajom, preto sa enumerujú všetky okrem najväčšieho
+    pocty = pocty[np.argsort(pocty.sum(axis=1), kind="stable")]
+    riadky = pocty.sum(axis=1)
+    prvy_stlpec = pocty[:, 0].sum()
+    zvysok_riadkov = np.cumsum(riadky[::-1])[::-1][1:]
+
+    # Postupne po riadkoch: čiastočné súčty prvého stĺpca a log-pravdepodobnosti
+    sucty = np.zeros(1, dtype=np.int64)
+    log_p = np.zeros(1)
+    for r, zvysok in zip(riadky[:-1], zvysok_riadkov):
+        if len(sucty) * (r + 1) > max_tabuliek:
+            return None
+        x = np.arange(r + 1)
+        sucty = (sucty[:, None] + x).ravel()
+        log_p = (log_p[:, None] + _log_kombinacie(r, x)).ravel()
+        mozne = (sucty <= prvy_stlpec) & (sucty + zvysok >= prvy_stlpec)
+        sucty, log_p = sucty[mozne], log_p[mozne]
+    log_p += _log_kombinacie(riadky[-1], prvy_stlpec - sucty)
+
+    log_p -= _log_kombinacie(riadky.sum(), prvy_stlpec)
+    log_p_pozorovanej = _log_kombinacie(riadky, pocty[:, 0]).sum() - _log_kombinacie(riadky.sum(), prvy_stlpec)
+    # Tolerancia proti zaokrúhľovacím chybám pri rovnako pravdepodobných tabuľkách
+    return float(min(1.0, np.exp(log_p[log_p <= log_p_pozorovanej + 1e-7]).sum()))
+
+def _chi2_statistika(tabulky, ocakavane):
+    return ((tabulky - ocakavane) ** 2 / ocakavane).sum(axis=(-2, -1))
+
+def permutacny_test(pocty, pocet_permutacii=POCET_PERMUTACII, seed=0):
+    """Monte-Carlo permutačný test (Pearsonova chi² ako štatistika) po dávkach v NumPy.
+
+    Permutácia stĺpcových značiek pri pevných okrajoch; pre r x 2 sa permutované tabuľky
+    ťahajú priamo z multivariátneho hypergeometrického rozdelenia (to isté rozdelenie, bez
+    permutovania jednotlivých pacientov). Každá dávka má vlastný podstrom seedu, takže
+    výsledok nezávisí od toho, ako sa dávky rozdelia medzi procesy.
+    """
+    pocty = np.asarray(pocty, dtype=np.int64)
+    riadky, stlpce = pocty.sum(axis=1), pocty.sum(axis=0)
+    n = pocty.sum()
+    ocakavane = np.outer(riadky, stlpce) / n
+    statistika = _chi2_statistika(pocty, ocakavane)
+
+    velkost_davky = max(1, min(pocet_permutacii, PRVKOV_V_DAVKE // max(n, 1)))
+    pocet_davok = -(-pocet_permutacii // velkost_davky)
+    # seed je číslo alebo SeedSequence (testuj_tabulky dáva každej tabuľke vlastný podstrom)
+    koren = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seedy = koren.spawn(pocet_davok)
+
+    # Značky pacientov zoradené podľa riadku a stĺpca (permutuje sa len stĺpcová značka)
+    if pocty.shape[1] > 2:
+        riadok_pacienta = np.repeat(np.arange(len(riadky)), riadky)
+        stlpec_pacienta = np.repeat(np.arange(len(stlpce)), stlpce)
+
+    aspon_taka = 0
+    for i, seed_davky in enumerate(seedy):
+        rng = np.random.default_rng(seed_davky)
+        b = min(velkost_davky, pocet_permutacii - i * velkost_davky)
+        if pocty.shape[1] == 2:
+            prvy = rng.multivariate_hypergeometric(riadky, stlpce[0], size=b)
+            tabulky = np.stack([prvy, riadky - prvy], axis=-1)
+        else:
+            permutovane = rng.permuted(np.broadcast_to(stlpec_pacienta, (b, n)), axis=1)
+            bunky = np.arange(b)[:, None] * pocty.size + riadok_pacienta * pocty.shape[1] + permutovane
+            tabulky = np.bincount(bunky.ravel(), minlength=b * pocty.size).reshape(b, *pocty.shape)
+        aspon_taka += int((_chi2_statistika(tabulky, ocakavane) >= statistika - 1e-9).sum())
+
+    return (aspon_taka + 1) / (pocet_permutacii + 1)
+
+def otestuj(pocty, pocet_permutacii=POCET_PERMUTACII, seed=0):
+    """Vyberie test podľa tabuľky: chi², Fisher (2 x 2), Freeman-Halton (r x 2) alebo permutačný.
+
+    Chi² sa použije len ak sú všetky očakávané počty aspoň MIN_OCAKAVANA. Vráti (test, chi2, p).
+    """
+    # scipy.stats sa načíta až pri teste – PECENOVE_DIAGNOZY z tohto modulu berie aj kocka
+    from scipy.stats import chi2_contingency, fisher_exact
+
+    pocty = _bez_prazdnych(pocty)
+    if min(pocty.shape) < 2:
+        return None, np.nan, np.nan
+
+    chi2_stat, pval, dof, expected = chi2_contingency(pocty)
+    if expected.min() >= MIN_OCAKAVANA:
+        return "Chi²", chi2_stat, pval
 
-    genotyp_label = {
-        "wt/wt": "wt/wt (normal)",
-        "wt/mut": "wt/mut (heterozygot)",
-        "mut/mut": "mut/mut (mutant)"
+    if pocty.shape == (2, 2):
+        return "Fisher", chi2_stat, fisher_exact(pocty)[1]
+
+    r_x_2 = pocty if pocty.shape[1] == 2 else pocty.T if pocty.shape[0] == 2 else None
+    if r_x_2 is not None:
+        pval = freeman_halton(r_x_2)
+        if pval is not None:
+            return "Freeman-Halton", chi2_stat, pval
+
+    return "Permutačný", chi2_stat, permutacny_test(pocty, pocet_permutacii, seed)
+
+def vyhodnot_tabulku(mut_key, kont_tab, pocet_permutacii=POCET_PERMUTACII, seed=0):
+    """Test súvislosti pre jednu kontingenčnú tabuľku (riadok sumárnej tabuľky)."""
+    test, chi2_stat, pval = otestuj(kont_tab, pocet_permutacii, seed)
+    if test is None:
+        return {
+            "Mutácia": mut_key,
+            "Test": "–",
+            "Chi²": "–",
+            "p-hodnota": "–",
+            "Významnosť": "Tabuľka má menej ako 2 riadky alebo stĺpce"
+        }
+
+    return {
+        "Mutácia": mut_key,
+        "Test": test,
+        "Chi²": round(chi2_stat, 4),
+        "p-hodnota": round(pval, 4),
+        "Významnosť": "významné" if pval < 0.05 else "nevýznamné"
     }
 
+def _otestuj_ulohu(uloha):
+    pocty, pocet_permutacii, seed = uloha
+    return otestuj(pocty, pocet_permutacii, seed)
+
+def testuj_tabulky(tabulky, pocet_permutacii=POCET_PERMUTACII, seed=0, max_workers=None):
+    """Otestuje veľa tabuliek naraz, rozdelených medzi procesy; každá tabuľka má vlastný seed."""
+    seedy = np.random.SeedSequence(seed).spawn(len(tabulky))
+    ulohy = [(pocty, pocet_permutacii, s) for pocty, s in zip(tabulky, seedy)]
+
+    if max_workers is None:
+        max_workers = min(len(ulohy), os.cpu_count() or 1)
+    if max_workers <= 1:
+        return [_otestuj_ulohu(u) for u in ulohy]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_otestuj_ulohu, ulohy, chunksize=max(1, len(ulohy) // (4 * max_workers))))
+
+def testuj_vsetky_diagnozy(df, kody=None, pocet_permutacii=POCET_PERMUTACII, seed=0, max_workers=None):
+    """Súvislosť genotypu každej mutácie s každým kódom MKCH-10 (diagnóza áno/nie)."""
+    kody = ziskaj_kody(df, kody)
+    diagnozy = df["diagnoza MKCH-10"].astype("category")
+    kody_diagnoz = diagnozy.cat.codes.to_numpy()
+    pocet_diagnoz = len(diagnozy.cat.categories)
+
+    popisy, tabulky = [], []
+    for mut_key in ["H63D", "S65C", "C282Y"]:
+        if mut_key not in kody.columns:
+            continue
+        kody_mut = kody[mut_key].to_numpy().astype(np.intp)
+        znamy = (kody_mut >= 0) & (kody_diagnoz >= 0)
+        # Počty genotyp x diagnóza jedným bincount, tabuľka pre diagnózu je [má ju, nemá ju]
+        pocty = np.bincount(
+            kody_mut[znamy] * pocet_diagnoz + kody_diagnoz[znamy],
+            minlength=len(genotypy) * pocet_diagnoz
+        ).reshape(len(genotypy), pocet_diagnoz)
+        spolu = pocty.sum(axis=1)
+        for j, diagnoza in enumerate(diagnozy.cat.categories):
+            popisy.append((mut_key, diagnoza, int(pocty[:, j].sum())))
+            tabulky.append(np.column_stack([spolu - pocty[:, j], pocty[:, j]]))
+
+    vysledky = testuj_tabulky(tabulky, pocet_permutacii, seed, max_workers)
+    return pd.DataFrame(
+        [(*popis, test or "–", chi2_stat, pval) for popis, (test, chi2_stat, pval) in zip(popisy, vysledky)],
+        columns=["Mutácia", "Diagnóza", "Počet s diagnózou", "Test", "Chi²", "p-hodnota"]
+    ).sort_values(["p-hodnota", "Mutácia", "Diagnóza"]).reset_index(drop=True)
+
+def generate_suvislosti_diag(df, kody=None, ulozit=True, vsetky_diagnozy=False, max_workers=None):
+    """Súvislosť genotypov s pečeňovými diagnózami.
+
+    vsetky_diagnozy: navyše otestuje každú mutáciu proti každému kódu MKCH-10
+    (testuj_vsetky_diagnozy, pri riedkych tabuľkách Monte-Carlo v max_workers procesoch).
+    """
+    vysledok = novy_vysledok()
+
+    # Vyčistenie názvov stĺpcov
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+
+    # Príprava pečeňových diagnóz
+    df["pecen_diag"] = df["diagnoza MKCH-10"].isin(PECENOVE_DIAGNOZY)
+
+    kody = ziskaj_kody(df, kody)
+    mutacie = najdi_stlpce_mutacii(df.columns)
+
     summary = []
 
-    for mut_key, col_name in mutacie.items():
-        if col_name not in df.columns:
+    for mut_key in ["H63D", "S65C", "C282Y"]:
+        if mut_key not in kody.columns:
             continue
 
-        # Prevod na štandardné genotypy
-        genotypy = df[col_name].str.strip().str.lower().map(genotyp_map)
-
-        kont_tab = pd.crosstab(genotypy, df["pecen_diag"])
-        kont_tab.index = kont_tab.index.map(lambda x: genotyp_label.get(x, x))
-        kont_path = os.path.join(output_dir, f"suvislost_{mut_key}.csv")
-        kont_tab.to_csv(kont_path, sep=";", encoding="utf-8-sig")
-
-        pval = None
-        chi2_stat = None
-
-        if kont_tab.shape in [(3, 2), (2, 2)]:
-            try:
-                chi2_stat, pval, dof, expected = chi2_contingency(kont_tab)
-                vyznamnost = "významné" if pval < 0.05 else "nevýznamné"
-                summary.append({
-                    "Mutácia": mut_key,
-                    "Chi²": round(chi2_stat, 4),
-                    "p-hodnota": round(pval, 4),
-                    "Významnosť": vyznamnost
-                })
-            except ValueError as e:
-                summary.append({
-                    "Mutácia": mut_key,
-                    "Chi²": "–",
-                    "p-hodnota": "–",
-                    "Významnosť": f"Chyba: {str(e)}"
-                })
-        else:
-            summary.append({
-                "Mutácia": mut_key,
-                "Chi²": "–",
-                "p-hodnota": "–",
-                "Významnosť": "Neštandardný tvar tabuľky"
-            })
-
-    # Uloženie sumárnej tabuľky
-    summary_df = pd.DataFrame(summary)
-    summary_df.to_csv(os.path.join(output_dir, "vysledky_suvislosti.csv"), sep=";", index=False, encoding="utf-8-sig")
+        kont_tab = kontingencna_tabulka(kody[mut_key], df["pecen_diag"], nazov=mutacie[mut_key])
+        vysledok["tabulky"][f"suvislost_{mut_key}.csv"] = kont_tab
+
+        summary.append(vyhodnot_tabulku(mut_key, kont_tab))
+
+    # Sumárna tabuľka
+    vysledok["tabulky"]["vysledky_suvislosti.csv"] = pd.DataFrame(summary)
+
+    # Všetky mutácie x všetky kódy MKCH-10 len na požiadanie; report má na to asociačný sken
+    if vsetky_diagnozy:
+        vysledok["tabulky"]["suvislost_vsetky_diagnozy.csv"] = testuj_vsetky_diagnozy(df, kody, max_workers=max_workers)
+
+    if ulozit:
+        uloz_vysledok(vysledok)
+    return vysledok
@@ -0,0 +1,156 @@
+import os
+import importlib.util
+from contextlib import contextmanager
+import pandas as pd
+from .priprava_datasetu import parsuj_vek, normalizuj_datumy
+
+# Očistený dataset v stĺpcovom formáte (CSV zostáva ako voliteľný export)
+CESTA_DATASETU = "sem_SSBU/SSBU25_dataset_cleaned.parquet"
+
+STLPCE_KATEGORII = ["pohavie", "Pohlavie", "diagnoza MKCH-10"]
+
+# Dátumy v CSV v rovnakom tvare ako v exporte laboratória (deň pred mesiacom)
+FORMAT_DATUMU_CSV = "%d.%m.%Y %H:%M"
+
+PRIPONY = {".parquet": "parquet", ".feather": "feather", ".csv": "csv"}
+
+
+def ma_pyarrow():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def typuj_dataset(df):
+    """Typy stĺpcov pre stĺpcové uloženie: vek float32, dátumy datetime64, kategórie pre genotypy, pohlavie a MKCH-10."""
+    df = df.copy()
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+
+    if "vek" in df.columns:
+        df["vek"] = parsuj_vek(df["vek"])[0]
+
+    df = normalizuj_datumy(df)
+
+    for col in df.columns:
+        if col in STLPCE_KATEGORII or "[HFE]" in col:
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def format_suboru(cesta):
+    _, pripona = os.path.splitext(cesta)
+    if pripona not in PRIPONY:
+        raise ValueError(f"Nepodporovaný formát datasetu: {cesta}")
+    return PRIPONY[pripona]
+
+
+def uloz_dataset(df, cesta=CESTA_DATASETU, aj_csv=False):
+    """Uloží otypovaný dataset (Parquet/Feather podľa prípony, bez pyarrow ako CSV); vráti skutočnú cestu."""
+    adresar = os.path.dirname(cesta)
+    if adresar:
+        os.makedirs(adresar, exist_ok=True)
+
+    format = format_suboru(cesta)
+    if format != "csv" and not ma_pyarrow():
+        format = "csv"
+        cesta = os.path.splitext(cesta)[0] + ".csv"
+
+    df = typuj_dataset(df)
+    if format == "parquet":
+        df.to_parquet(cesta, index=False)
+    elif format == "feather":
+        df.reset_index(drop=True).to_feather(cesta)
+    else:
+        df.to_csv(cesta, index=False, sep=";", encoding="utf-8-sig", date_format=FORMAT_DATUMU_CSV)
+
+    if aj_csv and format != "csv":
+        df.to_csv(os.path.splitext(cesta)[0] + ".csv", index=False, sep=";", encoding="utf-8-sig",
+                  date_format=FORMAT_DATUMU_CSV)
+    return cesta
+
+
+@contextmanager
+def zapisovac_datasetu(cesta):
+    """Postupný zápis datasetu po častiach; vracia funkciu zapis(df_cast).
+
+    Všetky časti sa zapíšu s rovnakou schémou ako prvá (kategórie ako slovník
+    s int32 indexmi), takže rôzne kategórie v jednotlivých častiach nevadia.
+    Stĺpec, ktorý je v prvej časti celý prázdny (typ null), sa zapíše ako text.
+    Feather (Arrow IPC súbor) nedovolí meniť slovník medzi dávkami, preto sa
+    kategórie zapíšu ako text a otypujú sa až pri načítaní.
+    """
+    adresar = os.path.dirname(cesta)
+    if adresar:
+        os.makedirs(adresar, exist_ok=True)
+    format = format_suboru(cesta)
+    if format != "csv" and not ma_pyarrow():
+        format = "csv"
+        cesta = os.path.splitext(cesta)[0] + ".csv"
+    stav = {"writer": None, "schema": None, "hlavicka": True}
+
+    def zapis(cast):
+        cast = typuj_dataset(cast)
+        if format == "csv":
+            cast.to_csv(cesta, mode="w" if stav["hlavicka"] else "a", header=stav["hlavicka"],
+                        index=False, sep=";", encoding="utf-8-sig" if stav["hlavicka"] else "utf-8",
+                        date_format=FORMAT_DATUMU_CSV)
+            stav["hlavicka"] = False
+            return
+
+        import pyarrow as pa
+        tabulka = pa.Table.from_pandas(cast, preserve_index=False)
+        if stav["schema"] is None:
+            kategoria = pa.dictionary(pa.int32(), pa.string()) if format == "parquet" else pa.string()
+            def typ_stlpca(typ):
+                if pa.types.is_dictionary(typ):
+                    return kategoria
+                return pa.string() if pa.types.is_null(typ) else typ
+            stav["schema"] = pa.schema([pa.field(f.name, typ_stlpca(f.type)) for f in tabulka.schema])
+            if format == "parquet":
+                import pyarrow.parquet as pq
+                stav["writer"] = pq.ParquetWriter(cesta, stav["schema"])
+            else:
+                stav["writer"] = pa.ipc.new_file(cesta, stav["schema"])
+        stav["writer"].write_table(tabulka.cast(stav["schema"]))
+
+    try:
+        yield zapis
+    finally:
+        if stav["writer"] is not None:
+            stav["writer"].close()
+
+
+def najdi_dataset(cesta=CESTA_DATASETU):
+    """Vráti existujúcu cestu k datasetu – stĺpcový súbor, inak CSV s rovnakým názvom."""
+    if os.path.exists(cesta):
+        return cesta
+    csv_cesta = os.path.splitext(cesta)[0] + ".csv"
+    if os.path.exists(csv_cesta):
+        return csv_cesta
+    raise FileNotFoundError(cesta)
+
+
+def stlpce_datasetu(cesta=CESTA_DATASETU):
+    """Názvy stĺpcov bez načítania dát."""
+    cesta = najdi_dataset(cesta)
+    format = format_suboru(cesta)
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(cesta).names)
+    if format == "feather":
+        import pyarrow.feather as feather
+        return list(feather.read_table(cesta, memory_map=True).schema.names)
+    stlpce = pd.read_csv(cesta, sep=";", encoding="utf-8-sig", nrows=0).columns
+    return list(stlpce.str.replace('\n', ' ', regex=False).str.strip())
+
+
+def nacitaj_dataset(cesta=CESTA_DATASETU, stlpce=None):
+    """Načíta len potrebné stĺpce (stlpce=None načíta všetky); CSV sa otypuje rovnako ako stĺpcový súbor."""
+    cesta = najdi_dataset(cesta)
+    format = format_suboru(cesta)
+    if format == "parquet":
+        return pd.read_parquet(cesta, columns=stlpce)
+    if format == "feather":
+        return typuj_dataset(pd.read_feather(cesta, columns=stlpce))
+
+    df = typuj_dataset(pd.read_csv(cesta, sep=";", encoding="utf-8-sig", dtype=str))
+    return df if stlpce is None else df[[col for col in stlpce if col in df.columns]]
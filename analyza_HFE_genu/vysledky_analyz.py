@@ -0,0 +1,60 @@
+import io
+import os
+
+# Výsledok analýzy je slovník so "súbormi" v pamäti, kľúčom je názov súboru:
+#   "tabulky": {"nazov.csv": DataFrame}, "grafy": {"nazov.png": io.BytesIO}, "texty": {"nazov.txt": str}
+# Report sa skladá priamo z neho; zápis do tabulky/ a grafy/ je len voliteľný krok.
+ADRESAR_TABULIEK = "tabulky"
+ADRESAR_GRAFOV = "grafy"
+
+
+def novy_vysledok():
+    return {"tabulky": {}, "grafy": {}, "texty": {}}
+
+
+def obrazok(fig, dpi=100, format="png"):
+    """Vykreslený graf ako obrázok v pamäti."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, dpi=dpi, format=format)
+    buffer.seek(0)
+    return buffer
+
+
+def spoj_vysledky(vysledky):
+    """Spojí výsledky viacerých analýz do jedného (neskoršie prepíšu rovnako nazvané súbory)."""
+    spojeny = novy_vysledok()
+    for vysledok in vysledky:
+        for druh in spojeny:
+            spojeny[druh].update(vysledok.get(druh, {}))
+    return spojeny
+
+
+def uloz_vysledok(vysledok, adresar="."):
+    """Zapíše tabuľky a texty do adresar/tabulky, grafy do adresar/grafy; vráti zapísané cesty.
+
+    Tabuľka s pomenovaným indexom (kontingenčné tabuľky) sa zapisuje aj s indexom.
+    """
+    cesty = []
+    adresar_tabuliek = os.path.join(adresar, ADRESAR_TABULIEK)
+    adresar_grafov = os.path.join(adresar, ADRESAR_GRAFOV)
+
+    if vysledok["tabulky"] or vysledok["texty"]:
+        os.makedirs(adresar_tabuliek, exist_ok=True)
+    for nazov, tabulka in vysledok["tabulky"].items():
+        cesta = os.path.join(adresar_tabuliek, nazov)
+        tabulka.to_csv(cesta, sep=";", index=any(meno is not None for meno in tabulka.index.names), encoding="utf-8-sig")
+        cesty.append(cesta)
+    for nazov, text in vysledok["texty"].items():
+        cesta = os.path.join(adresar_tabuliek, nazov)
+        with open(cesta, "w", encoding="utf-8") as f:
+            f.write(text)
+        cesty.append(cesta)
+
+    if vysledok["grafy"]:
+        os.makedirs(adresar_grafov, exist_ok=True)
+    for nazov, graf in vysledok["grafy"].items():
+        cesta = os.path.join(adresar_grafov, nazov)
+        with open(cesta, "wb") as f:
+            f.write(graf.getvalue())
+        cesty.append(cesta)
+    return cesty
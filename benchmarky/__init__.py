@@ -0,0 +1,2 @@
+# Benchmarky a generátor syntetických dát; spúšťajú sa z koreňa repozitára ako moduly
+# (python -m benchmarky.meranie_etap, python -m benchmarky.synteticky_dataset, python -m benchmarky.cas_importu).
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+# Čas studeného štartu: každé meranie je nový proces Pythonu, takže nič nie je v sys.modules
+# ani v pamäti modulov. Meria sa len import (resp. beh skriptu dashboardu), nie štart
+# interpretra. Pri každom cieli sa zapíše aj to, ktoré ťažké knižnice sa pritom načítali.
+
+KOREN = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+TAZKE_KNIZNICE = ["pandas", "numpy", "scipy.stats", "matplotlib", "seaborn", "docx", "pyarrow"]
+
+# Meraný kód: názov -> príkazy, ktorých čas sa meria
+CIELE = {
+    "export_report": "from prototyp import export_report",
+    "fronta_reportov": "from prototyp import fronta_reportov",
+    "hromadny_report": "from prototyp import hromadny_report",
+    "kocka_agregatov": "from analyza_HFE_genu import kocka_agregatov",
+    "asociacny_sken": "from analyza_HFE_genu import asociacny_sken",
+    "graficka_reprezentacia": "from analyza_HFE_genu import graficka_reprezentacia",
+}
+
+# Dashboard bez nahraného súboru (úvodná obrazovka): beh skriptu app.py cez AppTest,
+# samotný streamlit sa načíta ešte pred meraním
+PRIPRAVA_DASHBOARDU = """
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+"""
+BEH_DASHBOARDU = "at.run()\nassert not at.exception, at.exception"
+
+MERANIE = """
+import sys, time, json
+{priprava}
+zaciatok = time.perf_counter()
+{kod}
+trvanie = time.perf_counter() - zaciatok
+print(json.dumps({{"sekundy": trvanie, "kniznice": [m for m in {kniznice!r} if m in sys.modules]}}))
+"""
+
+
+def zmeraj(kod, priprava=""):
+    """Jedno meranie v novom procese; vráti (sekundy, načítané ťažké knižnice)."""
+    skript = MERANIE.format(priprava=priprava, kod=kod, kniznice=TAZKE_KNIZNICE)
+    vystup = subprocess.run([sys.executable, "-c", skript], cwd=KOREN, capture_output=True, text=True, check=True)
+    vysledok = json.loads(vystup.stdout.strip().splitlines()[-1])
+    return vysledok["sekundy"], vysledok["kniznice"]
+
+
+def zmeraj_dashboard():
+    app = os.path.join(KOREN, "prototyp", "app.py")
+    return zmeraj(BEH_DASHBOARDU, priprava=PRIPRAVA_DASHBOARDU.format(app=app))
+
+
+def cas_importu(opakovania=5, ciele=None):
+    """Medián a minimum času studeného importu pre dashboard a vybrané moduly."""
+    merania = {"dashboard (bez dát)": zmeraj_dashboard}
+    for nazov, kod in CIELE.items():
+        if ciele is None or nazov in ciele:
+            merania[nazov] = lambda kod=kod: zmeraj(kod)
+
+    vysledky = {}
+    for nazov, meranie in merania.items():
+        casy, kniznice = [], []
+        for _ in range(opakovania):
+            sekundy, kniznice = meranie()
+            casy.append(sekundy)
+        vysledky[nazov] = {
+            "median_s": statistics.median(casy),
+            "min_s": min(casy),
+            "opakovania": opakovania,
+            "kniznice": kniznice,
+        }
+    return vysledky
+
+
+if __name__ == "__main__":
+    # Použitie: python -m benchmarky.cas_importu [--opakovania 5] [--json cas_importu.json]
+    parser = argparse.ArgumentParser(description="Čas studeného štartu dashboardu a modulov reportu.")
+    parser.add_argument("--opakovania", type=int, default=5)
+    parser.add_argument("--json", help="uložiť výsledky do JSON súboru")
+    args = parser.parse_args()
+
+    vysledky = cas_importu(args.opakovania)
+    for nazov, v in vysledky.items():
+        print(f"{nazov:24s} {v['median_s'] * 1000:8.1f} ms (min {v['min_s'] * 1000:.1f} ms)  {', '.join(v['kniznice']) or '-'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(vysledky, f, ensure_ascii=False, indent=2)
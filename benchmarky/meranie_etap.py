@@ -0,0 +1,307 @@
+import io
+import os
+import gc
+import sys
+import json
+import time
+import platform
+import argparse
+import importlib
+import statistics
+import subprocess
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from analyza_HFE_genu.priprava_datasetu import vycisti_po_castiach, vycisti_dataset
+from analyza_HFE_genu.ulozisko_datasetu import ma_pyarrow, typuj_dataset, nacitaj_dataset, stlpce_datasetu, najdi_dataset
+from analyza_HFE_genu.kodovanie_genotypov import zakoduj_genotypy
+from analyza_HFE_genu.kocka_agregatov import MUTACIE, postav_kocku, kocka_pre_riadky, matica_genotypov, kontingencna, marginal
+from analyza_HFE_genu.dotazy_kohorty import indexuj_kohortu, vyber_kohortu
+from analyza_HFE_genu.vysledky_analyz import spoj_vysledky
+from prototyp.export_report import FAZY_ANALYZY, FAZY_S_PROCESMI, STLPCE_ANALYZY, zostav_dokument
+from .synteticky_dataset import FREKVENCIE_ALEL, generuj_exporty, pocet_riadkov, popis_velkosti
+
+# Čas a pamäť jednotlivých etáp nad syntetickými exportmi rôznej veľkosti: čistenie surového
+# exportu, každá fáza reportu, zostavenie dokumentu a výpočty dashboardu. Etapy bežia
+# v jednom procese za sebou (fázy s procesmi s max_workers=1), takže tracemalloc vidí
+# všetky alokácie vrátane numpy. Čas sa meria bez tracemalloc, špička pamäte v samostatnom behu.
+
+KOREN = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ADRESAR_DAT = os.path.join(KOREN, "benchmarky", "data")
+
+VELKOSTI = ["10k", "100k"]
+
+# Filter kohorty pre meranie dashboardu (typický dotaz: vek, pohlavie a prefix diagnózy)
+FILTER_KOHORTY = {"vek": (30, 60), "pohlavie": ["M"], "prefix_diag": ["K7"]}
+
+# Spomalenie sa hlási, len keď je väčšie ako tolerancia a zároveň ako absolútny šum
+TOLERANCIA = 0.25
+MIN_ROZDIEL_S = 0.02
+MIN_ROZDIEL_MB = 1.0
+
+# Ako často sa vzorkuje pamäť Arrow počas behu etapy
+INTERVAL_ARROW_S = 0.001
+
+
+def _faza(nazov):
+    """Etapa pre jednu fázu reportu: modul fázy sa načíta a dataset skopíruje mimo merania."""
+    modul, nazov_funkcie, potrebuje_kody = FAZY_ANALYZY[nazov]
+    parametre = {"ulozit": False, **({"max_workers": 1} if nazov in FAZY_S_PROCESMI else {})}
+
+    def priprav(k):
+        funkcia = getattr(importlib.import_module(f"analyza_HFE_genu.{modul}"), nazov_funkcie)
+        df = k["df"].copy()
+        if potrebuje_kody:
+            return lambda: funkcia(df, k["kody"], **parametre)
+        return lambda: funkcia(df, **parametre)
+    return priprav
+
+
+def _zostavenie_dokumentu(k):
+    vysledok = spoj_vysledky([k[f"faza {nazov}"] for nazov in FAZY_ANALYZY])
+    return lambda: zostav_dokument(vysledok, len(k["df"]), k["vsetky_stlpce"])
+
+
+def _cistenie_v_pamati(obsah):
+    """Rovnaké kroky ako vycisti_dataset v dashboarde po nahraní súboru."""
+    df = pd.read_csv(io.BytesIO(obsah), sep=";", encoding="utf-8-sig", dtype=str)
+    df = typuj_dataset(vycisti_dataset(df, {}))
+    return df, zakoduj_genotypy(df)
+
+
+def _hwe_a_suvislost(kocka):
+    """Úvodná sekcia dashboardu: HWE a súvislosť s pečeňou pre všetky mutácie z kocky."""
+    from analyza_HFE_genu.Hardy_Weinbergova_rovnovaha import hwe_test_matica
+    from analyza_HFE_genu.intervaly_spolahlivosti import intervaly_genotypov
+    from analyza_HFE_genu.suvislost_HFE_mut import tabulka_z_poctov, vyhodnot_tabulku
+
+    pocty = matica_genotypov(kocka, MUTACIE)
+    hwe_test_matica(pocty)
+    intervaly_genotypov(pocty)
+    return [vyhodnot_tabulku(mut, tabulka_z_poctov(kontingencna(kocka, mut), nazov=mut)) for mut in MUTACIE]
+
+
+def _haplotypy(kocka):
+    from analyza_HFE_genu.haplotypy_HFE import analyza_lokusov
+    from analyza_HFE_genu.kodovanie_genotypov import genotypy
+
+    pocty = marginal(kocka, MUTACIE)[(slice(0, len(genotypy)),) * len(MUTACIE)].ravel()
+    return analyza_lokusov(pocty, MUTACIE)
+
+
+def _stratifikacia(kocka):
+    from analyza_HFE_genu.stratifikovana_analyza import stratifikovana_analyza
+    return stratifikovana_analyza(kocka, ["vekova_skupina", "pohlavie"])
+
+
+def _asociacny_sken(df, kody):
+    from analyza_HFE_genu.asociacny_sken import asociacny_sken
+    return asociacny_sken(df, kody)
+
+
+# Etapy v poradí behu: názov -> (priprav(kontext) vráti funkciu bez argumentov, kľúč výstupu v kontexte).
+# Príprava (kópie, čítanie súboru) sa nemeria; výstup posledného behu použijú ďalšie etapy.
+ETAPY = {
+    "Čistenie po častiach": (lambda k: lambda: vycisti_po_castiach(k["surovy"], k["ocisteny"]), None),
+    "Načítanie datasetu": (lambda k: lambda: nacitaj_dataset(k["ocisteny"], stlpce=k["stlpce"]), "df"),
+    "Kódovanie genotypov": (lambda k: lambda: zakoduj_genotypy(k["df"]), "kody"),
+    **{f"Fáza {nazov}": (_faza(nazov), f"faza {nazov}") for nazov in FAZY_ANALYZY},
+    "Zostavenie dokumentu": (_zostavenie_dokumentu, None),
+    "Dashboard: čistenie nahraného súboru": (lambda k: lambda: _cistenie_v_pamati(k["obsah"]), "dashboard"),
+    "Dashboard: kocka": (lambda k: lambda: postav_kocku(*k["dashboard"]), "kocka"),
+    "Dashboard: index kohorty": (lambda k: lambda: indexuj_kohortu(k["dashboard"][0]), "index"),
+    "Dashboard: výber kohorty": (
+        lambda k: lambda: kocka_pre_riadky(k["kocka"], vyber_kohortu(k["index"], **FILTER_KOHORTY)), None),
+    "Dashboard: HWE a súvislosť": (lambda k: lambda: _hwe_a_suvislost(k["kocka"]), None),
+    "Dashboard: haplotypy": (lambda k: lambda: _haplotypy(k["kocka"]), None),
+    "Dashboard: stratifikácia": (lambda k: lambda: _stratifikacia(k["kocka"]), None),
+    "Dashboard: asociačný sken": (lambda k: lambda: _asociacny_sken(*k["dashboard"]), None),
+}
+
+
+@contextmanager
+def spicka_arrow(interval=INTERVAL_ARROW_S):
+    """Špička pamäte Arrow (reťazce v pandas 3, Parquet) nad stav na začiatku, vzorkovaná vo vlákne.
+
+    Arrow alokuje mimo tracemalloc; bez pyarrow je výsledok None.
+    """
+    vysledok = {"mb": None}
+    if not ma_pyarrow():
+        yield vysledok
+        return
+    import pyarrow as pa
+
+    zaciatok = pa.total_allocated_bytes()
+    stav = {"max": zaciatok}
+    koniec = threading.Event()
+
+    def vzorkuj():
+        while not koniec.wait(interval):
+            stav["max"] = max(stav["max"], pa.total_allocated_bytes())
+
+    vlakno = threading.Thread(target=vzorkuj, daemon=True)
+    vlakno.start()
+    try:
+        yield vysledok
+    finally:
+        koniec.set()
+        vlakno.join()
+        vysledok["mb"] = (max(stav["max"], pa.total_allocated_bytes()) - zaciatok) / 2 ** 20
+
+
+def zmeraj_etapu(priprav, kontext, opakovania=3, pamat=True):
+    """Medián a minimum času z opakovaní a špička pamäte z ďalšieho behu; vráti (výstup, meranie).
+
+    pamat_mb je špička Python a NumPy alokácií (tracemalloc), arrow_mb špička pamäte Arrow.
+    """
+    casy = []
+    for _ in range(opakovania):
+        spusti = priprav(kontext)
+        gc.collect()
+        zaciatok = time.perf_counter()
+        vystup = spusti()
+        casy.append(time.perf_counter() - zaciatok)
+
+    meranie = {"median_s": statistics.median(casy), "min_s": min(casy), "opakovania": opakovania}
+    if pamat:
+        spusti = priprav(kontext)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            with spicka_arrow() as arrow:
+                spusti()
+            meranie["pamat_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+        if arrow["mb"] is not None:
+            meranie["arrow_mb"] = arrow["mb"]
+    return vystup, meranie
+
+
+def zmeraj_velkost(export, opakovania=3, pamat=True, hlasenie=print):
+    """Všetky etapy nad jedným syntetickým exportom; vráti meranie podľa názvu etapy."""
+    kontext = {
+        "surovy": export["surovy"],
+        "ocisteny": os.path.splitext(export["surovy"])[0] + "_ocisteny.parquet",
+    }
+    vysledky = {}
+    for nazov, (priprav, kluc) in ETAPY.items():
+        if nazov == "Načítanie datasetu":
+            # Čistenie mohlo bez pyarrow zapísať CSV namiesto Parquet
+            kontext["ocisteny"] = najdi_dataset(kontext["ocisteny"])
+            kontext["vsetky_stlpce"] = stlpce_datasetu(kontext["ocisteny"])
+            kontext["stlpce"] = [col for col in STLPCE_ANALYZY if col in kontext["vsetky_stlpce"]]
+        if nazov == "Dashboard: čistenie nahraného súboru":
+            with open(export["surovy"], "rb") as f:
+                kontext["obsah"] = f.read()
+
+        vystup, vysledky[nazov] = zmeraj_etapu(priprav, kontext, opakovania, pamat)
+        if kluc is not None:
+            kontext[kluc] = vystup
+        hlasenie(_riadok(nazov, vysledky[nazov]))
+    return vysledky
+
+
+def _riadok(nazov, meranie):
+    pamat = f"{meranie['pamat_mb']:9.1f} MB" if "pamat_mb" in meranie else ""
+    if "arrow_mb" in meranie:
+        pamat += f" + Arrow {meranie['arrow_mb']:.1f} MB"
+    return f"  {nazov:38s} {meranie['median_s'] * 1000:10.1f} ms (min {meranie['min_s'] * 1000:.1f} ms) {pamat}"
+
+
+def _verzia_kodu():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=KOREN, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def meranie_etap(velkosti=VELKOSTI, opakovania=3, pamat=True, adresar_dat=ADRESAR_DAT, parametre_dat=None,
+                 hlasenie=print):
+    """Vygeneruje (alebo znova použije) exporty pre všetky veľkosti a zmeria etapy; vráti výsledky s metadátami."""
+    parametre_dat = parametre_dat or {}
+    vysledky, data = {}, {}
+    for velkost in velkosti:
+        export = generuj_exporty(pocet_riadkov(velkost), adresar_dat, **parametre_dat)
+        popis = popis_velkosti(export["riadky_surove"])
+        hlasenie(f"{popis}: {export['riadky_surove']} riadkov ({export['surovy']})")
+        data[popis] = export["parametre"]
+        vysledky[popis] = zmeraj_velkost(export, opakovania, pamat, hlasenie)
+
+    return {
+        "meta": {
+            "datum": datetime.now().isoformat(timespec="seconds"),
+            "kod": _verzia_kodu(),
+            "python": sys.version.split()[0],
+            "platforma": platform.platform(),
+            "procesory": os.cpu_count(),
+            "opakovania": opakovania,
+            "data": data,
+        },
+        "vysledky": vysledky,
+    }
+
+
+def porovnaj(zaklad, nove, tolerancia=TOLERANCIA):
+    """Porovnanie dvoch behov etapa po etape; vráti tabuľku a zoznam regresií (veľkosť, etapa, metrika)."""
+    riadky, regresie = [], []
+    for velkost, etapy in nove["vysledky"].items():
+        for etapa, meranie in etapy.items():
+            stare = zaklad["vysledky"].get(velkost, {}).get(etapa)
+            if stare is None:
+                continue
+            riadok = {"Veľkosť": velkost, "Etapa": etapa, "Čas pred [s]": stare["median_s"], "Čas po [s]": meranie["median_s"]}
+            riadok["Čas pomer"] = meranie["median_s"] / stare["median_s"] if stare["median_s"] > 0 else float("nan")
+            if riadok["Čas pomer"] > 1 + tolerancia and meranie["median_s"] - stare["median_s"] > MIN_ROZDIEL_S:
+                regresie.append((velkost, etapa, "čas"))
+
+            for kluc, popis in [("pamat_mb", "Pamäť"), ("arrow_mb", "Arrow")]:
+                if kluc not in stare or kluc not in meranie:
+                    continue
+                riadok[f"{popis} pred [MB]"], riadok[f"{popis} po [MB]"] = stare[kluc], meranie[kluc]
+                riadok[f"{popis} pomer"] = meranie[kluc] / stare[kluc] if stare[kluc] > 0 else float("nan")
+                if meranie[kluc] - stare[kluc] > MIN_ROZDIEL_MB and not meranie[kluc] <= stare[kluc] * (1 + tolerancia):
+                    regresie.append((velkost, etapa, popis.lower()))
+            riadky.append(riadok)
+    return pd.DataFrame(riadky), regresie
+
+
+if __name__ == "__main__":
+    # Použitie: python -m benchmarky.meranie_etap [--velkosti 10k 100k 1M 10M] [--opakovania 3]
+    #           [--json vysledky.json] [--porovnaj zaklad.json [--tolerancia 0.25]]
+    parser = argparse.ArgumentParser(description="Čas a pamäť etáp reportu a dashboardu nad syntetickými dátami.")
+    parser.add_argument("--velkosti", nargs="+", default=VELKOSTI, help="počty riadkov, napr. 10k 100k 1M 10M")
+    parser.add_argument("--opakovania", type=int, default=3)
+    parser.add_argument("--bez-pamate", action="store_true", help="nemerať špičku pamäte (o beh menej na etapu)")
+    parser.add_argument("--data", default=ADRESAR_DAT, help="priečinok pre syntetické exporty")
+    parser.add_argument("--frekvencie", nargs="+", default=None, help="frekvencie mutovanej alely MUT=q")
+    parser.add_argument("--odchylka-hwe", type=float, default=0.0, help="koeficient F pre všetky mutácie")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="uložiť výsledky do JSON súboru")
+    parser.add_argument("--porovnaj", help="JSON predchádzajúceho behu; pri regresii skončí s kódom 1")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="povolené relatívne zhoršenie")
+    args = parser.parse_args()
+
+    frekvencie = dict(FREKVENCIE_ALEL)
+    for hodnota in args.frekvencie or []:
+        mut, q = hodnota.split("=", 1)
+        frekvencie[mut] = float(q)
+    parametre_dat = {"frekvencie": frekvencie, "odchylka_hwe": args.odchylka_hwe, "seed": args.seed}
+
+    vysledky = meranie_etap(args.velkosti, args.opakovania, not args.bez_pamate, args.data, parametre_dat)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(vysledky, f, ensure_ascii=False, indent=2)
+
+    if args.porovnaj:
+        with open(args.porovnaj, encoding="utf-8") as f:
+            zaklad = json.load(f)
+        tabulka, regresie = porovnaj(zaklad, vysledky, args.tolerancia)
+        print(f"\nPorovnanie s {args.porovnaj} (kód {zaklad['meta'].get('kod')}):")
+        print(tabulka.round(3).to_string(index=False))
+        for velkost, etapa, metrika in regresie:
+            print(f"REGRESIA {velkost} {etapa}: {metrika}")
+        sys.exit(1 if regresie else 0)
@@ -0,0 +1,253 @@
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from analyza_HFE_genu.priprava_datasetu import VELKOST_CASTI
+
+# Syntetický export laboratória v rovnakom tvare ako SSBU25_dataset.csv (surový) a
+# SSBU25_dataset_cleaned.csv (očistený) pre ľubovoľný počet riadkov. Zapisuje sa po častiach,
+# takže pamäť nezávisí od veľkosti exportu. Každá časť má vlastný generátor odvodený zo seedu
+# a poradia časti, rovnaké parametre teda vždy dajú rovnaké súbory.
+
+# Frekvencie mutovanej alely približne ako v SSBU25_dataset.csv
+FREKVENCIE_ALEL = {"H63D": 0.146, "S65C": 0.015, "C282Y": 0.05}
+
+# Stĺpce mutácií v poradí exportu (názvy s novým riadkom ako v hlavičke laboratória)
+STLPCE_MUTACII = {
+    "H63D": "HFE C187G (H63D)\n[HFE]",
+    "S65C": "HFE A193T (S65C)\n[HFE]",
+    "C282Y": "HFE G845A (C282Y)\n[HFE]",
+}
+VYSLEDKY_GENOTYPOV = np.array(["normal", "heterozygot", "mutant"])
+
+# Surový export: dátum a čas v samostatných stĺpcoch, prázdne stĺpce bez názvu
+STLPCE_SUROVE = (
+    ["id", "", "validovany vysledok", "", "prijem vzorky ", "", "pohavie", "vek", "diagnoza MKCH-10"]
+    + list(STLPCE_MUTACII.values()) + ["", "", ""]
+)
+
+# Najčastejšie kódy MKCH-10 v SSBU25_dataset.csv a ich podiel; zvyšok sa rozdelí rovnomerne
+# medzi zriedkavé kódy z viacerých kapitol
+DIAGNOZY = {
+    "K75.9": 0.142, "E83.1": 0.104, "B19.9": 0.085, "K30": 0.064, "K74.6": 0.055, "K73.9": 0.049,
+    "D75.8": 0.046, "K76.0": 0.038, "K73.0": 0.036, "B99": 0.03, "K76.9": 0.03, "K29.6": 0.028,
+    "D68.8": 0.022, "D75.0": 0.012, "D75.9": 0.011, "K70.9": 0.009, "K30.": 0.009, "K73.1": 0.008,
+}
+ZRIEDKAVE_DIAGNOZY = [
+    "D68.9", "B18.1", "R18", "B97.8", "K77.8", "R50.9", "R06.0", "A08.4", "D64.9", "K76.8", "K83.1",
+    "D50.9", "I10", "J63.4", "E10.9", "N18.0", "C22.0", "Z30.4", "M54.13", "G92", "L95.8", "E11.9",
+]
+
+# Diagnóza hemochromatózy, ktorú dostane časť homozygotov C282Y (asociácia genotypu s diagnózou)
+DIAGNOZA_HEMOCHROMATOZY = "E83.1"
+
+PODIEL_MUZOV = 0.58
+VEK_PRIEMER, VEK_ODCHYLKA = 48.0, 16.0
+OBDOBIE = ("2010-01-01", "2022-12-31")
+MAX_DNI_DO_VALIDACIE = 14
+
+# Neplatné hodnoty veku v surovom exporte (čistenie ich vyradí)
+NEPLATNY_VEK = np.array(["", "nezistený", "150,00", "-1,00"])
+
+# Skratky veľkostí pre príkazový riadok a názvy súborov
+NASOBKY = {"k": 1_000, "M": 1_000_000}
+
+
+def pocet_riadkov(text):
+    """Počet riadkov zo zápisu ako 10k, 1M alebo 2500."""
+    text = str(text).strip()
+    if text and text[-1] in NASOBKY:
+        return int(float(text[:-1]) * NASOBKY[text[-1]])
+    return int(text)
+
+
+def popis_velkosti(pocet):
+    """Opak pocet_riadkov: 10000 -> 10k, 1000000 -> 1M."""
+    for skratka, nasobok in sorted(NASOBKY.items(), key=lambda x: -x[1]):
+        if pocet >= nasobok and pocet % nasobok == 0:
+            return f"{pocet // nasobok}{skratka}"
+    return str(pocet)
+
+
+def pravdepodobnosti_genotypov(frekvencia, odchylka_hwe=0.0):
+    """Pravdepodobnosti wt/wt, wt/mut, mut/mut pri frekvencii alely a koeficiente F.
+
+    F = 0 je Hardy-Weinbergova rovnováha, F > 0 nedostatok heterozygotov, F < 0 ich nadbytok.
+    """
+    q = frekvencia
+    p = 1 - q
+    spodna_hranica = -min(p, q) / max(p, q) if 0 < q < 1 else 0.0
+    if not spodna_hranica <= odchylka_hwe <= 1:
+        raise ValueError(f"Odchýlka od HWE {odchylka_hwe} mimo rozsahu <{spodna_hranica:.3f}, 1> pre frekvenciu {q}")
+    return np.array([p * p + odchylka_hwe * p * q, 2 * p * q * (1 - odchylka_hwe), q * q + odchylka_hwe * p * q])
+
+
+def _pre_mutaciu(hodnota, mut, predvolena):
+    """Parameter zadaný jedným číslom pre všetky mutácie alebo slovníkom podľa mutácie."""
+    if isinstance(hodnota, dict):
+        return hodnota.get(mut, predvolena)
+    return hodnota
+
+
+def _tabulky_textov():
+    """Textové podoby dátumov, časov a veku vopred – riadky sa len vyberajú indexom."""
+    dni = pd.date_range(OBDOBIE[0], pd.Timestamp(OBDOBIE[1]) + pd.Timedelta(days=MAX_DNI_DO_VALIDACIE))
+    desatiny = np.arange(0, 1201)
+    return {
+        "pocet_dni": len(dni) - MAX_DNI_DO_VALIDACIE,
+        "datumy": dni.strftime("%d.%m.%Y").to_numpy(dtype=object),
+        "casy": np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)], dtype=object),
+        "vek_surovy": np.array([f"{d // 10},{d % 10}0" for d in desatiny], dtype=object),
+        "vek_ocisteny": np.array([f"{d / 10:.1f}" for d in desatiny], dtype=object),
+    }
+
+
+def generuj_cast(rng, prve_id, pocet, texty, frekvencie=FREKVENCIE_ALEL, odchylka_hwe=0.0, podiel_chyb=0.002,
+                 asociacia=0.3):
+    """Jedna časť exportu ako polia hodnôt (spoločný základ surového aj očisteného tvaru)."""
+    polia = {"id": pd.Series(np.arange(prve_id, prve_id + pocet)).astype(str).str.zfill(9).to_numpy(dtype=object)}
+    polia["pohavie"] = np.where(rng.random(pocet) < PODIEL_MUZOV, "M", "F").astype(object)
+
+    vek = np.clip(np.round(rng.normal(VEK_PRIEMER, VEK_ODCHYLKA, pocet) * 10), 10, 950).astype(np.intp)
+    polia["vek_surovy"] = texty["vek_surovy"][vek]
+    polia["vek_ocisteny"] = texty["vek_ocisteny"][vek]
+    polia["platny_vek"] = rng.random(pocet) >= podiel_chyb
+    neplatne = ~polia["platny_vek"]
+    polia["vek_surovy"][neplatne] = rng.choice(NEPLATNY_VEK, neplatne.sum())
+
+    kody_diag = list(DIAGNOZY) + ZRIEDKAVE_DIAGNOZY
+    vahy = np.array(list(DIAGNOZY.values()) + [(1 - sum(DIAGNOZY.values())) / len(ZRIEDKAVE_DIAGNOZY)] * len(ZRIEDKAVE_DIAGNOZY))
+    polia["diagnoza"] = np.array(kody_diag, dtype=object)[rng.choice(len(kody_diag), pocet, p=vahy / vahy.sum())]
+
+    for mut in STLPCE_MUTACII:
+        frekvencia = _pre_mutaciu(frekvencie, mut, FREKVENCIE_ALEL[mut])
+        pravdepodobnosti = pravdepodobnosti_genotypov(frekvencia, _pre_mutaciu(odchylka_hwe, mut, 0.0))
+        polia[mut] = rng.choice(len(VYSLEDKY_GENOTYPOV), pocet, p=pravdepodobnosti)
+    homozygoti = (polia["C282Y"] == 2) & (rng.random(pocet) < asociacia)
+    polia["diagnoza"][homozygoti] = DIAGNOZA_HEMOCHROMATOZY
+
+    # Príjem vzorky ráno, validácia výsledku o 0 až MAX_DNI_DO_VALIDACIE dní neskôr
+    den_prijmu = rng.integers(0, texty["pocet_dni"], pocet)
+    polia["prijem_datum"] = texty["datumy"][den_prijmu]
+    polia["prijem_cas"] = texty["casy"][rng.integers(7 * 60, 16 * 60, pocet)]
+    polia["validacia_datum"] = texty["datumy"][den_prijmu + rng.integers(0, MAX_DNI_DO_VALIDACIE + 1, pocet)]
+    polia["validacia_cas"] = texty["casy"][rng.integers(8 * 60, 17 * 60, pocet)]
+    bez_datumu = rng.random(pocet) < podiel_chyb
+    for pole in ["prijem_datum", "prijem_cas", "validacia_datum", "validacia_cas"]:
+        polia[pole][bez_datumu] = ""
+    return polia
+
+
+def surova_cast(polia):
+    """Časť v tvare surového exportu (ako SSBU25_dataset.csv)."""
+    prazdne = np.full(len(polia["id"]), "", dtype=object)
+    stlpce = [
+        polia["id"], prazdne, polia["validacia_datum"], polia["validacia_cas"], polia["prijem_datum"],
+        polia["prijem_cas"], polia["pohavie"], polia["vek_surovy"], polia["diagnoza"],
+        *[VYSLEDKY_GENOTYPOV[polia[mut]] for mut in STLPCE_MUTACII], prazdne, prazdne, prazdne,
+    ]
+    cast = pd.DataFrame(dict(enumerate(stlpce)))
+    cast.columns = STLPCE_SUROVE
+    return cast
+
+
+def ocistena_cast(polia):
+    """Časť v tvare očisteného exportu (ako SSBU25_dataset_cleaned.csv), len riadky s platným vekom."""
+    platne = polia["platny_vek"]
+    # Dátumové stĺpce sú spojené rovnako, ako ich spája vycisti_dataset zo stĺpcov surového exportu
+    cast = pd.DataFrame({
+        "id": polia["id"],
+        "pohavie": polia["pohavie"],
+        "vek": polia["vek_ocisteny"],
+        "diagnoza MKCH-10": polia["diagnoza"],
+        **{stlpec: VYSLEDKY_GENOTYPOV[polia[mut]] for mut, stlpec in STLPCE_MUTACII.items()},
+        "validovany_vysledok": " " + polia["validacia_datum"],
+        "prijem_vzorky": polia["validacia_cas"] + " " + polia["prijem_datum"],
+    })
+    return cast[platne]
+
+
+def parametre_exportu(pocet, frekvencie=FREKVENCIE_ALEL, odchylka_hwe=0.0, podiel_chyb=0.002, asociacia=0.3, seed=0,
+                      velkost_casti=VELKOST_CASTI):
+    return {
+        "riadky": pocet, "frekvencie": frekvencie, "odchylka_hwe": odchylka_hwe, "podiel_chyb": podiel_chyb,
+        "asociacia": asociacia, "seed": seed, "velkost_casti": velkost_casti,
+    }
+
+
+def nazov_exportu(parametre):
+    """Názov súboru z veľkosti a hashu parametrov – iné parametre nikdy nepoužijú starý súbor."""
+    odtlacok = hashlib.sha256(json.dumps(parametre, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return f"hfe_{popis_velkosti(parametre['riadky'])}_{odtlacok}"
+
+
+def generuj_exporty(pocet, adresar, frekvencie=FREKVENCIE_ALEL, odchylka_hwe=0.0, podiel_chyb=0.002, asociacia=0.3,
+                    seed=0, velkost_casti=VELKOST_CASTI, prepisat=False):
+    """Zapíše surový a očistený syntetický export do adresara; vráti cesty a počty riadkov.
+
+    Existujúce súbory s rovnakými parametrami sa použijú znova (okrem prepisat=True).
+    """
+    parametre = parametre_exportu(pocet, frekvencie, odchylka_hwe, podiel_chyb, asociacia, seed, velkost_casti)
+    zaklad = os.path.join(adresar, nazov_exportu(parametre))
+    export = {
+        "surovy": zaklad + ".csv",
+        "ocisteny": zaklad + "_cleaned.csv",
+        "popis": zaklad + ".json",
+        "parametre": parametre,
+    }
+    if not prepisat and all(os.path.exists(export[k]) for k in ["surovy", "ocisteny", "popis"]):
+        with open(export["popis"], encoding="utf-8") as f:
+            return {**export, **json.load(f)}
+
+    os.makedirs(adresar, exist_ok=True)
+    texty = _tabulky_textov()
+    ocistene = 0
+    with open(export["surovy"], "w", encoding="utf-8-sig", newline="") as surovy, \
+            open(export["ocisteny"], "w", encoding="utf-8-sig", newline="") as ocisteny:
+        for i, prve in enumerate(range(0, pocet, velkost_casti)):
+            rng = np.random.default_rng([seed, i])
+            polia = generuj_cast(rng, prve + 1, min(velkost_casti, pocet - prve), texty,
+                                 frekvencie, odchylka_hwe, podiel_chyb, asociacia)
+            surova_cast(polia).to_csv(surovy, sep=";", index=False, header=i == 0, lineterminator="\r\n")
+            cast = ocistena_cast(polia)
+            cast.to_csv(ocisteny, sep=";", index=False, header=i == 0)
+            ocistene += len(cast)
+
+    pocty = {"riadky_surove": pocet, "riadky_ocistene": ocistene}
+    with open(export["popis"], "w", encoding="utf-8") as f:
+        json.dump({**pocty, "parametre": parametre}, f, ensure_ascii=False, indent=2)
+    return {**export, **pocty}
+
+
+def _parsuj_mutacie(hodnoty, typ=float):
+    """Zoznam MUT=hodnota z príkazového riadku -> slovník (jedno číslo platí pre všetky mutácie)."""
+    if len(hodnoty) == 1 and "=" not in hodnoty[0]:
+        return typ(hodnoty[0])
+    return {mut: typ(hodnota) for mut, hodnota in (h.split("=", 1) for h in hodnoty)}
+
+
+if __name__ == "__main__":
+    # Použitie: python -m benchmarky.synteticky_dataset 1M [--adresar benchmarky/data] [--frekvencie C282Y=0.07]
+    #           [--odchylka-hwe 0.05 | H63D=0.1] [--seed 0]
+    parser = argparse.ArgumentParser(description="Syntetický surový a očistený export HFE.")
+    parser.add_argument("velkosti", nargs="+", help="počty riadkov, napr. 10k 100k 1M 10M")
+    parser.add_argument("--adresar", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--frekvencie", nargs="+", default=None, help="frekvencia mutovanej alely (jedno číslo alebo MUT=q)")
+    parser.add_argument("--odchylka-hwe", nargs="+", default=["0"], help="koeficient F (jedno číslo alebo MUT=F)")
+    parser.add_argument("--podiel-chyb", type=float, default=0.002, help="podiel riadkov s neplatným vekom a bez dátumov")
+    parser.add_argument("--asociacia", type=float, default=0.3, help="podiel homozygotov C282Y s diagnózou E83.1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prepisat", action="store_true")
+    args = parser.parse_args()
+
+    frekvencie = _parsuj_mutacie(args.frekvencie) if args.frekvencie else FREKVENCIE_ALEL
+    if isinstance(frekvencie, dict):
+        frekvencie = {**FREKVENCIE_ALEL, **frekvencie}
+    for velkost in args.velkosti:
+        export = generuj_exporty(
+            pocet_riadkov(velkost), args.adresar, frekvencie, _parsuj_mutacie(args.odchylka_hwe),
+            args.podiel_chyb, args.asociacia, args.seed, prepisat=args.prepisat,
+        )
+        print(f"{export['surovy']}: {export['riadky_surove']} riadkov, očistený {export['riadky_ocistene']}")
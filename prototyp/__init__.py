@@ -0,0 +1 @@
+# Dashboard (streamlit run prototyp/app.py), zostavenie reportu a hromadné reporty.
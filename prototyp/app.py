@@ -1,154 +1,240 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-from scipy.stats import chi2_contingency, chi2
-import export_report
+import io
+import hashlib
+import streamlit as st
+
 st.set_page_config(page_title="Analýza HFE génu", layout="wide")
-sns.set(style="whitegrid")
 
 st.title("Analýza HFE génu a genetická predispozícia na hemochromatózu")
 
-# Mutácie a mapovanie stĺpcov
-mutacie_vzory = {
-    "C282Y": "G845A",
-    "H63D": "C187G",
-    "S65C": "A193T"
-}
-
-# Labely pre genotypy
-genotyp_label = {
-    "wt/wt": "wt/wt (normal)",
-    "wt/mut": "wt/mut (heterozygot)",
-    "mut/mut": "mut/mut (mutant)"
-}
-
-# Pomocná funkcia na premapovanie výsledkov na genotypy
-def premapuj_na_genotyp(series):
-    mapping = {
-        "normal": "wt/wt",
-        "heterozygot": "wt/mut",
-        "homozygot": "mut/mut",
-        "mutácia": "mut/mut",
-        "mutant": "mut/mut",
-        "patogénna": "mut/mut"
-    }
-    return series.str.strip().str.lower().map(mapping).fillna("neznamy")
-
 # 📥 Upload a čistenie datasetu v Sidebar
 st.sidebar.header("📥 Nahrajte CSV súbor")
 uploaded_file = st.sidebar.file_uploader("Vyberte súbor:", type=["csv"])
 
-if uploaded_file:
-    with st.spinner("🔄 Čistenie datasetu..."):
-        # Načítanie súboru
-        df = pd.read_csv(uploaded_file, sep=";", encoding="utf-8-sig", dtype=str)
-
-        # Vytvorenie nových dátumových stĺpcov
-        df["validovany_vysledok"] = df.iloc[:, 1].fillna('') + " " + df.iloc[:, 2].fillna('')
-        df["prijem_vzorky"] = df.iloc[:, 3].fillna('') + " " + df.iloc[:, 4].fillna('')
+if st.sidebar.button("🧹 Vyprázdniť cache datasetov"):
+    # Všetky cache dát (čistenie, kocka, index kohorty) sú odvodené od nahraného datasetu
+    st.cache_data.clear()
 
-        # Odstránenie nepotrebných stĺpcov
-        drop_cols = ['Unnamed: 3', 'Unnamed: 5'] + [col for col in df.columns if "Unnamed" in col]
-        df.drop(columns=drop_cols + [df.columns[1], df.columns[2], df.columns[3], df.columns[4]], inplace=True, errors="ignore")
-
-        # Odstránenie prázdnych ID
-        df = df[df["id"].notna() & (df["id"].str.strip() != "")]
+if not uploaded_file:
+    st.warning("⬆️ Nahrajte súbor vľavo v sidebare, aby sa zobrazili ďalšie sekcie.")
+    st.stop()
 
-        # Validácia veku
-        def is_valid_age(age_str):
-            try:
-                age_main = float(age_str.split(",")[0].replace(",", "."))
-                return age_main <= 120
-            except:
+# Knižnice a analýzy sa načítajú až s nahraným datasetom, úvodná obrazovka ich nepotrebuje.
+# Moduly, ktoré používa len jedna sekcia (grafy, sken, haplotypy, ...), sa importujú až v nej.
+import pandas as pd
+from analyza_HFE_genu.kodovanie_genotypov import zakoduj_genotypy, dekoduj, mutacie_vzory, genotyp_label
+from analyza_HFE_genu.kodovanie_genotypov import genotypy as poradie_genotypov
+from analyza_HFE_genu.priprava_datasetu import vycisti_dataset as vycisti_surovy_dataset, MAX_VEK
+from analyza_HFE_genu.kocka_agregatov import MUTACIE, postav_kocku, kocka_pre_riadky, tabulka, marginal, matica_genotypov, kontingencna
+from analyza_HFE_genu.dotazy_kohorty import indexuj_kohortu, rozsah_datumov, vyber_kohortu
+from analyza_HFE_genu.ulozisko_datasetu import CESTA_DATASETU, typuj_dataset, uloz_dataset, najdi_dataset
+
+# Počty genotypov mutácie (voliteľne rozdelené podľa ďalšej dimenzie kocky) s popiskami genotypov
+def genotypy_z_kocky(mut, stlpce=None):
+    return tabulka(kocka, mut, stlpce).rename(index=genotyp_label)
+
+# Poradie mutácií v dashboarde (C282Y prvá); poradie lokusov v bitovej maske určuje mutacie_vzory
+PORADIE_MUTACII = ["C282Y", "H63D", "S65C"]
+
+# Očistený dataset a hash obsahu, z ktorého vznikol
+CISTY_DATASET_CESTA = CESTA_DATASETU
+HASH_DATASETU_CESTA = "sem_SSBU/SSBU25_dataset_cleaned.sha256"
+
+# Maximálny počet očistených datasetov držaných v cache (zdieľaná medzi reláciami)
+MAX_DATASETOV_V_CACHE = 8
+
+@st.cache_data(max_entries=MAX_DATASETOV_V_CACHE, show_spinner=False)
+def vycisti_dataset(hash_obsahu, _obsah):
+    """Očistí nahraný CSV súbor. Kľúčom cache je len hash obsahu, nie samotné bajty."""
+    # Načítanie súboru
+    df = pd.read_csv(io.BytesIO(_obsah), sep=";", encoding="utf-8-sig", dtype=str)
+
+    # Dátumové stĺpce, prázdne ID a validácia veku – spoločné s priprava_datasetu
+    hlasenie = {}
+    df = vycisti_surovy_dataset(df, hlasenie)
+
+    # Normalizované názvy stĺpcov a typy (vek float32, dátumy, kategórie)
+    df = typuj_dataset(df)
+
+    # Dynamické mapovanie názvov stĺpcov pre mutácie
+    mutacie = {}
+    for mut_short in PORADIE_MUTACII:
+        expected_part = mutacie_vzory[mut_short]
+        matching_cols = [col for col in df.columns if expected_part in col and "HFE" in col]
+        if matching_cols:
+            mutacie[mut_short] = matching_cols[0]
+
+    # Genotypy sa zakódujú raz pre celý dataset
+    kody = zakoduj_genotypy(df)
+
+    return df, mutacie, kody, hlasenie
+
+@st.cache_data(max_entries=MAX_DATASETOV_V_CACHE, show_spinner=False)
+def kocka_datasetu(hash_obsahu, _df, _kody):
+    """Kocka počtov sa postaví raz pre dataset; sekcie dashboardu z nej len vyberajú rezy."""
+    return postav_kocku(_df, _kody)
+
+@st.cache_data(max_entries=MAX_DATASETOV_V_CACHE, show_spinner=False)
+def index_kohorty(hash_obsahu, _df):
+    """Bitmapy a zoradené stĺpce pre filtre kohorty – tiež raz pre dataset."""
+    return indexuj_kohortu(_df)
+
+def najdi_dataset_ak_existuje(cesta):
+    try:
+        return najdi_dataset(cesta)
+    except FileNotFoundError:
+        return None
+
+def uloz_ak_sa_zmenil(df, hash_obsahu):
+    """Zapíše očistený dataset na disk len vtedy, keď sa zmenil obsah nahraného súboru."""
+    if os.path.exists(HASH_DATASETU_CESTA):
+        with open(HASH_DATASETU_CESTA, "r", encoding="utf-8") as f:
+            if f.read().strip() == hash_obsahu and najdi_dataset_ak_existuje(CISTY_DATASET_CESTA):
                 return False
 
-        df = df[df["vek"].apply(is_valid_age)]
-        df["vek"] = df["vek"].astype(str).str.replace(",", ".").astype(float)
-
-        # Normalize názvy stĺpcov
-        df.columns = df.columns.str.replace('\\n', ' ', regex=False).str.strip()
-
-        # Dynamické mapovanie názvov stĺpcov pre mutácie
-        mutacie = {}
-        for mut_short, expected_part in mutacie_vzory.items():
-            matching_cols = [col for col in df.columns if expected_part in col and "HFE" in col]
-            if matching_cols:
-                mutacie[mut_short] = matching_cols[0]
-        # Uloženie očisteného datasetu
-        os.makedirs("sem_SSBU", exist_ok=True)
-        df.to_csv("sem_SSBU/SSBU25_dataset_cleaned.csv", index=False, sep=";", encoding="utf-8-sig")
-
-        if "pohavie" in df.columns:
-            df.rename(columns={"pohavie": "Pohlavie"}, inplace=True)
-            df["Pohlavie"] = df["Pohlavie"].replace({"F": "Ž", "M": "M"})
-            st.success("✅ Dataset bol úspešne načítaný a očistený.")
-else:
-    st.warning("⬆️ Nahrajte súbor vľavo v sidebare, aby sa zobrazili ďalšie sekcie.")
-    st.stop()
+    uloz_dataset(df, CISTY_DATASET_CESTA)
+    with open(HASH_DATASETU_CESTA, "w", encoding="utf-8") as f:
+        f.write(hash_obsahu)
+    return True
+
+with st.spinner("🔄 Čistenie datasetu..."):
+    obsah = uploaded_file.getvalue()
+    hash_obsahu = hashlib.sha256(obsah).hexdigest()
+
+    # Pri rovnakom obsahu sa čistenie nespúšťa znova (ani v inej relácii)
+    df, mutacie, kody, hlasenie = vycisti_dataset(hash_obsahu, obsah)
+
+    # Uloženie očisteného datasetu
+    uloz_ak_sa_zmenil(df, hash_obsahu)
+
+    if "pohavie" in df.columns:
+        df.rename(columns={"pohavie": "Pohlavie"}, inplace=True)
+        # Export môže mať "F" aj "Ž" – premenovanie kategórie by vytvorilo duplicitnú, preto sa hodnoty zlúčia
+        df["Pohlavie"] = df["Pohlavie"].astype("object").replace("F", "Ž").astype("category")
+        st.success("✅ Dataset bol úspešne načítaný a očistený.")
+
+    kocka = kocka_datasetu(hash_obsahu, df, kody)
+
+    # Stĺpce datasetu pre report (sekcie si do df pridávajú pomocné stĺpce)
+    stlpce_datasetu = list(df.columns)
+
+    if len(hlasenie["vek"]) > 0:
+        with st.sidebar.expander(f"⚠️ Vyradené riadky s neplatným vekom: {len(hlasenie['vek'])}"):
+            st.dataframe(hlasenie["vek"])
+    if hlasenie["datumy"]["neparsovatelne"].sum() > 0:
+        with st.sidebar.expander(f"⚠️ Neparsovateľné dátumy: {hlasenie['datumy']['neparsovatelne'].sum()}"):
+            st.dataframe(hlasenie["datumy"])
+
+# Inkrementálny režim: nové riadky (podľa ID) sa pripoja do skladu s priebežnými štatistikami
+if st.sidebar.checkbox("➕ Pridať nové riadky do inkrementálneho skladu"):
+    from analyza_HFE_genu.inkrementalny_sklad import pridaj_davku
+
+    if st.session_state.get("hash_v_sklade") != hash_obsahu:
+        davka = pd.read_csv(io.BytesIO(obsah), sep=";", encoding="utf-8-sig", dtype=str)
+        st.session_state["vysledok_skladu"] = pridaj_davku(davka)
+        st.session_state["hash_v_sklade"] = hash_obsahu
+    vysledok_skladu = st.session_state["vysledok_skladu"]
+    st.sidebar.info(f"Sklad: {vysledok_skladu['nove']} nových, {vysledok_skladu['duplicitne']} duplicitných riadkov")
+
+# 🔎 Filtre kohorty – všetky sekcie pracujú len s vybranými pacientmi
+st.sidebar.header("🔎 Filter kohorty")
+index = index_kohorty(hash_obsahu, df)
+
+filter_veku = st.sidebar.slider("Vek", 0, MAX_VEK, (0, MAX_VEK), help="V dovŕšených rokoch: horná hranica 60 zahŕňa aj vek 60,5.")
+vsetky_pohlavia = list(index["pohlavie"])
+filter_pohlavia = st.sidebar.multiselect("Pohlavie", vsetky_pohlavia, default=vsetky_pohlavia)
+filter_diagnoz = st.sidebar.text_input("Kód MKCH-10 začína na (viac prefixov oddeľte čiarkou)", "")
+rozsah = rozsah_datumov(index)
+filter_datumu = st.sidebar.date_input("Dátum prijatia vzorky", rozsah, min_value=rozsah[0], max_value=rozsah[1]) if rozsah else None
+
+# Nezmenený filter sa nepoužije, aby v kohorte ostali aj riadky s chýbajúcim vekom či dátumom
+maska_kohorty = vyber_kohortu(
+    index,
+    vek=filter_veku if filter_veku != (0, MAX_VEK) else None,
+    pohlavie=filter_pohlavia if set(filter_pohlavia) != set(vsetky_pohlavia) else None,
+    prefix_diag=[p for p in filter_diagnoz.split(",") if p.strip()] or None,
+    datum=tuple(filter_datumu) if filter_datumu and len(filter_datumu) == 2 and tuple(filter_datumu) != rozsah else None,
+)
+
+if not maska_kohorty.all():
+    df = df[maska_kohorty]
+    kody = kody[maska_kohorty]
+    kocka = kocka_pre_riadky(kocka, maska_kohorty)
+    st.sidebar.info(f"Kohorta: {len(df)} z {len(maska_kohorty)} pacientov")
+    if len(df) == 0:
+        st.warning("Zvoleným filtrom nevyhovuje žiadny pacient.")
+        st.stop()
 
 #  Vyber sekciu v Sidebar
 vyber_sekciu = st.sidebar.radio(
     "Vyberte sekciu",
-    ("Úvodná analýza", "Grafy", "Analýza diagnóz podľa MKCH-10")
+    ("Úvodná analýza", "Grafy", "Analýza diagnóz podľa MKCH-10", "Kombinácie genotypov a haplotypy", "Stratifikovaná analýza")
 )
 
 # =================== Sekcia: Úvodná analýza ===================
 if vyber_sekciu == "Úvodná analýza":
+    import numpy as np
+    from analyza_HFE_genu.Hardy_Weinbergova_rovnovaha import hwe_test_matica
+    from analyza_HFE_genu.intervaly_spolahlivosti import intervaly_genotypov, interval_podielu
+    from analyza_HFE_genu.suvislost_HFE_mut import tabulka_z_poctov, vyhodnot_tabulku
+    from analyza_HFE_genu.pravidla_genotypov import pocty_pravidiel, vyhodnot_pravidla
 
     st.header("🧬 Hardy-Weinbergova rovnováha")
 
     selected_hwe = st.selectbox("Zobraziť výsledky pre:", ["Sumár", *mutacie.keys()])
-
-    def hardy_weinberg_test(genotypy):
-        obs = genotypy.value_counts().reindex(["wt/wt", "wt/mut", "mut/mut"], fill_value=0)
-        n = obs.sum()
-        if n == 0:
+    metoda_hwe = st.radio("Test", ["chi2", "exaktny"], horizontal=True,
+                          format_func=lambda m: {"chi2": "Chi²", "exaktny": "Exaktný"}[m])
+    metoda_is = st.radio("95% interval spoľahlivosti", ["wilson", "clopper-pearson", "bootstrap"], horizontal=True,
+                         format_func=lambda m: {"wilson": "Wilson", "clopper-pearson": "Clopper-Pearson", "bootstrap": "Bootstrap"}[m])
+
+    # Jeden vektorizovaný výpočet pre všetky mutácie naraz
+    mutacie_hwe = list(mutacie.keys())
+    pocty_hwe = matica_genotypov(kocka, mutacie_hwe)
+    testy_hwe = hwe_test_matica(pocty_hwe, metoda=metoda_hwe)
+    testy_hwe.index = mutacie_hwe
+    alela_od, alela_do = intervaly_genotypov(pocty_hwe, metoda=metoda_is)["alela"]
+
+    def hardy_weinberg_test(mut):
+        test = testy_hwe.loc[mut]
+        if test["n"] == 0:
             return None
-        p = (2 * obs["wt/wt"] + obs["wt/mut"]) / (2 * n)
-        q = 1 - p
-        exp = [p**2 * n, 2*p*q * n, q**2 * n]
-        chi2_contrib = ((obs - exp)**2 / exp)
-        chi2_stat = chi2_contrib.sum()
-        pval = 1 - chi2.cdf(chi2_stat, df=1)
+        obs = pocty_hwe[mutacie_hwe.index(mut)]
+        exp = test[[f"ocakavane_{g}" for g in poradie_genotypov]].to_numpy(dtype=float)
+        chi2_contrib = np.where(exp > 0, (obs - exp)**2 / np.where(exp > 0, exp, 1), 0)
+        pval = test["p_hodnota"]
         df_result = pd.DataFrame({
             "Pozorované": obs,
             "Očakávané": [round(val, 2) for val in exp],
             "Chi² príspevok": chi2_contrib.round(3),
             "p-hodnota": [round(pval, 4)]*3,
             "Výsledok": ["Odchýlka" if pval < 0.05 else "Súlad"] * 3
-        })
-        df_result.index = df_result.index.map(lambda x: genotyp_label.get(x, x))
+        }, index=[genotyp_label[g] for g in poradie_genotypov])
         return df_result
 
     if selected_hwe == "Sumár":
         vysledky = []
-        for mut, col in mutacie.items():
-            genotypy = premapuj_na_genotyp(df[col])
-            result = hardy_weinberg_test(genotypy)
-            if result is not None:
-                poz = result["Pozorované"].values
-                ocz = result["Očakávané"].values
-                chi = result["Chi² príspevok"].sum()
-                pval = result["p-hodnota"].iloc[0]
-                vysledky.append({
-                    "Mutácia": mut,
-                    "Pozorované wt/wt": poz[0],
-                    "Pozorované wt/mut": poz[1],
-                    "Pozorované mut/mut": poz[2],
-                    "Očakávané wt/wt": ocz[0],
-                    "Očakávané wt/mut": ocz[1],
-                    "Očakávané mut/mut": ocz[2],
-                    "Chi²": round(chi, 4),
-                    "p-hodnota": round(pval, 4),
-                    "Výsledok": "Odchýlka" if pval < 0.05 else "Súlad"
-                })
+        for i, mut in enumerate(mutacie_hwe):
+            test = testy_hwe.loc[mut]
+            if test["n"] == 0:
+                continue
+            vysledky.append({
+                "Mutácia": mut,
+                "Pozorované wt/wt": pocty_hwe[i, 0],
+                "Pozorované wt/mut": pocty_hwe[i, 1],
+                "Pozorované mut/mut": pocty_hwe[i, 2],
+                "Očakávané wt/wt": round(test["ocakavane_wt/wt"], 2),
+                "Očakávané wt/mut": round(test["ocakavane_wt/mut"], 2),
+                "Očakávané mut/mut": round(test["ocakavane_mut/mut"], 2),
+                "Frekvencia mut alely": round(test["frekvencia_mut"], 4),
+                "95% IS dolná": round(alela_od[i], 4),
+                "95% IS horná": round(alela_do[i], 4),
+                "Chi²": round(test["chi2"], 4),
+                "p-hodnota": round(test["p_hodnota"], 4),
+                "Výsledok": "Odchýlka" if test["p_hodnota"] < 0.05 else "Súlad"
+            })
         st.dataframe(pd.DataFrame(vysledky))
     else:
-        col = mutacie[selected_hwe]
-        genotypy = premapuj_na_genotyp(df[col])
-        result = hardy_weinberg_test(genotypy)
+        result = hardy_weinberg_test(selected_hwe)
         if result is not None:
             st.subheader(f"Mutácia {selected_hwe}")
             st.dataframe(result)
@@ -158,74 +244,92 @@ if vyber_sekciu == "Úvodná analýza":
 
     selected = st.selectbox("Vyber mutáciu", ["Všetky mutácie"] + list(mutacie.keys()))
 
+    def percenta_s_intervalom(pocty):
+        """Percentá nenulových kategórií s 95% intervalom spoľahlivosti zvolenou metódou."""
+        dolna, horna = interval_podielu(pocty.to_numpy(), pocty.sum(), metoda=metoda_is)
+        vysledok = pd.DataFrame({
+            "Percento": (pocty / pocty.sum()).round(3) * 100,
+            "95% IS dolná (%)": (dolna * 100).round(1),
+            "95% IS horná (%)": (horna * 100).round(1),
+        }, index=pocty.index)[pocty > 0]
+        vysledok.index = vysledok.index.map(lambda x: genotyp_label.get(x, x))
+        return vysledok
+
     if selected == "Všetky mutácie":
         vysledky = []
         for mut_key, col in mutacie.items():
             if col in df.columns:
-                genotypy = premapuj_na_genotyp(df[col])
-                counts = genotypy.value_counts(normalize=True).round(3) * 100
-                counts.index = counts.index.map(lambda x: genotyp_label.get(x, x))
-                for genotyp, percent in counts.items():
-                    vysledky.append({
-                        "Mutácia": mut_key,
-                        "Genotyp": genotyp,
-                        "Percento": percent
-                    })
-        vysledky_df = pd.DataFrame(vysledky)
+                percenta = percenta_s_intervalom(tabulka(kocka, mut_key, bez_neznamych=False))
+                vysledky.append(percenta.rename_axis("Genotyp").reset_index().assign(Mutácia=mut_key))
+        vysledky_df = pd.concat(vysledky, ignore_index=True)[["Mutácia", "Genotyp", "Percento", "95% IS dolná (%)", "95% IS horná (%)"]] \
+            if vysledky else pd.DataFrame()
         st.dataframe(vysledky_df)
 
-        # Celkový sumár prenášačov a predispozície
-        pren = df[
-            (df[mutacie["C282Y"]].str.strip().str.lower() == "heterozygot") |
-            (df[mutacie["H63D"]].str.strip().str.lower() == "heterozygot") |
-            (df[mutacie["S65C"]].str.strip().str.lower() == "heterozygot")
-        ]
-        predispozicia = df[
-            (df[mutacie["C282Y"]].str.strip().str.lower() == "homozygot") |
-            (
-                (df[mutacie["C282Y"]].str.strip().str.lower() == "heterozygot") &
-                (df[mutacie["H63D"]].str.strip().str.lower() == "heterozygot")
-            )
-        ]
-        st.markdown(f"- **Prenášači**: {len(pren)} pacientov ({(len(pren)/len(df))*100:.1f} %)")
-        st.markdown(f"- **Genetická predispozícia**: {len(predispozicia)} pacientov ({(len(predispozicia)/len(df))*100:.1f} %)")
+        # Rizikové kategórie genotypov – všetky pravidlá sa vyhodnotia naraz nad bitovou maskou
+        pocty_kategorii = pocty_pravidiel(kody["maska"])
+        n = len(kody)
+        kategorie_od, kategorie_do = interval_podielu(pocty_kategorii.to_numpy(), n, metoda=metoda_is)
+        for nazov, popis in [("Prenášači", "Prenášači"), ("Predispozícia HH", "Genetická predispozícia")]:
+            i = pocty_kategorii.index.get_loc(nazov)
+            st.markdown(f"- **{popis}**: {pocty_kategorii[nazov]} pacientov ({(pocty_kategorii[nazov]/n)*100:.1f} %, "
+                        f"95% IS {kategorie_od[i]*100:.1f}–{kategorie_do[i]*100:.1f} %)")
+        st.dataframe(pd.DataFrame({
+            "Počet pacientov": pocty_kategorii,
+            "Percento": (pocty_kategorii / n * 100).round(1),
+            "95% IS dolná (%)": (kategorie_od * 100).round(1),
+            "95% IS horná (%)": (kategorie_do * 100).round(1),
+        }).rename_axis("Kategória"))
+
+        with st.expander("Zaradenie pacientov do kategórií"):
+            kategorie_pacientov = vyhodnot_pravidla(kody["maska"])
+            st.dataframe(pd.concat([df[["id"]], kategorie_pacientov], axis=1))
     else:
         col = mutacie[selected]
         if col in df.columns:
-            genotypy = premapuj_na_genotyp(df[col])
-            counts = genotypy.value_counts(normalize=True).round(3) * 100
-            counts.index = counts.index.map(lambda x: genotyp_label.get(x, x))
-            total = len(genotypy)
-            pren = genotypy.isin(["wt/mut", "mut/mut"]).sum()
-            pred = genotypy.eq("mut/mut").sum()
-            st.markdown(f"- **Prenášači**: {pren} pacientov ({(pren/total)*100:.1f} %)")
-            st.markdown(f"- **Predispozícia**: {pred} pacientov ({(pred/total)*100:.1f} %)")
-            st.dataframe(counts.rename("Percentá").to_frame())
+            pocty = tabulka(kocka, selected, bez_neznamych=False)
+            total = pocty.sum()
+            pren = pocty["wt/mut"] + pocty["mut/mut"]
+            pred = pocty["mut/mut"]
+            (pren_od, pred_od), (pren_do, pred_do) = interval_podielu(np.array([pren, pred]), total, metoda=metoda_is)
+            st.markdown(f"- **Prenášači**: {pren} pacientov ({(pren/total)*100:.1f} %, 95% IS {pren_od*100:.1f}–{pren_do*100:.1f} %)")
+            st.markdown(f"- **Predispozícia**: {pred} pacientov ({(pred/total)*100:.1f} %, 95% IS {pred_od*100:.1f}–{pred_do*100:.1f} %)")
+            st.dataframe(percenta_s_intervalom(pocty).rename(columns={"Percento": "Percentá"}))
         else:
             st.warning(f"Mutácia {selected} nie je dostupná v datasete.")
 
     st.header("📚 Súvislosť HFE mutácií s pečeňovými diagnózami")
 
-    df["pecen_diag"] = df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"])
-
     for mut, col in mutacie.items():
         st.subheader(f"Mutácia {mut}")
-        genotypy = premapuj_na_genotyp(df[col])
-        kont_tab = pd.crosstab(genotypy, df["pecen_diag"])
-        kont_tab.index = kont_tab.index.map(lambda x: genotyp_label.get(x, x))
+        kont_tab = tabulka_z_poctov(kontingencna(kocka, mut), nazov=mut)
         st.dataframe(kont_tab)
 
-        if kont_tab.shape == (3, 2):  # 3x2
-            chi2_stat, pval, dof, expected = chi2_contingency(kont_tab)
-            st.markdown(f"Chi² test pre 3x2 tabuľku – p-hodnota: `{pval:.4f}` {'(významné)' if pval < 0.05 else '(nevýznamné)'})")
-        elif kont_tab.shape == (2, 2):  # binárna mutácia
-            chi2_stat, pval, dof, expected = chi2_contingency(kont_tab)
-            st.markdown(f"Chi² test pre 2x2 tabuľku – p-hodnota: `{pval:.4f}` {'(významné)' if pval < 0.05 else '(nevýznamné)'})")
+        vysledok = vyhodnot_tabulku(mut, kont_tab)
+        if vysledok["Test"] == "–":
+            st.warning("❗ Tabuľka má menej ako 2 riadky alebo stĺpce – test nemožno vykonať.")
         else:
-            st.warning("❗ Neštandardný tvar tabuľky – chi² test nemožno spoľahlivo vykonať.")
+            st.markdown(f"{vysledok['Test']} test – p-hodnota: `{vysledok['p-hodnota']:.4f}` ({vysledok['Významnosť']})")
 
 # =================== Sekcia: Grafy ===================
 elif vyber_sekciu == "Grafy":
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set(style="whitegrid")
+
+    # Pomocná funkcia na premapovanie zakódovaných výsledkov na genotypy
+    def premapuj_na_genotyp(mut):
+        genotypy = pd.Series(dekoduj(kody[mut]), index=df.index, name=mutacie[mut])
+        return genotypy.cat.add_categories("neznamy").fillna("neznamy")
+
+    # Stĺpcový graf z rezu kocky: Series (genotyp -> počet) alebo DataFrame (genotyp x skupina)
+    def graf_poctov(ax, pocty, legenda=None):
+        if isinstance(pocty, pd.Series):
+            sns.barplot(x=pocty.index, y=pocty.to_numpy(), ax=ax)
+        else:
+            dlhe = pocty.stack().rename("pocet").reset_index()
+            sns.barplot(data=dlhe, x=dlhe.columns[0], y="pocet", hue=dlhe.columns[1], ax=ax)
+            ax.legend(title=legenda)
+
     st.header("📊 Grafy - rozdelenie genotypov, veku, pohlavia a diagnóz")
 
     selected_mut = st.selectbox(
@@ -236,12 +340,12 @@ elif vyber_sekciu == "Grafy":
     if selected_mut != "Porovnať všetky":
         col = mutacie[selected_mut]
         if col in df.columns:
-            genotypy = premapuj_na_genotyp(df[col])
+            genotypy = premapuj_na_genotyp(selected_mut)
 
             # 1. Rozdelenie genotypov
             st.subheader("📊 Rozdelenie genotypov")
             fig1, ax1 = plt.subplots()
-            sns.countplot(x=genotypy.map(lambda x: genotyp_label.get(x, x)), ax=ax1, order=[genotyp_label["wt/wt"], genotyp_label["wt/mut"], genotyp_label["mut/mut"]])
+            graf_poctov(ax1, genotypy_z_kocky(selected_mut))
             ax1.set_xlabel("Genotyp")
             ax1.set_ylabel("Počet pacientov")
             st.pyplot(fig1)
@@ -257,19 +361,18 @@ elif vyber_sekciu == "Grafy":
             # 3. Vzťah genotypu a pohlavia
             st.subheader("🚻 Pohlavie podľa genotypu")
             fig3, ax3 = plt.subplots()
-            sns.countplot(x=genotypy.map(lambda x: genotyp_label.get(x, x)), hue=df["Pohlavie"], ax=ax3, order=[genotyp_label["wt/wt"], genotyp_label["wt/mut"], genotyp_label["mut/mut"]])
+            graf_poctov(ax3, genotypy_z_kocky(selected_mut, "pohlavie"), legenda="Pohlavie")
             ax3.set_xlabel("Genotyp")
             ax3.set_ylabel("Počet pacientov")
             st.pyplot(fig3)
 
             # 4. Vzťah genotypu a pečeňových ochorení
             st.subheader("🩺 Diagnózy podľa genotypu (pečeňové ochorenia)")
-            df["pecen_diag"] = df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"])
             fig4, ax4 = plt.subplots()
-            sns.countplot(x=genotypy.map(lambda x: genotyp_label.get(x, x)), hue=df["pecen_diag"], ax=ax4, order=[genotyp_label["wt/wt"], genotyp_label["wt/mut"], genotyp_label["mut/mut"]])
+            graf_poctov(ax4, genotypy_z_kocky(selected_mut, "pecen_diag").rename(columns={False: "Nie", True: "Áno"}),
+                        legenda="Pečeňové ochorenie")
             ax4.set_xlabel("Genotyp")
             ax4.set_ylabel("Počet pacientov")
-            ax4.legend(title="Pečeňové ochorenie", labels=["Nie", "Áno"])
             st.pyplot(fig4)
     else:
         # POROVNANIE VŠETKÝCH
@@ -277,9 +380,8 @@ elif vyber_sekciu == "Grafy":
         cols = st.columns(len(mutacie))
         for i, (mut_key, col_name) in enumerate(mutacie.items()):
             with cols[i]:
-                genotypy = premapuj_na_genotyp(df[col_name])
                 fig, ax = plt.subplots()
-                sns.countplot(x=genotypy.map(lambda x: genotyp_label.get(x, x)), ax=ax, order=[genotyp_label["wt/wt"], genotyp_label["wt/mut"], genotyp_label["mut/mut"]])
+                graf_poctov(ax, genotypy_z_kocky(mut_key))
                 ax.set_title(f"{mut_key}")
                 ax.set_xlabel("")
                 ax.set_ylabel("")
@@ -289,7 +391,7 @@ elif vyber_sekciu == "Grafy":
         cols = st.columns(len(mutacie))
         for i, (mut_key, col_name) in enumerate(mutacie.items()):
             with cols[i]:
-                genotypy = premapuj_na_genotyp(df[col_name])
+                genotypy = premapuj_na_genotyp(mut_key)
                 fig, ax = plt.subplots()
                 sns.boxplot(x=genotypy.map(lambda x: genotyp_label.get(x, x)), y=df["vek"], ax=ax, order=[genotyp_label["wt/wt"], genotyp_label["wt/mut"], genotyp_label["mut/mut"]])
                 ax.set_title(f"{mut_key}")
@@ -301,30 +403,29 @@ elif vyber_sekciu == "Grafy":
         cols = st.columns(len(mutacie))
         for i, (mut_key, col_name) in enumerate(mutacie.items()):
             with cols[i]:
-                genotypy = premapuj_na_genotyp(df[col_name])
                 fig, ax = plt.subplots()
-                sns.countplot(x=genotypy.map(lambda x: genotyp_label.get(x, x)), hue=df["Pohlavie"], ax=ax, order=[genotyp_label["wt/wt"], genotyp_label["wt/mut"], genotyp_label["mut/mut"]])
+                graf_poctov(ax, genotypy_z_kocky(mut_key, "pohlavie"), legenda="Pohlavie")
                 ax.set_title(f"{mut_key}")
                 ax.set_xlabel("")
                 ax.set_ylabel("")
                 st.pyplot(fig)
 
         st.subheader("🩺 Diagnózy podľa genotypu (pečeňové ochorenia) (všetky mutácie)")
-        df["pecen_diag"] = df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"])
         cols = st.columns(len(mutacie))
         for i, (mut_key, col_name) in enumerate(mutacie.items()):
             with cols[i]:
-                genotypy = premapuj_na_genotyp(df[col_name])
                 fig, ax = plt.subplots()
-                sns.countplot(x=genotypy.map(lambda x: genotyp_label.get(x, x)), hue=df["pecen_diag"], ax=ax, order=[genotyp_label["wt/wt"], genotyp_label["wt/mut"], genotyp_label["mut/mut"]])
+                graf_poctov(ax, genotypy_z_kocky(mut_key, "pecen_diag").rename(columns={False: "Nie", True: "Áno"}),
+                            legenda="Pečeňové ochorenie")
                 ax.set_title(f"{mut_key}")
                 ax.set_xlabel("")
                 ax.set_ylabel("")
-                ax.legend(title="Pečeňové ochorenie", labels=["Nie", "Áno"])
                 st.pyplot(fig)
 
 # =================== Sekcia: Analýza MKCH-10 ===================
 elif vyber_sekciu == "Analýza diagnóz podľa MKCH-10":
+    from analyza_HFE_genu.diagnozy_MKCH_10 import skupina_a_rok
+    from analyza_HFE_genu.asociacny_sken import asociacny_sken, volcano_graf, HRANICA_FDR
     st.header("📋 Analýza diagnóz podľa MKCH-10 a ich vývoj v čase")
 
     # Skontroluj či existuje stĺpec s diagnózami
@@ -332,31 +433,14 @@ elif vyber_sekciu == "Analýza diagnóz podľa MKCH-10":
         st.error("Dataset neobsahuje stĺpec 'diagnoza MKCH-10'.")
         st.stop()
 
-    # 1. Roztriedenie podľa prvého písmena MKCH-10
-    df["mkch10_prve_pismeno"] = df["diagnoza MKCH-10"].str[0]
-
-    skupiny = {
-        "K": "Gastro a pečeň",
-        "E": "Metabolické",
-        "D": "Hematológia",
-        "B": "Infekcie",
-        "C": "Novotvary",
-        "Z": "Iné zdravotné faktory"
-    }
-
-    df["skupina_diag"] = df["mkch10_prve_pismeno"].map(skupiny).fillna("Ostatné")
-
-    # 2. Vývoj v čase (extrahovanie roka z prijem_vzorky)
-    try:
-        df["rok_prijmu"] = pd.to_datetime(df["prijem_vzorky"], errors="coerce").dt.year
-    except:
-        st.warning("Nebol nájdený stĺpec 'prijem_vzorky' alebo je chybný formát.")
-        df["rok_prijmu"] = None
+    # 1. Roztriedenie podľa prvého písmena MKCH-10 a rok prijatia vzorky (rovnako ako v reporte)
+    df["skupina_diag"], df["rok_prijmu"] = skupina_a_rok(df)
 
-    # Zobrazenie počtu diagnóz podľa rokov
+    # 2. Vývoj v čase – rez kocky rok x skupina diagnóz
     st.subheader("📅 Vývoj počtu diagnostikovaných pacientov v čase")
-    if df["rok_prijmu"].notna().any():
-        diag_time = df.groupby(["rok_prijmu", "skupina_diag"]).size().unstack(fill_value=0)
+    diag_time = tabulka(kocka, "rok", "skupina_diag")
+    diag_time = diag_time.loc[:, diag_time.sum() > 0]
+    if len(diag_time) > 0:
         st.line_chart(diag_time)
     else:
         st.warning("Chýbajú informácie o dátumoch prijatia vzoriek.")
@@ -394,16 +478,102 @@ elif vyber_sekciu == "Analýza diagnóz podľa MKCH-10":
     else:
         st.success("✅ V datasete sa nenachádzajú žiadne zastarané MKCH-10 kódy.")
 
+    # 5. Asociačný sken všetkých kódov proti genotypom (nad aktuálnou kohortou)
+    st.subheader("🌋 Asociačný sken diagnóz a genotypov")
+    sken = asociacny_sken(df, kody)
+    vyznamne = sken["q-hodnota"] < HRANICA_FDR
+    st.markdown(f"Testovaných dvojíc: **{sken['p-hodnota'].notna().sum()}**, významných po FDR (q < {HRANICA_FDR}): **{vyznamne.sum()}**")
+    st.dataframe(sken)
+    st.pyplot(volcano_graf(sken))
+
+# =================== Sekcia: Kombinácie genotypov a haplotypy ===================
+elif vyber_sekciu == "Kombinácie genotypov a haplotypy":
+    from analyza_HFE_genu.haplotypy_HFE import analyza_lokusov
+    st.header("🧩 Kombinácie genotypov a haplotypy")
+
+    # Spoločné rozdelenie genotypov je marginála kocky cez mutácie (bez neznámych genotypov)
+    mutacie_lokusov = [mut for mut in MUTACIE if mut in mutacie]
+    pocty_lokusov = marginal(kocka, mutacie_lokusov)[(slice(0, len(poradie_genotypov)),) * len(mutacie_lokusov)].ravel()
+    lokusy = analyza_lokusov(pocty_lokusov, mutacie_lokusov)
+
+    st.subheader("Kombinácie genotypov")
+    st.dataframe(lokusy["kombinacie"])
+
+    st.subheader("Frekvencie haplotypov")
+    st.caption(f"Odhad EM algoritmom ({lokusy['iteracie_em']} iterácií)")
+    st.dataframe(lokusy["haplotypy"])
+
+    st.subheader("Väzbová nerovnováha")
+    st.dataframe(lokusy["vazbova_nerovnovaha"])
+
+# =================== Sekcia: Stratifikovaná analýza ===================
+elif vyber_sekciu == "Stratifikovaná analýza":
+    from analyza_HFE_genu.stratifikovana_analyza import STRATIFIKATORY, stratifikovana_analyza
+    st.header("🧮 Stratifikovaná analýza")
+
+    stratifikatory = st.multiselect(
+        "Stratifikovať podľa", list(STRATIFIKATORY), default=["vekova_skupina", "pohlavie"],
+        format_func=STRATIFIKATORY.get
+    )
+    if not stratifikatory:
+        st.info("Vyberte aspoň jeden stratifikátor.")
+    else:
+        # Všetky strátá naraz z kocky aktuálnej kohorty
+        stratifikacia = stratifikovana_analyza(kocka, stratifikatory, [mut for mut in MUTACIE if mut in mutacie])
+
+        st.subheader("Súvislosť s pečeňovými diagnózami spojená cez strátá (CMH)")
+        st.dataframe(stratifikacia["cmh"])
+
+        st.subheader("Výsledky pre jednotlivé strátá")
+        mut_strat = st.selectbox("Mutácia", stratifikacia["cmh"]["Mutácia"].tolist())
+        st.dataframe(stratifikacia["strata"][stratifikacia["strata"]["Mutácia"] == mut_strat])
+
 # ===== Export sekcia v Sidebare =====
 st.sidebar.header("📤 Export reportu")
 
+from prototyp import fronta_reportov
+
+@st.cache_resource
+def fronta():
+    """Jedna fronta reportov pre všetky relácie – rovnaké požiadavky sa zlúčia."""
+    return fronta_reportov.nova_fronta()
+
+# Interval, v ktorom sa dashboard pýta na stav bežiaceho reportu
+INTERVAL_STAVU_REPORTU = 1
+
 if st.sidebar.button("Exportovať report (.docx)"):
-    with st.spinner("🛠️ Generuje sa Word report..."):
-        report_path = export_report.generate_report()
-        with open(report_path, "rb") as f:
-            st.sidebar.download_button(
-                label="📄 Stiahnúť report",
-                data=f,
-                file_name="Analyza_HFE_gen.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
+    # Report sa zostaví z vybranej kohorty, ako ju ukazuje dashboard; výber riadkov je súčasťou
+    # kľúča požiadavky, aby sa reporty rôznych kohort nezlúčili
+    df_reportu = df[stlpce_datasetu]
+    cely_dataset = bool(maska_kohorty.all())
+    hash_kohorty = hash_obsahu if cely_dataset else hashlib.sha256(hash_obsahu.encode() + maska_kohorty.tobytes()).hexdigest()
+    st.session_state["uloha_reportu"] = fronta_reportov.zadaj_report(fronta(), df=df_reportu, hash_datasetu=hash_kohorty)
+    st.session_state["popis_reportu"] = "celý dataset" if cely_dataset else f"kohorta {len(df_reportu)} z {len(maska_kohorty)} pacientov"
+
+def stav_reportu(sleduje):
+    """Priebeh reportu; po dokončení sa aplikácia prekreslí, aby sa prestal sledovať stav."""
+    uloha = fronta_reportov.stav_ulohy(fronta(), st.session_state["uloha_reportu"])
+    if uloha is None:
+        st.info("Report už nie je k dispozícii, vytvorte ho znova.")
+    elif uloha["stav"] in (fronta_reportov.CAKA, fronta_reportov.BEZI):
+        posledny = f" – {uloha['hotove_kroky'][-1]}" if uloha["hotove_kroky"] else ""
+        st.progress(uloha["podiel"], text=f"🛠️ Report {uloha['stav']}: {len(uloha['hotove_kroky'])}/{uloha['pocet_krokov']}{posledny}")
+    elif sleduje:
+        st.rerun()
+    elif uloha["stav"] == fronta_reportov.CHYBA:
+        st.error(f"Report sa nepodarilo vytvoriť: {uloha['chyba']}")
+    else:
+        popis = st.session_state.get("popis_reportu", "celý dataset")
+        st.download_button(
+            label=f"📄 Stiahnúť report ({popis})",
+            data=uloha["vysledok"],
+            file_name="Analyza_HFE_gen.docx" if popis == "celý dataset" else "Analyza_HFE_gen_kohorta.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+
+if "uloha_reportu" in st.session_state:
+    uloha = fronta_reportov.stav_ulohy(fronta(), st.session_state["uloha_reportu"])
+    sleduje = uloha is not None and uloha["stav"] in (fronta_reportov.CAKA, fronta_reportov.BEZI)
+    with st.sidebar:
+        # Kým report beží, prekresľuje sa len tento fragment, nie celý dashboard
+        st.fragment(stav_reportu, run_every=INTERVAL_STAVU_REPORTU if sleduje else None)(sleduje)
@@ -1,24 +1,147 @@
+import io
 import os
-import sys
+import re
+import time
+import importlib
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from analyza_HFE_genu.kodovanie_genotypov import zakoduj_genotypy
+from analyza_HFE_genu import cache_artefaktov
+from analyza_HFE_genu.vysledky_analyz import ADRESAR_TABULIEK, spoj_vysledky, uloz_vysledok
+from analyza_HFE_genu.ulozisko_datasetu import CESTA_DATASETU, nacitaj_dataset, stlpce_datasetu
 
-script_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "analyza_HFE_genu"))
-sys.path.append(script_dir)
+# python-docx a moduly fáz (matplotlib, seaborn, scipy) sa načítajú až pri použití:
+# import tohto modulu (dashboard, pracovné procesy) je lacný a proces fázy
+# načíta len modul svojej fázy.
 
-from Hardy_Weinbergova_rovnovaha import generate_hwe_tables
-from percentualne_ohodnotenie_mutaci import generate_percenta_genotypov
-from suvislost_HFE_mut import generate_suvislosti_diag
-from graficka_reprezentacia import generate_graphs
-from diagnozy_MKCH_10 import generate_mkch10_analysis
+# Stĺpce očisteného datasetu, s ktorými pracujú analýzy (pohlavie pod každým názvom z STLPCE_POHLAVIA)
+STLPCE_ANALYZY = [
+    "pohavie", "pohlavie", "Pohlavie", "vek", "diagnoza MKCH-10",
+    "HFE C187G (H63D) [HFE]", "HFE A193T (S65C) [HFE]", "HFE G845A (C282Y) [HFE]",
+    "validovany_vysledok", "prijem_vzorky"
+]
+
+# Nezávislé fázy analýzy: názov -> (modul v analyza_HFE_genu, funkcia, či potrebuje zakódované genotypy)
+FAZY_ANALYZY = {
+    "HWE": ("Hardy_Weinbergova_rovnovaha", "generate_hwe_tables", True),
+    "Percentá": ("percentualne_ohodnotenie_mutaci", "generate_percenta_genotypov", True),
+    "Súvislosť": ("suvislost_HFE_mut", "generate_suvislosti_diag", True),
+    "Grafy": ("graficka_reprezentacia", "generate_graphs", True),
+    "MKCH-10": ("diagnozy_MKCH_10", "generate_mkch10_analysis", False),
+    "Asociačný sken": ("asociacny_sken", "generate_asociacny_sken", True),
+    "Haplotypy": ("haplotypy_HFE", "generate_haplotypy", True),
+    "Stratifikácia": ("stratifikovana_analyza", "generate_stratifikovana_analyza", True),
+}
+
+# Fázy, ktoré si samy otvárajú procesy (parameter max_workers); výsledok od počtu procesov nezávisí
+FAZY_S_PROCESMI = {"Grafy"}
+
+# Kroky reportu pre hlásenie priebehu: fázy analýzy a zostavenie dokumentu
+ZOSTAVENIE_DOKUMENTU = "Zostavenie dokumentu"
+KROKY_REPORTU = list(FAZY_ANALYZY) + [ZOSTAVENIE_DOKUMENTU]
+
+# Riadiace znaky okrem tabulátora a nových riadkov, náhradné znaky UTF-16 a U+FFFE/U+FFFF
+_NEPOVOLENE_V_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+_TABULATOR_A_RIADKY = re.compile("([\t\r\n])")
+
+def _spusti_fazu(nazov, df, kody, kluc=None, max_workers_fazy=None):
+    """Spustí jednu fázu nad vlastnou kópiou datasetu; vráti jej výsledok a čas behu."""
+    modul, nazov_funkcie, potrebuje_kody = FAZY_ANALYZY[nazov]
+    funkcia = getattr(importlib.import_module(f"analyza_HFE_genu.{modul}"), nazov_funkcie)
+    parametre = {"ulozit": False}
+    if max_workers_fazy is not None and nazov in FAZY_S_PROCESMI:
+        parametre["max_workers"] = max_workers_fazy
+    zaciatok = time.perf_counter()
+    if potrebuje_kody:
+        vysledok = funkcia(df, kody, **parametre)
+    else:
+        vysledok = funkcia(df, **parametre)
+    trvanie = time.perf_counter() - zaciatok
+
+    if kluc is not None:
+        cache_artefaktov.uloz(kluc, vysledok)
+    return vysledok, trvanie
+
+def spusti_analyzy(df, kody, max_workers=None, pouzit_cache=True, priebeh=None, max_workers_fazy=None, mp_context=None):
+    """Spustí fázy analýzy paralelne v procesoch; vráti výsledky a časy jednotlivých fáz.
+
+    Fázy menia stĺpce datasetu, preto každá pracuje so svojou kópiou
+    (v procese dostane vlastnú, pri sekvenčnom behu sa kopíruje).
+    Fázy, ktorých výsledok je v cache pre rovnaký obsah datasetu, sa nespúšťajú.
+    priebeh(nazov) sa zavolá po dokončení každej fázy; max_workers_fazy obmedzí procesy
+    fáz, ktoré si otvárajú vlastné (napr. pri hromadnom behu, kde sú paralelné datasety).
+    Pri behu fáz v procesoch sú fázy bez určeného max_workers_fazy jednoprocesové,
+    aby vnorené pooly nevytvorili viac procesov ako jadier. mp_context je kontext
+    multiprocessing pre procesy fáz (napr. spawn, keď sa spúšťa z vlákna).
+    """
+    if priebeh is None:
+        priebeh = lambda nazov: None
+    vysledky, casy = {}, {}
+    kluce = {nazov: None for nazov in FAZY_ANALYZY}
+
+    if pouzit_cache:
+        hash_dat = cache_artefaktov.hash_datasetu(df)
+        for nazov in FAZY_ANALYZY:
+            # Zapojenie fáz (FAZY_ANALYZY, parametre) je v tomto súbore, aj ten určuje výsledok
+            kluc = cache_artefaktov.kluc_artefaktu(hash_dat, nazov, zdroje=(os.path.abspath(__file__),))
+            vysledok = cache_artefaktov.obnov(kluc)
+            if vysledok is not None:
+                vysledky[nazov], casy[nazov] = vysledok, 0.0
+                del kluce[nazov]
+                priebeh(nazov)
+            else:
+                kluce[nazov] = kluc
+
+    if kluce:
+        if max_workers is None:
+            max_workers = min(len(kluce), os.cpu_count() or 1)
+
+        if max_workers <= 1:
+            for nazov, kluc in kluce.items():
+                vysledky[nazov], casy[nazov] = _spusti_fazu(nazov, df.copy(), kody, kluc, max_workers_fazy)
+                priebeh(nazov)
+        else:
+            if max_workers_fazy is None:
+                max_workers_fazy = 1
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+                buduce = {executor.submit(_spusti_fazu, nazov, df, kody, kluc, max_workers_fazy): nazov for nazov, kluc in kluce.items()}
+                for f in as_completed(buduce):
+                    nazov = buduce[f]
+                    vysledky[nazov], casy[nazov] = f.result()
+                    priebeh(nazov)
+
+    # Výsledky v poradí fáz, nie v poradí dokončenia
+    return {nazov: vysledky[nazov] for nazov in FAZY_ANALYZY}, casy
+
+def _text_pre_xml(text):
+    """Text bez znakov, ktoré XML 1.0 nepovoľuje (python-docx by na ne vyhodil chybu)."""
+    return _NEPOVOLENE_V_XML.sub("", str(text))
+
+def _bunka_xml(text, sirka):
+    """XML jednej bunky tabuľky (rovnaké ako cell.text = text v python-docx).
+
+    Tabulátor sa zapíše ako <w:tab/>, nový riadok (\n aj \r) ako <w:br/>.
+    """
+    obsah = []
+    for cast in _TABULATOR_A_RIADKY.split(_text_pre_xml(text)):
+        if cast == "\t":
+            obsah.append("<w:tab/>")
+        elif cast in ("\r", "\n"):
+            obsah.append("<w:br/>")
+        elif cast:
+            obsah.append(f'<w:t xml:space="preserve">{escape(cast)}</w:t>')
+    return f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{sirka}"/></w:tcPr><w:p><w:r>{"".join(obsah)}</w:r></w:p></w:tc>'
+
+def add_table_from_df(doc, df, title):
+    """Vloží tabuľku z DataFrame do dokumentu so zarámovaním buniek.
+
+    Riadky sa nepridávajú cez add_row().cells (python-docx pri každom prístupe prechádza
+    celú tabuľku), ale XML všetkých riadkov sa poskladá naraz a pripojí v jednom kroku.
+    """
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import qn, nsdecls
 
-def add_table_from_csv(doc, csv_path, title):
-    """Vloží tabuľku z CSV do dokumentu so zarámovaním buniek."""
-    df = pd.read_csv(csv_path, sep=";")
     doc.add_heading(title, level=2)
 
     table = doc.add_table(rows=1, cols=len(df.columns))
@@ -27,35 +150,84 @@ def add_table_from_csv(doc, csv_path, title):
     # Header
     hdr_cells = table.rows[0].cells
     for i, column_name in enumerate(df.columns):
-        hdr_cells[i].text = column_name
+        hdr_cells[i].text = _text_pre_xml(column_name)
 
     # Data
-    for _, row in df.iterrows():
-        row_cells = table.add_row().cells
-        for i, item in enumerate(row):
-            row_cells[i].text = str(item)
+    sirky = [cell._tc.tcPr.tcW.get(qn("w:w")) for cell in hdr_cells]
+    texty = df.to_numpy(dtype=object)
+    riadky_xml = "".join(
+        "<w:tr>" + "".join(_bunka_xml(text, sirka) for text, sirka in zip(riadok, sirky)) + "</w:tr>"
+        for riadok in texty
+    )
+    if riadky_xml:
+        table._tbl.extend(parse_xml(f"<w:tbl {nsdecls('w')}>{riadky_xml}</w:tbl>").findall(qn("w:tr")))
 
     doc.add_paragraph()
 
-def add_image(doc, image_path, title):
-    """Vloží obrázok do dokumentu."""
+def add_table_from_csv(doc, csv_path, title):
+    """Vloží tabuľku z CSV do dokumentu so zarámovaním buniek."""
+    add_table_from_df(doc, pd.read_csv(csv_path, sep=";"), title)
+
+def add_image(doc, image, title):
+    """Vloží obrázok (cesta alebo obrázok v pamäti) do dokumentu."""
+    from docx.shared import Inches
+
     doc.add_heading(title, level=2)
-    doc.add_picture(image_path, width=Inches(5))
+    if hasattr(image, "seek"):
+        image.seek(0)
+    doc.add_picture(image, width=Inches(5))
     doc.add_paragraph()
 
-def generate_report():
-    # === Cesty k súborom ===
-    cleaned_dataset_path = "sem_SSBU/SSBU25_dataset_cleaned.csv"
-    grafy_dir = "grafy"
-    tabulky_dir = "tabulky"
+def generate_report(max_workers=None, pouzit_cache=True, output_path=None, ulozit_subory=False, df=None, priebeh=None,
+                    cesta_datasetu=CESTA_DATASETU, max_workers_fazy=None, adresar_suborov=".", mp_context=None):
+    """Zostaví report z výsledkov analýz v pamäti a vráti ho ako io.BytesIO.
+
+    output_path: dokument sa navyše uloží aj na disk;
+    ulozit_subory: tabuľky a grafy analýz sa zapíšu aj do adresar_suborov/tabulky a grafy;
+    df: očistený dataset v pamäti (inak sa načíta z cesta_datasetu);
+    priebeh(krok): volá sa po každom dokončenom kroku z KROKY_REPORTU;
+    mp_context: kontext multiprocessing pre procesy fáz (pozri spusti_analyzy).
+    """
+    if df is None:
+        # Načítajú sa len stĺpce, ktoré analýzy potrebujú
+        vsetky_stlpce = stlpce_datasetu(cesta_datasetu)
+        df = nacitaj_dataset(cesta_datasetu, stlpce=[col for col in STLPCE_ANALYZY if col in vsetky_stlpce])
+    else:
+        vsetky_stlpce = list(df.columns)
+        df = df[[col for col in STLPCE_ANALYZY if col in vsetky_stlpce]]
+
+    # Genotypy sa zakódujú raz a zdieľajú ich všetky analýzy
+    kody = zakoduj_genotypy(df)
+
+    vysledky, _ = spusti_analyzy(
+        df, kody, max_workers=max_workers, pouzit_cache=pouzit_cache, priebeh=priebeh, max_workers_fazy=max_workers_fazy,
+        mp_context=mp_context,
+    )
+    vysledok = spoj_vysledky(vysledky.values())
+    if ulozit_subory:
+        uloz_vysledok(vysledok, adresar_suborov)
 
-    df = pd.read_csv(cleaned_dataset_path, sep=";", encoding="utf-8-sig")
-    
-    generate_hwe_tables(df)
-    generate_percenta_genotypov(df)
-    generate_suvislosti_diag(df)
-    generate_graphs(df)
-    generate_mkch10_analysis(df)
+    buffer = zostav_dokument(vysledok, len(df), vsetky_stlpce, adresar_suborov if ulozit_subory else None)
+    if output_path is not None:
+        with open(output_path, "wb") as f:
+            f.write(buffer.getvalue())
+    if priebeh is not None:
+        priebeh(ZOSTAVENIE_DOKUMENTU)
+    return buffer
+
+def _cesta_tabulky(adresar_suborov, nazov):
+    """Cesta k zapísanej tabuľke, ako ju uvádza dokument (bez "./" pre aktuálny priečinok)."""
+    return os.path.normpath(os.path.join(adresar_suborov, ADRESAR_TABULIEK, nazov))
+
+def zostav_dokument(vysledok, pocet_riadkov, vsetky_stlpce, adresar_suborov=None):
+    """Zostaví dokument reportu zo spojených výsledkov analýz; vráti ho ako io.BytesIO.
+
+    adresar_suborov: kam sa zapísali tabuľky analýz; len vtedy sa na ne dokument odvoláva.
+    """
+    from docx import Document
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+    tabulky, grafy, texty = vysledok["tabulky"], vysledok["grafy"], vysledok["texty"]
 
     # === Vytvor dokument ===
     doc = Document()
@@ -73,73 +245,117 @@ def generate_report():
     doc.add_paragraph("4. Súvislosť HFE mutácií s pečeňovými diagnózami")
     doc.add_paragraph("5. Grafy rozdelenia genotypov a ich vzťah k atribútom")
     doc.add_paragraph("6. Analýza diagnóz podľa MKCH-10")
+    doc.add_paragraph("7. Asociačný sken diagnóz MKCH-10")
+    doc.add_paragraph("8. Kombinácie genotypov a haplotypy")
+    doc.add_paragraph("9. Stratifikovaná analýza")
     doc.add_page_break()
 
     # === 1. Základné informácie ===
     doc.add_heading('1. Základné informácie o datasete', level=1)
-    doc.add_paragraph(f"Počet riadkov: {len(df)}")
-    doc.add_paragraph(f"Počet stĺpcov: {len(df.columns)}")
+    doc.add_paragraph(f"Počet riadkov: {pocet_riadkov}")
+    doc.add_paragraph(f"Počet stĺpcov: {len(vsetky_stlpce)}")
     doc.add_paragraph("Stĺpce:")
-    for col in df.columns:
+    for col in vsetky_stlpce:
         doc.add_paragraph(f"- {col}", style='List Bullet')
     doc.add_page_break()
 
     # === 2. Hardy-Weinbergova rovnováha ===
     doc.add_heading('2. Hardy-Weinbergova rovnováha', level=1)
-    hwe_path = os.path.join(tabulky_dir, "hardy_weinberg_test.csv")
-    if os.path.exists(hwe_path):
-        add_table_from_csv(doc, hwe_path, "Výsledky Hardy-Weinbergovho testu")
+    hwe = tabulky.get("hardy_weinberg_test.csv")
+    if hwe is not None:
+        add_table_from_df(doc, hwe, "Výsledky Hardy-Weinbergovho testu")
     else:
         doc.add_paragraph("Hardy-Weinbergove výsledky neboli nájdené.")
     doc.add_page_break()
 
     # === 3. Percentuálne zastúpenie genotypov a prenášači ===
     doc.add_heading('3. Percentá genotypov a prenášači', level=1)
-    percenta_path = os.path.join(tabulky_dir, "percenta_genotypov.csv")
-    pren_path = os.path.join(tabulky_dir, "prenasic_predispozicia.txt")
-
-    if os.path.exists(percenta_path):
-        add_table_from_csv(doc, percenta_path, "Percentá genotypov")
-    if os.path.exists(pren_path):
-        with open(pren_path, "r", encoding="utf-8") as f:
-            doc.add_paragraph(f.read())
+    percenta = tabulky.get("percenta_genotypov.csv")
+    if percenta is not None:
+        add_table_from_df(doc, percenta, "Percentá genotypov")
+    if "prenasic_predispozicia.txt" in texty:
+        doc.add_paragraph(texty["prenasic_predispozicia.txt"])
     doc.add_page_break()
 
     # === 4. Súvislosť HFE mutácií s pečeňovými diagnózami ===
     doc.add_heading('4. Súvislosť HFE mutácií s pečeňovými diagnózami', level=1)
-    suvislost_path = os.path.join(tabulky_dir, "vysledky_suvislosti.csv")
-    if os.path.exists(suvislost_path):
-        add_table_from_csv(doc, suvislost_path, "Výsledky súvislostí")
+    suvislost = tabulky.get("vysledky_suvislosti.csv")
+    if suvislost is not None:
+        add_table_from_df(doc, suvislost, "Výsledky súvislostí")
     for mut in ["H63D", "S65C", "C282Y"]:
-        graf_path = os.path.join(grafy_dir, f"graf_suvislost_{mut}.png")
-        if os.path.exists(graf_path):
-            add_image(doc, graf_path, f"Graf súvislosti pre mutáciu {mut}")
+        # Genotyp proti pečeňovej diagnóze kreslí fáza Grafy
+        graf = grafy.get(f"pecen_vs_genotyp_{mut}.png")
+        if graf is not None:
+            add_image(doc, graf, f"Graf súvislosti pre mutáciu {mut}")
     doc.add_page_break()
 
     # === 5. Grafy rozdelenia genotypov ===
     doc.add_heading('5. Grafy rozdelenia genotypov', level=1)
     for mut in ["H63D", "S65C", "C282Y"]:
-        for typ in ["rozdelenie", "vek_vs_genotyp", "pohlavie_vs_genotyp", "pecen_vs_genotyp"]:
-            graf_path = os.path.join(grafy_dir, f"{typ}_{mut}.png")
-            if os.path.exists(graf_path):
-                add_image(doc, graf_path, f"{typ.replace('_', ' ').capitalize()} – {mut}")
+        for typ in ["rozdelenie", "vek_vs_genotyp", "pohlavie_vs_genotyp"]:
+            graf = grafy.get(f"{typ}_{mut}.png")
+            if graf is not None:
+                add_image(doc, graf, f"{typ.replace('_', ' ').capitalize()} – {mut}")
     doc.add_page_break()
 
     # === 6. Analýza diagnóz podľa MKCH-10 ===
     doc.add_heading('6. Analýza diagnóz podľa MKCH-10', level=1)
-    mkch_path = os.path.join(tabulky_dir, "vyvoj_skupin_diagnoz.csv")
-    if os.path.exists(mkch_path):
-        add_table_from_csv(doc, mkch_path, "Vývoj diagnóz v čase")
-    mkch_graf_path = os.path.join(grafy_dir, "vyvoj_skupin_diagnoz.png")
-    if os.path.exists(mkch_graf_path):
-        add_image(doc, mkch_graf_path, "Graf vývoja skupín diagnóz")
-    zastarale_path = os.path.join(tabulky_dir, "zastarale_kody_diagnoz.csv")
-    if os.path.exists(zastarale_path):
-        add_table_from_csv(doc, zastarale_path, "Zastarané kódy diagnóz")
+    mkch = tabulky.get("vyvoj_skupin_diagnoz.csv")
+    if mkch is not None:
+        add_table_from_df(doc, mkch, "Vývoj diagnóz v čase")
+    mkch_graf = grafy.get("vyvoj_skupin_diagnoz.png")
+    if mkch_graf is not None:
+        add_image(doc, mkch_graf, "Graf vývoja skupín diagnóz")
+    zastarale = tabulky.get("zastarale_kody_diagnoz.csv")
+    if zastarale is not None:
+        add_table_from_df(doc, zastarale, "Zastarané kódy diagnóz")
     doc.add_page_break()
 
-    # === Ulož dokument ===
-    output_path = "HFE_gene_analysis_report.docx"
-    doc.save(output_path)
+    # === 7. Asociačný sken ===
+    doc.add_heading('7. Asociačný sken diagnóz MKCH-10', level=1)
+    popis = (
+        "Každý kód MKCH-10 a každá kapitola proti genotypu každej mutácie (chi² test, pomer šancí nosičov, "
+        "q-hodnota podľa Benjaminiho-Hochberga)."
+    )
+    if adresar_suborov is not None:
+        popis += f" Úplná tabuľka je v {_cesta_tabulky(adresar_suborov, 'asociacny_sken.csv')}."
+    doc.add_paragraph(popis)
+    sken = tabulky.get("asociacny_sken_top.csv")
+    if sken is not None:
+        add_table_from_df(doc, sken, "Najvýznamnejšie asociácie")
+    volcano = grafy.get("asociacny_sken_volcano.png")
+    if volcano is not None:
+        add_image(doc, volcano, "Volcano graf asociačného skenu")
+    doc.add_page_break()
+
+    # === 8. Kombinácie genotypov a haplotypy ===
+    doc.add_heading('8. Kombinácie genotypov a haplotypy', level=1)
+    for nazov, titulok in [
+        ("kombinacie_genotypov", "Kombinácie genotypov všetkých mutácií"),
+        ("haplotypy", "Frekvencie haplotypov (EM algoritmus)"),
+        ("vazbova_nerovnovaha", "Väzbová nerovnováha medzi dvojicami mutácií"),
+    ]:
+        tabulka = tabulky.get(f"{nazov}.csv")
+        if tabulka is not None:
+            add_table_from_df(doc, tabulka, titulok)
+    doc.add_page_break()
+
+    # === 9. Stratifikovaná analýza ===
+    doc.add_heading('9. Stratifikovaná analýza', level=1)
+    popis = (
+        "Súvislosť nosičstva s pečeňovými diagnózami spojená cez strátá vekových skupín a pohlavia "
+        "(Cochran-Mantel-Haenszel)."
+    )
+    if adresar_suborov is not None:
+        popis += f" Výsledky pre jednotlivé strátá sú v {_cesta_tabulky(adresar_suborov, 'stratifikacia.csv')}."
+    doc.add_paragraph(popis)
+    cmh = tabulky.get("stratifikacia_cmh.csv")
+    if cmh is not None:
+        add_table_from_df(doc, cmh, "Cochran-Mantel-Haenszel test")
+    doc.add_page_break()
 
-    return output_path
+    # === Dokument v pamäti ===
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
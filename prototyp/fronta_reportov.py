@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from analyza_HFE_genu import cache_artefaktov
+from analyza_HFE_genu.ulozisko_datasetu import CESTA_DATASETU, najdi_dataset
+from prototyp import export_report
+
+# Fronta reportov na pozadí: report sa zostavuje vo vlákne mimo skriptu Streamlitu,
+# dashboard sa len pýta na stav úlohy. Rovnaká požiadavka (rovnaký dataset a parametre),
+# ktorá ešte beží alebo je hotová, sa nespúšťa znova – vráti sa ID existujúcej úlohy.
+# Hotové úlohy sa držia v obmedzenej cache, najstaršie sa zahodia.
+
+# Počet reportov zostavovaných naraz (fázy každého reportu bežia ďalej v procesoch)
+MAX_SUBEZNYCH_REPORTOV = 2
+
+# Report sa zostavuje vo vlákne procesu, ktorý má aj iné vlákna (Streamlit). Proces vytvorený
+# cez fork by zdedil ich zámky v náhodnom stave a mohol by sa zaseknúť, preto procesy fáz
+# štartujú cez spawn (nový interpreter) a fázy si vlastné procesy neotvárajú.
+KONTEXT_PROCESOV = multiprocessing.get_context("spawn")
+MAX_HOTOVYCH_REPORTOV = 8
+
+CAKA = "čaká"
+BEZI = "beží"
+HOTOVO = "hotovo"
+CHYBA = "chyba"
+
+
+def nova_fronta(max_workers=MAX_SUBEZNYCH_REPORTOV, max_hotovych=MAX_HOTOVYCH_REPORTOV):
+    """Fronta reportov: vlákna, úlohy podľa ID a ID úloh podľa kľúča požiadavky."""
+    return {
+        "executor": ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report"),
+        "ulohy": OrderedDict(),
+        "kluce": {},
+        "zamok": threading.Lock(),
+        "max_hotovych": max_hotovych,
+    }
+
+
+def hash_suboru_datasetu(cesta=CESTA_DATASETU):
+    """Identita očisteného datasetu na disku (cesta, veľkosť, čas zmeny) bez čítania obsahu."""
+    cesta = najdi_dataset(cesta)
+    stat = os.stat(cesta)
+    return f"{os.path.abspath(cesta)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def kluc_poziadavky(hash_datasetu, parametre):
+    """Kľúč požiadavky z datasetu, parametrov reportu a verzie kódu analýz aj zostavenia reportu."""
+    kod = cache_artefaktov.verzia_kodu(dalsie_subory=(os.path.abspath(export_report.__file__),))
+    popis = {"dataset": hash_datasetu, "parametre": parametre, "kod": kod}
+    return hashlib.sha256(json.dumps(popis, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _uprac(fronta):
+    """Zahodí najstaršie hotové úlohy nad limit; čakajúce a bežiace sa nemažú. Volá sa pod zámkom."""
+    hotove = [id_ulohy for id_ulohy, uloha in fronta["ulohy"].items() if uloha["stav"] in (HOTOVO, CHYBA)]
+    for id_ulohy in hotove[:max(0, len(hotove) - fronta["max_hotovych"])]:
+        uloha = fronta["ulohy"].pop(id_ulohy)
+        if fronta["kluce"].get(uloha["kluc"]) == id_ulohy:
+            del fronta["kluce"][uloha["kluc"]]
+
+
+def _spusti_ulohu(fronta, id_ulohy, df, parametre):
+    uloha = fronta["ulohy"][id_ulohy]
+
+    def priebeh(krok):
+        with fronta["zamok"]:
+            uloha["hotove_kroky"].append(krok)
+
+    with fronta["zamok"]:
+        uloha["stav"] = BEZI
+        uloha["zaciatok"] = time.time()
+    try:
+        report = export_report.generate_report(
+            df=df, priebeh=priebeh, mp_context=KONTEXT_PROCESOV, **{"max_workers_fazy": 1, **parametre}
+        )
+    except Exception as e:
+        with fronta["zamok"]:
+            uloha["stav"], uloha["chyba"] = CHYBA, f"{type(e).__name__}: {e}"
+    else:
+        with fronta["zamok"]:
+            uloha["stav"], uloha["vysledok"] = HOTOVO, report.getvalue()
+    finally:
+        with fronta["zamok"]:
+            uloha["trvanie"] = time.time() - uloha["zaciatok"]
+            _uprac(fronta)
+
+
+def zadaj_report(fronta, df=None, hash_datasetu=None, **parametre):
+    """Zaradí report do fronty a hneď vráti ID úlohy.
+
+    df a hash_datasetu: očistený dataset v pamäti a hash jeho obsahu; bez nich sa report
+    zostaví z datasetu na disku. Ak rovnaká požiadavka čaká, beží alebo je hotová, vráti
+    sa ID tej úlohy; po chybe sa požiadavka spustí znova.
+    """
+    if df is None:
+        hash_datasetu = hash_suboru_datasetu()
+    kluc = kluc_poziadavky(hash_datasetu, parametre)
+
+    with fronta["zamok"]:
+        id_ulohy = fronta["kluce"].get(kluc)
+        if id_ulohy is not None and fronta["ulohy"][id_ulohy]["stav"] != CHYBA:
+            fronta["ulohy"].move_to_end(id_ulohy)
+            return id_ulohy
+
+        id_ulohy = uuid.uuid4().hex
+        fronta["ulohy"][id_ulohy] = {
+            "id": id_ulohy,
+            "kluc": kluc,
+            "stav": CAKA,
+            "hotove_kroky": [],
+            "pocet_krokov": len(export_report.KROKY_REPORTU),
+            "vysledok": None,
+            "chyba": None,
+            "zadana": time.time(),
+            "zaciatok": None,
+            "trvanie": None,
+        }
+        fronta["kluce"][kluc] = id_ulohy
+
+    fronta["executor"].submit(_spusti_ulohu, fronta, id_ulohy, df, parametre)
+    return id_ulohy
+
+
+def stav_ulohy(fronta, id_ulohy):
+    """Kópia stavu úlohy (None, ak neexistuje alebo už bola zahodená) s podielom hotových krokov."""
+    with fronta["zamok"]:
+        uloha = fronta["ulohy"].get(id_ulohy)
+        if uloha is None:
+            return None
+        stav = dict(uloha, hotove_kroky=list(uloha["hotove_kroky"]))
+    stav["podiel"] = len(stav["hotove_kroky"]) / stav["pocet_krokov"]
+    return stav
@@ -0,0 +1,126 @@
+import os
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from analyza_HFE_genu.priprava_datasetu import vycisti_po_castiach
+from prototyp import export_report
+
+# Hromadné reporty bez dashboardu: každý surový export (napr. nemocnica x mesiac) sa očistí
+# a spracuje celým reťazcom export_report v samostatnom procese. Každý dataset má vlastný
+# výstupný priečinok, takže behy sa navzájom neprepisujú. Súbežnosť je medzi datasetmi,
+# fázy jedného reportu bežia v jeho procese postupne.
+
+ADRESAR_VYSTUPU = "reporty"
+NAZOV_REPORTU = "HFE_gene_analysis_report.docx"
+NAZOV_DATASETU = "dataset_cleaned.parquet"
+
+
+def najdi_vstupy(vzory):
+    """Vstupné CSV súbory z priečinkov, glob vzorov alebo ciest (bez duplicít, v poradí zadania)."""
+    vstupy = []
+    for vzor in vzory:
+        if os.path.isdir(vzor):
+            vstupy.extend(sorted(glob.glob(os.path.join(vzor, "*.csv"))))
+        else:
+            vstupy.extend(sorted(glob.glob(vzor)) or ([vzor] if os.path.exists(vzor) else []))
+    return list(dict.fromkeys(os.path.abspath(cesta) for cesta in vstupy))
+
+
+def vystupne_adresare(vstupy, adresar_vystupu):
+    """Priečinok pre každý vstup podľa názvu súboru; rovnaké názvy dostanú poradové číslo."""
+    adresare, pouzite = {}, {}
+    for vstup in vstupy:
+        nazov = os.path.splitext(os.path.basename(vstup))[0]
+        pouzite[nazov] = pouzite.get(nazov, 0) + 1
+        if pouzite[nazov] > 1:
+            nazov = f"{nazov}_{pouzite[nazov]}"
+        adresare[vstup] = os.path.join(adresar_vystupu, nazov)
+    return adresare
+
+
+def spracuj_dataset(vstup, adresar, ulozit_subory=False, pouzit_cache=True):
+    """Očistí jeden surový export a zostaví z neho report; vráti riadok súhrnu (chyba sa nevyhadzuje)."""
+    os.makedirs(adresar, exist_ok=True)
+    riadok = {"Dataset": vstup, "Výstup": adresar, "Riadky": 0, "Očistené riadky": 0,
+              "Čistenie [s]": 0.0, "Report [s]": 0.0, "Spolu [s]": 0.0, "Chyba": ""}
+    zaciatok = time.perf_counter()
+    try:
+        cistenie = vycisti_po_castiach(vstup, os.path.join(adresar, NAZOV_DATASETU))
+        riadok["Riadky"], riadok["Očistené riadky"] = cistenie["precitane"], cistenie["zapisane"]
+        riadok["Čistenie [s]"] = cistenie["sekundy"]
+
+        zaciatok_reportu = time.perf_counter()
+        export_report.generate_report(
+            max_workers=1, max_workers_fazy=1, pouzit_cache=pouzit_cache,
+            cesta_datasetu=os.path.join(adresar, NAZOV_DATASETU),
+            output_path=os.path.join(adresar, NAZOV_REPORTU),
+            ulozit_subory=ulozit_subory, adresar_suborov=adresar,
+        )
+        riadok["Report [s]"] = time.perf_counter() - zaciatok_reportu
+    except Exception as e:
+        riadok["Chyba"] = f"{type(e).__name__}: {e}"
+    riadok["Spolu [s]"] = time.perf_counter() - zaciatok
+    return riadok
+
+
+def hromadny_report(vstupy, adresar_vystupu=ADRESAR_VYSTUPU, max_workers=None, ulozit_subory=False, pouzit_cache=True):
+    """Reporty pre všetky vstupy paralelne v procesoch; zapíše súhrn (suhrn.csv, suhrn.json) a vráti ho."""
+    adresare = vystupne_adresare(vstupy, adresar_vystupu)
+    os.makedirs(adresar_vystupu, exist_ok=True)
+    if max_workers is None:
+        max_workers = min(len(vstupy), os.cpu_count() or 1) or 1
+
+    zaciatok = time.perf_counter()
+    if max_workers <= 1:
+        riadky = [spracuj_dataset(vstup, adresare[vstup], ulozit_subory, pouzit_cache) for vstup in vstupy]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            buduce = [executor.submit(spracuj_dataset, vstup, adresare[vstup], ulozit_subory, pouzit_cache) for vstup in vstupy]
+            riadky = [f.result() for f in as_completed(buduce)]
+    trvanie = time.perf_counter() - zaciatok
+
+    # Súhrn v poradí vstupov, nie v poradí dokončenia
+    poradie = {vstup: i for i, vstup in enumerate(vstupy)}
+    tabulka = pd.DataFrame(sorted(riadky, key=lambda r: poradie[r["Dataset"]]),
+                           columns=["Dataset", "Výstup", "Riadky", "Očistené riadky",
+                                    "Čistenie [s]", "Report [s]", "Spolu [s]", "Chyba"])
+    uspesne = tabulka["Chyba"] == ""
+    suhrn = {
+        "datasety": len(tabulka),
+        "uspesne": int(uspesne.sum()),
+        "chyby": int((~uspesne).sum()),
+        "procesy": max_workers,
+        "sekundy": trvanie,
+        "datasetov_za_minutu": 60 * len(tabulka) / trvanie if trvanie > 0 else float("inf"),
+        "riadkov_za_sekundu": tabulka["Riadky"].sum() / trvanie if trvanie > 0 else float("inf"),
+    }
+
+    tabulka.to_csv(os.path.join(adresar_vystupu, "suhrn.csv"), index=False, sep=";", encoding="utf-8-sig")
+    with open(os.path.join(adresar_vystupu, "suhrn.json"), "w", encoding="utf-8") as f:
+        json.dump({**suhrn, "datasety_detail": tabulka.to_dict(orient="records")}, f, ensure_ascii=False, indent=2)
+    return suhrn, tabulka
+
+
+if __name__ == "__main__":
+    # Použitie: python -m prototyp.hromadny_report exporty/ "archiv/2025-*.csv" [--vystup reporty] [--procesy 8]
+    parser = argparse.ArgumentParser(description="Hromadné reporty HFE z viacerých surových exportov laboratória.")
+    parser.add_argument("vstupy", nargs="+", help="priečinky, glob vzory alebo CSV súbory")
+    parser.add_argument("--vystup", default=ADRESAR_VYSTUPU, help="priečinok pre reporty a súhrn")
+    parser.add_argument("--procesy", type=int, default=None, help="počet datasetov spracovaných naraz")
+    parser.add_argument("--subory", action="store_true", help="uložiť aj tabuľky a grafy analýz")
+    parser.add_argument("--bez-cache", action="store_true", help="nepoužiť cache výsledkov fáz")
+    args = parser.parse_args()
+
+    vstupy = najdi_vstupy(args.vstupy)
+    if not vstupy:
+        parser.error("nenašli sa žiadne vstupné súbory")
+
+    suhrn, tabulka = hromadny_report(vstupy, args.vystup, args.procesy, args.subory, not args.bez_cache)
+    for _, riadok in tabulka.iterrows():
+        stav = riadok["Chyba"] or f"{riadok['Spolu [s]']:.2f} s"
+        print(f"{riadok['Dataset']}: {riadok['Riadky']} riadkov, {stav}")
+    print(f"{suhrn['uspesne']}/{suhrn['datasety']} reportov za {suhrn['sekundy']:.2f} s "
+          f"({suhrn['datasetov_za_minutu']:.1f} datasetov/min, {suhrn['riadkov_za_sekundu']:.0f} riadkov/s)")
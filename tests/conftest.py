@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+VYSLEDKY = np.array(["normal", "heterozygot", "mutant", None], dtype=object)
+DIAGNOZY = np.array(["K76.0", "K75.9", "E83.1", "D68.8", "B19.9", "C22.0", "Z03.8", "R10.4", None], dtype=object)
+
+
+@pytest.fixture
+def maly_dataset():
+    """Malý očistený dataset s náhodnými genotypmi, pohlavím, vekom, diagnózami a dátumami."""
+    rng = np.random.default_rng(42)
+    n = 2000
+    vek = rng.uniform(0, 120, n).round(1)
+    vek[rng.random(n) < 0.03] = np.nan
+    datumy = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365, n), unit="D")
+    datumy = datumy.where(rng.random(n) > 0.02)
+    return pd.DataFrame({
+        "id": [f"{i:09d}" for i in range(n)],
+        "pohavie": pd.Categorical(rng.choice(np.array(["M", "Ž", None], dtype=object), n, p=[0.48, 0.48, 0.04])),
+        "vek": vek,
+        "diagnoza MKCH-10": rng.choice(DIAGNOZY, n),
+        "HFE C187G (H63D) [HFE]": rng.choice(VYSLEDKY, n, p=[0.7, 0.2, 0.07, 0.03]),
+        "HFE A193T (S65C) [HFE]": rng.choice(VYSLEDKY, n, p=[0.9, 0.07, 0.01, 0.02]),
+        "HFE G845A (C282Y) [HFE]": rng.choice(VYSLEDKY, n, p=[0.85, 0.1, 0.03, 0.02]),
+        "prijem_vzorky": datumy,
+    })
@@ -0,0 +1,59 @@
+import math
+import numpy as np
+import pytest
+from scipy.stats import chisquare
+from analyza_HFE_genu.Hardy_Weinbergova_rovnovaha import hwe_test_matica, hwe_exaktny_test
+
+POCTY = [
+    [50, 30, 20],
+    [100, 0, 0],
+    [0, 1, 0],
+    [3, 10, 1],
+    [980, 19, 1],
+    [12, 1, 9],
+    [1000, 500, 60],
+]
+
+
+def _exaktny_hrubou_silou(pocty):
+    """Exaktný HWE test priamo z pravdepodobností všetkých možných počtov heterozygotov."""
+    aa, ab, bb = pocty
+    n = aa + ab + bb
+    alela_a, alela_b = 2 * aa + ab, 2 * bb + ab
+
+    def log_p(het):
+        hom_a, hom_b = (alela_a - het) // 2, (alela_b - het) // 2
+        return (math.lgamma(n + 1) - math.lgamma(hom_a + 1) - math.lgamma(het + 1) - math.lgamma(hom_b + 1)
+                + het * math.log(2) + math.lgamma(alela_a + 1) + math.lgamma(alela_b + 1) - math.lgamma(2 * n + 1))
+
+    mozne = range(min(alela_a, alela_b) % 2, min(alela_a, alela_b) + 1, 2)
+    pravd = {het: math.exp(log_p(het)) for het in mozne}
+    return min(1.0, sum(p for p in pravd.values() if p <= pravd[ab] * (1 + 1e-7)))
+
+
+def test_exaktny_test_ako_enumeracia():
+    ocakavane = [_exaktny_hrubou_silou(p) for p in POCTY]
+    assert hwe_exaktny_test(POCTY) == pytest.approx(ocakavane, rel=1e-9)
+
+
+def test_exaktny_test_po_blokoch():
+    # Malý limit buniek rozdelí lokusy do viacerých blokov, výsledok sa nesmie zmeniť
+    assert hwe_exaktny_test(POCTY, max_buniek=50) == pytest.approx(hwe_exaktny_test(POCTY), rel=1e-12)
+
+
+def test_chi2_ako_scipy():
+    vysledok = hwe_test_matica(POCTY)
+    for i, pocty in enumerate(POCTY):
+        if min(pocty[0] + pocty[1], pocty[1] + pocty[2]) == 0:
+            continue  # monomorfný lokus, očakávané počty majú nuly
+        p = (2 * pocty[0] + pocty[1]) / (2 * sum(pocty))
+        ocakavane = np.array([p ** 2, 2 * p * (1 - p), (1 - p) ** 2]) * sum(pocty)
+        stat, p_hodnota = chisquare(pocty, ocakavane, ddof=1)
+        assert vysledok["chi2"][i] == pytest.approx(stat)
+        assert vysledok["p_hodnota"][i] == pytest.approx(p_hodnota)
+
+
+def test_prazdny_lokus():
+    vysledok = hwe_test_matica([[0, 0, 0], [10, 5, 1]], metoda="exaktny")
+    assert np.isnan(vysledok["chi2"][0]) and np.isnan(vysledok["p_hodnota"][0])
+    assert not np.isnan(vysledok["p_hodnota"][1])
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, false_discovery_control
+from analyza_HFE_genu.asociacny_sken import benjamini_hochberg, chi2_pola_tabuliek, chi2_tabuliek, asociacny_sken
+from analyza_HFE_genu.kodovanie_genotypov import zakoduj_genotypy
+
+
+def test_benjamini_hochberg_ako_scipy():
+    rng = np.random.default_rng(3)
+    p = np.concatenate([rng.uniform(size=200), rng.uniform(0, 1e-4, size=20), [0.5, 0.5, 1.0]])
+    assert benjamini_hochberg(p) == pytest.approx(false_discovery_control(p))
+
+    # NaN sa do počtu testov nerátajú
+    s_nan = np.insert(p, [3, 50], np.nan)
+    q = benjamini_hochberg(s_nan)
+    assert np.isnan(q[[3, 51]]).all()
+    assert q[~np.isnan(s_nan)] == pytest.approx(false_discovery_control(p))
+
+
+def test_chi2_pola_tabuliek_ako_scipy():
+    rng = np.random.default_rng(4)
+    tabulky = rng.integers(0, 30, size=(50, 3, 2))
+    tabulky[::7, 2] = 0  # prázdny riadok znižuje stupne voľnosti
+    statistika, stupne, p = chi2_pola_tabuliek(tabulky)
+    for i, tabulka in enumerate(tabulky):
+        tabulka = tabulka[tabulka.sum(axis=1) > 0][:, tabulka.sum(axis=0) > 0]
+        chi2, p_scipy, df_scipy, _ = chi2_contingency(tabulka, correction=False)
+        assert statistika[i] == pytest.approx(chi2)
+        assert stupne[i] == df_scipy
+        assert p[i] == pytest.approx(p_scipy)
+
+
+def test_chi2_pola_tabuliek_degenerovana():
+    statistika, stupne, p = chi2_pola_tabuliek(np.array([[[5, 3], [0, 0], [0, 0]]]))
+    assert stupne[0] == 0 and np.isnan(p[0])
+
+
+def test_chi2_tabuliek_ako_scipy():
+    rng = np.random.default_rng(4)
+    spolu = np.array([[400, 150, 30], [500, 80, 0]])  # druhý lokus bez mut/mut znižuje stupne voľnosti
+    s_diagnozou = rng.integers(0, spolu[:, :, None] + 1, size=(2, 3, 50))
+    statistika, stupne, p = chi2_tabuliek(s_diagnozou, spolu)
+    for lokus, j in [(0, 0), (0, 17), (1, 3), (1, 49)]:
+        tabulka = np.stack([s_diagnozou[lokus, :, j], spolu[lokus] - s_diagnozou[lokus, :, j]], axis=-1)
+        tabulka = tabulka[tabulka.sum(axis=1) > 0][:, tabulka.sum(axis=0) > 0]
+        chi2, p_scipy, df_scipy, _ = chi2_contingency(tabulka, correction=False)
+        assert statistika[lokus, j] == pytest.approx(chi2)
+        assert stupne[lokus, j] == df_scipy
+        assert p[lokus, j] == pytest.approx(p_scipy)
+
+
+def test_chi2_tabuliek_degenerovana():
+    statistika, stupne, p = chi2_tabuliek(np.array([[[5], [0], [0]]]), np.array([[8, 0, 0]]))
+    assert stupne[0, 0] == 0 and np.isnan(p[0, 0])
+
+
+def test_sken_ako_krizove_tabulky(maly_dataset):
+    vysledky = asociacny_sken(maly_dataset)
+    kody = zakoduj_genotypy(maly_dataset)
+    diagnozy = maly_dataset["diagnoza MKCH-10"].str.strip().str.upper()
+
+    for mut, uroven, diagnoza in [("C282Y", "kód", "K76.0"), ("H63D", "kapitola", "K"), ("S65C", "kód", "Z03.8")]:
+        riadok = vysledky[(vysledky["Mutácia"] == mut) & (vysledky["Úroveň"] == uroven)
+                          & (vysledky["Diagnóza"] == diagnoza)].iloc[0]
+        stlpec = diagnozy if uroven == "kód" else diagnozy.str[0]
+        znamy = (kody[mut] >= 0) & diagnozy.notna()
+        tabulka = pd.crosstab(kody[mut][znamy], stlpec[znamy] == diagnoza).to_numpy()
+        chi2, p, _, _ = chi2_contingency(tabulka, correction=False)
+        assert riadok["Chi²"] == pytest.approx(chi2)
+        assert riadok["p-hodnota"] == pytest.approx(p)
+        assert riadok["Počet s diagnózou"] == tabulka[:, 1].sum()
+
+        # Pomer šancí nosičov s Haldaneovou korekciou
+        a, b = tabulka[1:, 1].sum() + 0.5, tabulka[1:, 0].sum() + 0.5
+        c, d = tabulka[0, 1] + 0.5, tabulka[0, 0] + 0.5
+        assert riadok["OR nosičov"] == pytest.approx(a * d / (b * c))
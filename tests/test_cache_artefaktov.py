@@ -0,0 +1,34 @@
+import os
+from analyza_HFE_genu import cache_artefaktov
+
+
+def test_kluc_zavisi_od_dalsich_zdrojov(tmp_path):
+    zdroj = tmp_path / "zapojenie.py"
+    zdroj.write_text("FAZY = 1\n")
+    kluc = cache_artefaktov.kluc_artefaktu("d", "HWE", zdroje=(str(zdroj),))
+    assert kluc != cache_artefaktov.kluc_artefaktu("d", "HWE")
+
+    zdroj2 = tmp_path / "zapojenie2.py"
+    zdroj2.write_text("FAZY = 2\n")
+    assert kluc != cache_artefaktov.kluc_artefaktu("d", "HWE", zdroje=(str(zdroj2),))
+
+
+def test_obnov_a_uprac_znasaju_zmazanu_polozku(tmp_path, monkeypatch):
+    adresar = str(tmp_path)
+    cache_artefaktov.uloz("a", {"x": 1}, adresar)
+    cesta = os.path.join(adresar, "a" + cache_artefaktov.PRIPONA)
+
+    # Položku zmaže súbežné upratovanie medzi načítaním a utime
+    utime = os.utime
+    def utime_po_zmazani(p, *args, **kwargs):
+        os.remove(p)
+        return utime(p, *args, **kwargs)
+    monkeypatch.setattr(cache_artefaktov.os, "utime", utime_po_zmazani)
+    assert cache_artefaktov.obnov("a", adresar) == {"x": 1}
+    monkeypatch.undo()
+
+    cache_artefaktov.uloz("b", {"x": 2}, adresar)
+    cache_artefaktov.uloz("c", {"x": 3}, adresar)
+    cache_artefaktov.uprac(adresar, max_velkost=os.path.getsize(os.path.join(adresar, "c" + cache_artefaktov.PRIPONA)))
+    assert len([n for n in os.listdir(adresar) if n.endswith(cache_artefaktov.PRIPONA)]) == 1
+    assert not os.path.exists(cesta)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analyza_HFE_genu.dotazy_kohorty import indexuj_kohortu, vyber_kohortu, rozsah_datumov
+from analyza_HFE_genu.kocka_agregatov import postav_kocku, kocka_pre_riadky, tabulka
+
+
+def _maska_pandas(df, vek=None, pohlavie=None, prefix_diag=None, datum=None):
+    maska = pd.Series(True, index=df.index)
+    if vek is not None:
+        maska &= (df["vek"] >= vek[0]) & (df["vek"] < vek[1] + 1)
+    if pohlavie is not None:
+        maska &= df["pohavie"].isin(pohlavie)
+    if prefix_diag:
+        prefixy = [prefix_diag] if isinstance(prefix_diag, str) else prefix_diag
+        kody = df["diagnoza MKCH-10"].str.strip().str.upper()
+        maska &= kody.str.startswith(tuple(p.strip().upper() for p in prefixy)).fillna(False).astype(bool)
+    if datum is not None:
+        den = df["prijem_vzorky"].dt.normalize()
+        maska &= den.between(pd.Timestamp(datum[0]), pd.Timestamp(datum[1]))
+    return maska.to_numpy()
+
+
+@pytest.mark.parametrize("filtre", [
+    {},
+    {"vek": (30, 60)},
+    {"vek": (59.9, 59.9)},
+    {"pohlavie": ["Ž"]},
+    {"pohlavie": ["M", "Ž"], "vek": (0, 17.5)},
+    {"pohlavie": ["X"]},
+    {"prefix_diag": "k7"},
+    {"prefix_diag": ["K76", "E"]},
+    {"prefix_diag": "R10.4"},
+    {"datum": ("2011-03-01", "2012-02-29")},
+    {"vek": (18, 65), "pohlavie": ["M"], "prefix_diag": "K", "datum": ("2010-06-01", "2014-12-31")},
+])
+def test_vyber_kohortu_ako_pandas(maly_dataset, filtre):
+    index = indexuj_kohortu(maly_dataset)
+    assert (vyber_kohortu(index, **filtre) == _maska_pandas(maly_dataset, **filtre)).all()
+
+
+def test_rozsah_datumov(maly_dataset):
+    index = indexuj_kohortu(maly_dataset)
+    datumy = maly_dataset["prijem_vzorky"]
+    assert rozsah_datumov(index) == (datumy.min().date(), datumy.max().date())
+
+
+def test_vek_s_desatinnou_ciarkou():
+    df = pd.DataFrame({
+        "pohavie": ["M", "F", "F", "M"],
+        "vek": ["45,5", "59,70", "60.0", "abc"],
+        "diagnoza MKCH-10": ["K76.0", "E83.1", "K30", None],
+        "prijem_vzorky": ["14:36 04.01.2010", "2011-02-03", "", None],
+    }, dtype=str)
+    index = indexuj_kohortu(df)
+    assert vyber_kohortu(index, vek=(45.5, 59)).tolist() == [True, True, False, False]
+    assert vyber_kohortu(index, vek=(0, 120)).tolist() == [True, True, True, False]
+
+
+def test_kohorta_zo_surovych_retazcov(maly_dataset, tmp_path):
+    # Dataset načítaný len ako reťazce (bez typuj_dataset), vek s desatinnou čiarkou
+    cesta = tmp_path / "dataset.csv"
+    maly_dataset.to_csv(cesta, sep=";", index=False, decimal=",")
+    surovy = pd.read_csv(cesta, sep=";", dtype=str)
+    assert surovy["vek"].str.contains(",").any()
+
+    index, ocakavany = indexuj_kohortu(surovy), indexuj_kohortu(maly_dataset)
+    filtre = {"vek": (18, 65.5), "pohlavie": ["M"], "prefix_diag": "K", "datum": ("2010-06-01", "2014-12-31")}
+    assert (vyber_kohortu(index, **filtre) == vyber_kohortu(ocakavany, **filtre)).all()
+    assert (vyber_kohortu(index, **filtre) == _maska_pandas(maly_dataset, **filtre)).all()
+
+
+def test_horna_hranica_veku_ako_vekove_skupiny():
+    df = pd.DataFrame({"vek": [29.9, 30.0, 60.0, 60.5, 60.99, 61.0], "diagnoza MKCH-10": ["K30"] * 6})
+    assert vyber_kohortu(indexuj_kohortu(df), vek=(30, 60)).tolist() == [False, True, True, True, True, False]
+    # Kohorta 60-69 obsahuje práve pacientov vekovej skupiny "60-69" kocky
+    kocka = postav_kocku(df)
+    maska = vyber_kohortu(indexuj_kohortu(df), vek=(60, 69))
+    vekove_skupiny = tabulka(kocka_pre_riadky(kocka, maska), "vekova_skupina")
+    assert vekove_skupiny[vekove_skupiny > 0].to_dict() == {"60-69": 4}
@@ -0,0 +1,103 @@
+import io
+import os
+import threading
+import multiprocessing
+import pandas as pd
+import pytest
+from prototyp import export_report
+from analyza_HFE_genu.kodovanie_genotypov import zakoduj_genotypy
+from analyza_HFE_genu.vysledky_analyz import spoj_vysledky
+
+CESTA_DATASETU = os.path.join(os.path.dirname(__file__), "..", "sem_SSBU", "SSBU25_dataset_cleaned.csv")
+
+
+def _nacitaj_dataset():
+    df = pd.read_csv(CESTA_DATASETU, sep=";", encoding="utf-8-sig")
+    df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
+    return df
+
+
+def test_spusti_analyzy_paralelne_ako_sekvencne(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = _nacitaj_dataset()
+    kody = zakoduj_genotypy(df)
+    stlpce = list(df.columns)
+
+    vystupy = {}
+    for max_workers in (1, 2):
+        vysledky, casy = export_report.spusti_analyzy(df, kody, max_workers=max_workers, pouzit_cache=False)
+        assert list(vysledky) == list(export_report.FAZY_ANALYZY)
+        assert sorted(casy) == sorted(export_report.FAZY_ANALYZY)
+        assert all(cas >= 0 for cas in casy.values())
+        vystupy[max_workers] = spoj_vysledky(vysledky.values())
+
+    # Fázy pracujú s kópiou, dataset volajúceho sa nemení; výsledky ostávajú v pamäti
+    assert list(df.columns) == stlpce
+    assert list(tmp_path.iterdir()) == []
+
+    vysledok_1, vysledok_2 = vystupy[1], vystupy[2]
+    assert list(vysledok_1["grafy"]) == list(vysledok_2["grafy"]) and len(vysledok_1["grafy"]) > 0
+    assert vysledok_1["texty"] == vysledok_2["texty"]
+    assert list(vysledok_1["tabulky"]) == list(vysledok_2["tabulky"])
+    for nazov in vysledok_1["tabulky"]:
+        pd.testing.assert_frame_equal(vysledok_1["tabulky"][nazov], vysledok_2["tabulky"][nazov])
+
+
+def test_spusti_analyzy_z_vlakna_cez_spawn(tmp_path, monkeypatch):
+    # Tak spúšťa fázy fronta reportov: z vlákna, procesy cez spawn
+    monkeypatch.chdir(tmp_path)
+    df = _nacitaj_dataset()
+    kody = zakoduj_genotypy(df)
+    sekvencne, _ = export_report.spusti_analyzy(df, kody, max_workers=1, pouzit_cache=False)
+
+    vystup = {}
+    vlakno = threading.Thread(target=lambda: vystup.update(vysledky=export_report.spusti_analyzy(
+        df, kody, max_workers=2, pouzit_cache=False, mp_context=multiprocessing.get_context("spawn")
+    )[0]))
+    vlakno.start()
+    vlakno.join(timeout=300)
+    assert not vlakno.is_alive()
+
+    vysledok_1, vysledok_2 = spoj_vysledky(sekvencne.values()), spoj_vysledky(vystup["vysledky"].values())
+    assert list(vysledok_1["grafy"]) == list(vysledok_2["grafy"])
+    assert list(vysledok_1["tabulky"]) == list(vysledok_2["tabulky"])
+    for nazov in vysledok_1["tabulky"]:
+        pd.testing.assert_frame_equal(vysledok_1["tabulky"][nazov], vysledok_2["tabulky"][nazov])
+
+
+def test_zostav_dokument(tmp_path, monkeypatch):
+    from docx import Document
+
+    monkeypatch.chdir(tmp_path)
+    df = _nacitaj_dataset()
+    vysledky, _ = export_report.spusti_analyzy(df, zakoduj_genotypy(df), max_workers=1, pouzit_cache=False)
+    buffer = export_report.zostav_dokument(spoj_vysledky(vysledky.values()), len(df), list(df.columns))
+    doc = Document(buffer)
+    assert f"Počet riadkov: {len(df)}" in [odsek.text for odsek in doc.paragraphs]
+    assert len(doc.tables) > 0 and len(doc.inline_shapes) > 0
+
+
+def test_tabulka_ako_cell_text():
+    from docx import Document
+
+    texty = ["a & b", "<x>", 'q"uote', "tab\tvnútri", "riadok1\nriadok2", "cr\rlf\r\n", " okraje ", "", "kód\x01\x0b\x1f!"]
+    df = pd.DataFrame({"Stĺpec\x02": texty, "Číslo": [1.5] * len(texty)})
+
+    doc = Document()
+    export_report.add_table_from_df(doc, df, "Tabuľka")
+    # Rovnaký text zapísaný cez python-docx (bez znakov, ktoré XML nepovoľuje)
+    referencia = doc.add_table(rows=len(df), cols=1)
+    for bunka, text in zip(referencia.column_cells(0), texty):
+        bunka.text = text.replace("\x01", "").replace("\x0b", "").replace("\x1f", "")
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    tabulka, referencia = Document(buffer).tables
+
+    assert [bunka.text for bunka in tabulka.rows[0].cells] == ["Stĺpec", "Číslo"]
+    assert [riadok.cells[0].text for riadok in tabulka.rows[1:]] == [bunka.text for bunka in referencia.column_cells(0)]
+    assert [riadok.cells[0].text for riadok in tabulka.rows[1:]] == [
+        "a & b", "<x>", 'q"uote', "tab\tvnútri", "riadok1\nriadok2", "cr\nlf\n\n", " okraje ", "", "kód!"
+    ]
+    assert [riadok.cells[1].text for riadok in tabulka.rows[1:]] == ["1.5"] * len(texty)
@@ -0,0 +1,82 @@
+import io
+import threading
+import pandas as pd
+import pytest
+from prototyp import export_report
+from prototyp.fronta_reportov import nova_fronta, zadaj_report, stav_ulohy, HOTOVO, CHYBA
+
+
+@pytest.fixture
+def zostavenia(monkeypatch):
+    """Namiesto zostavenia reportu sa len zaznamená požiadavka; report sa dokončí po uvoľnení."""
+    zaznam = {"parametre": [], "uvolni": threading.Event()}
+
+    def generate_report(df=None, priebeh=None, **parametre):
+        zaznam["uvolni"].wait(10)
+        zaznam["parametre"].append(parametre)
+        if parametre.get("chyba"):
+            raise ValueError("zlyhalo")
+        for krok in export_report.KROKY_REPORTU:
+            priebeh(krok)
+        return io.BytesIO(f"report {parametre}".encode())
+
+    monkeypatch.setattr(export_report, "generate_report", generate_report)
+    return zaznam
+
+
+def _pockaj(fronta, id_ulohy):
+    """Stav úlohy po dokončení všetkého, čo je vo fronte pred ňou (fronta má jedno vlákno)."""
+    fronta["executor"].submit(lambda: None).result()
+    return stav_ulohy(fronta, id_ulohy)
+
+
+def test_rovnaka_poziadavka_sa_nespusti_znova(zostavenia):
+    fronta = nova_fronta(max_workers=1)
+    df = pd.DataFrame({"vek": [40, 50]})
+    prva = zadaj_report(fronta, df=df, hash_datasetu="a", max_workers=1)
+    # Čakajúca aj hotová požiadavka vráti tú istú úlohu
+    assert zadaj_report(fronta, df=df, hash_datasetu="a", max_workers=1) == prva
+    zostavenia["uvolni"].set()
+    stav = _pockaj(fronta, prva)
+    assert stav["stav"] == HOTOVO and stav["podiel"] == 1
+    assert zadaj_report(fronta, df=df, hash_datasetu="a", max_workers=1) == prva
+
+    # Iný dataset alebo iné parametre sú nová úloha
+    assert zadaj_report(fronta, df=df, hash_datasetu="b", max_workers=1) != prva
+    assert zadaj_report(fronta, df=df, hash_datasetu="a", max_workers=2) != prva
+    fronta["executor"].shutdown(wait=True)
+    assert len(zostavenia["parametre"]) == 3
+
+
+def test_po_chybe_sa_poziadavka_spusti_znova(zostavenia):
+    fronta = nova_fronta(max_workers=1)
+    zostavenia["uvolni"].set()
+    prva = zadaj_report(fronta, df=pd.DataFrame(), hash_datasetu="a", chyba=True)
+    stav = _pockaj(fronta, prva)
+    assert stav["stav"] == CHYBA and stav["chyba"] == "ValueError: zlyhalo"
+    assert zadaj_report(fronta, df=pd.DataFrame(), hash_datasetu="a", chyba=True) != prva
+    fronta["executor"].shutdown(wait=True)
+
+
+def test_najstarsie_hotove_ulohy_sa_zahodia(zostavenia):
+    fronta = nova_fronta(max_workers=1, max_hotovych=2)
+    zostavenia["uvolni"].set()
+    ulohy = [zadaj_report(fronta, df=pd.DataFrame(), hash_datasetu=str(i)) for i in range(4)]
+    fronta["executor"].shutdown(wait=True)
+
+    assert [stav_ulohy(fronta, u) for u in ulohy[:2]] == [None, None]
+    assert [stav_ulohy(fronta, u)["stav"] for u in ulohy[2:]] == [HOTOVO, HOTOVO]
+    # Kľúč zahodenej úlohy sa uvoľní, rovnaká požiadavka by sa zostavila znova
+    assert sorted(fronta["kluce"].values()) == sorted(ulohy[2:])
+
+
+def test_fazy_v_procesoch_cez_spawn(zostavenia):
+    # Fork z vlákna procesu s ďalšími vláknami nie je bezpečný, report dostane kontext spawn
+    fronta = nova_fronta(max_workers=1)
+    zostavenia["uvolni"].set()
+    zadaj_report(fronta, df=pd.DataFrame(), hash_datasetu="a", max_workers=2)
+    zadaj_report(fronta, df=pd.DataFrame(), hash_datasetu="b", max_workers_fazy=2)
+    fronta["executor"].shutdown(wait=True)
+
+    assert [p["mp_context"].get_start_method() for p in zostavenia["parametre"]] == ["spawn", "spawn"]
+    assert [p["max_workers_fazy"] for p in zostavenia["parametre"]] == [1, 2]
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from PIL import Image
+from analyza_HFE_genu.graficka_reprezentacia import generate_graphs, TYPY_GRAFOV, MUTACIE
+
+
+@pytest.fixture
+def data_grafov():
+    return pd.DataFrame({
+        "pohavie": ["M", "F", "F", "M", "F", "M"],
+        "vek": ["59,70", "34.2", "80.4", "17.6", "37.6", "39.8"],
+        "diagnoza MKCH-10": ["K76.0", "E83.1", "K75.9", "D68.8", "K76.0", "K30"],
+        "HFE C187G (H63D) [HFE]": ["normal", "heterozygot", "mutant", "normal", "normal", "heterozygot"],
+        "HFE A193T (S65C) [HFE]": ["normal", "normal", "normal", "heterozygot", "normal", "normal"],
+        "HFE G845A (C282Y) [HFE]": ["heterozygot", "normal", "normal", "normal", "mutant", "normal"],
+    })
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_nazvy_grafov(tmp_path, monkeypatch, data_grafov, max_workers):
+    monkeypatch.chdir(tmp_path)
+    vysledok = generate_graphs(data_grafov, max_workers=max_workers)
+    ocakavane = [f"{typ}_{mut}.png" for typ in TYPY_GRAFOV for mut in MUTACIE]
+    assert vysledok["casy"]["Graf"].tolist() == list(vysledok["grafy"]) == ocakavane
+    assert sorted(p.name for p in (tmp_path / "grafy").iterdir()) == sorted(ocakavane)
+
+
+def test_format_a_dpi(tmp_path, monkeypatch, data_grafov):
+    monkeypatch.chdir(tmp_path)
+    generate_graphs(data_grafov, dpi=50, max_workers=1)
+    # Figure má 6 x 4 palcov
+    assert Image.open(tmp_path / "grafy" / "rozdelenie_H63D.png").size == (300, 200)
+
+    generate_graphs(data_grafov, format="svg", max_workers=1)
+    svg = (tmp_path / "grafy" / "rozdelenie_H63D.svg").read_text()
+    assert svg.lstrip().startswith("<?xml") and "<svg" in svg
+
+
+def test_bez_ulozenia_len_v_pamati(tmp_path, monkeypatch, data_grafov):
+    monkeypatch.chdir(tmp_path)
+    vysledok = generate_graphs(data_grafov, dpi=50, max_workers=1, ulozit=False)
+    assert list(tmp_path.iterdir()) == []
+    assert len(vysledok["grafy"]) == len(TYPY_GRAFOV) * len(MUTACIE)
+    assert Image.open(vysledok["grafy"]["rozdelenie_H63D.png"]).size == (300, 200)
+
+
+@pytest.mark.parametrize("stlpec", ["Pohlavie", "pohlavie"])
+def test_nazov_stlpca_pohlavia(tmp_path, monkeypatch, data_grafov, stlpec):
+    monkeypatch.chdir(tmp_path)
+    vysledok = generate_graphs(data_grafov.rename(columns={"pohavie": stlpec}), max_workers=1, ulozit=False)
+    assert list(vysledok["grafy"]) == [f"{typ}_{mut}.png" for typ in TYPY_GRAFOV for mut in MUTACIE]
+
+
+def test_bez_stlpca_pohlavia(tmp_path, monkeypatch, data_grafov):
+    monkeypatch.chdir(tmp_path)
+    vysledok = generate_graphs(data_grafov.drop(columns="pohavie"), max_workers=1, ulozit=False)
+    assert not any(nazov.startswith("pohlavie_vs_genotyp") for nazov in vysledok["grafy"])
+    assert len(vysledok["grafy"]) == (len(TYPY_GRAFOV) - 1) * len(MUTACIE)
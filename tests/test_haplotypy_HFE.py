@@ -0,0 +1,68 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from analyza_HFE_genu.haplotypy_HFE import (
+    pocty_kombinacii, haplotypy_em, vazbova_nerovnovaha, frekvencie_alel, zakoduj_kombinacie,
+)
+
+MUTACIE = ["H63D", "S65C", "C282Y"]
+
+
+def _rozdelenie_genotypov(frekvencie, pocet_lokusov):
+    """Očakávané rozdelenie kombinácií genotypov pri náhodnom párovaní haplotypov (cez všetky dvojice)."""
+    haplotypy = list(itertools.product(range(2), repeat=pocet_lokusov))
+    rozdelenie = np.zeros(3 ** pocet_lokusov)
+    for (i, h1), (j, h2) in itertools.product(enumerate(haplotypy), repeat=2):
+        genotyp = [a + b for a, b in zip(h1, h2)]
+        kod = sum(g * 3 ** (pocet_lokusov - 1 - k) for k, g in enumerate(genotyp))
+        rozdelenie[kod] += frekvencie[i] * frekvencie[j]
+    return rozdelenie
+
+
+def test_pocty_kombinacii_ako_groupby():
+    rng = np.random.default_rng(5)
+    kody = rng.integers(-1, 3, size=(1000, 3))
+    zname = pd.DataFrame(kody[(kody >= 0).all(axis=1)])
+    ocakavane = zname.groupby([0, 1, 2]).size()
+    pocty = pocty_kombinacii(kody)
+    assert pocty.sum() == len(zname)
+    for (a, b, c), pocet in ocakavane.items():
+        assert pocty[a * 9 + b * 3 + c] == pocet
+    assert (zakoduj_kombinacie(kody)[~(kody >= 0).all(axis=1)] == -1).all()
+
+
+@pytest.mark.parametrize("frekvencie", [
+    [0.80, 0.02, 0.10, 0.00, 0.05, 0.00, 0.03, 0.00],
+    [0.70, 0.05, 0.05, 0.05, 0.05, 0.05, 0.03, 0.02],
+])
+def test_em_najde_frekvencie_z_ocakavanych_poctov(frekvencie):
+    # Pri presne očakávaných počtoch je maximálne vierohodný odhad práve generujúce frekvencie
+    frekvencie = np.array(frekvencie)
+    pocty = 100_000 * _rozdelenie_genotypov(frekvencie, 3)
+    odhad, iteracie = haplotypy_em(pocty, 3)
+    assert iteracie < 1000
+    assert odhad == pytest.approx(frekvencie, abs=1e-4)
+    assert odhad.sum() == pytest.approx(1)
+    assert frekvencie_alel(pocty, 3) == pytest.approx(
+        [frekvencie[[4, 5, 6, 7]].sum(), frekvencie[[2, 3, 6, 7]].sum(), frekvencie[[1, 3, 5, 7]].sum()]
+    )
+
+
+def test_vazbova_nerovnovaha_pre_dvojicu():
+    frekvencie = np.array([0.6, 0.1, 0.05, 0.25])  # haplotypy wt-wt, wt-mut, mut-wt, mut-mut
+    vysledok = vazbova_nerovnovaha(frekvencie, ["A", "B"]).iloc[0]
+    p_a, p_b = 0.3, 0.35
+    d = 0.25 - p_a * p_b
+    d_max = min(p_a * (1 - p_b), (1 - p_a) * p_b)
+    assert vysledok["D"] == pytest.approx(d, abs=1e-6)
+    assert vysledok["D'"] == pytest.approx(d / d_max, abs=1e-4)
+    assert vysledok["r²"] == pytest.approx(d ** 2 / (p_a * (1 - p_a) * p_b * (1 - p_b)), abs=1e-6)
+
+
+def test_vazbova_nerovnovaha_pri_nezavislosti():
+    p = np.array([0.1, 0.2, 0.3])
+    frekvencie = np.array([np.prod(np.where(np.array(h) == 1, p, 1 - p)) for h in itertools.product(range(2), repeat=3)])
+    vysledok = vazbova_nerovnovaha(frekvencie, MUTACIE)
+    assert len(vysledok) == 3
+    assert np.abs(vysledok["D"]).max() < 1e-6 and np.abs(vysledok["r²"]).max() < 1e-6
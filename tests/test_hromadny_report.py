@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from docx import Document
+from analyza_HFE_genu import cache_artefaktov
+from prototyp import hromadny_report
+from prototyp.hromadny_report import hromadny_report as spusti_hromadny_report, NAZOV_REPORTU, NAZOV_DATASETU
+
+HLAVICKA = [
+    "id", "", "validovany vysledok", "", "prijem vzorky ", "", "pohavie", "vek", "diagnoza MKCH-10",
+    "HFE C187G (H63D)\n[HFE]", "HFE A193T (S65C)\n[HFE]", "HFE G845A (C282Y)\n[HFE]",
+]
+
+
+def _surovy_export(cesta, seed, n=150):
+    """Malý surový export v tvare exportu laboratória (dátum a čas v samostatných stĺpcoch)."""
+    rng = np.random.default_rng(seed)
+    datumy = (pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 2000, n), unit="D")).strftime("%d.%m.%Y")
+    vek = np.char.replace(rng.uniform(1, 90, n).round(1).astype(str), ".", ",")
+    vek[:3] = ["", "abc", "150,0"]
+    genotypy = np.array(["normal", "heterozygot", "mutant"])
+    stlpce = [
+        [f"{seed:03d}{i:06d}" for i in range(n)], [""] * n, datumy, ["10:15"] * n, datumy, ["09:00"] * n,
+        rng.choice(["M", "F"], n), vek, rng.choice(["K76.0", "K75.9", "E83.1", "D68.8", "K30"], n),
+        *[genotypy[rng.choice(3, n, p=[0.8, 0.17, 0.03])] for _ in range(3)],
+    ]
+    df = pd.DataFrame(dict(enumerate(stlpce)))
+    df.columns = HLAVICKA
+    df.to_csv(cesta, sep=";", index=False, encoding="utf-8-sig")
+
+
+def test_hromadny_report_a_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "exporty").mkdir()
+    for seed in (1, 2):
+        _surovy_export(tmp_path / "exporty" / f"nemocnica_{seed}.csv", seed)
+    vstupy = hromadny_report.najdi_vstupy(["exporty"])
+    assert len(vstupy) == 2
+
+    suhrn, tabulka = spusti_hromadny_report(vstupy, "reporty", max_workers=1)
+    assert suhrn["uspesne"] == 2, tabulka["Chyba"].tolist()
+    assert tabulka["Riadky"].tolist() == [150, 150]
+    assert tabulka["Očistené riadky"].tolist() == [147, 147]
+    for nazov in ("nemocnica_1", "nemocnica_2"):
+        adresar = tmp_path / "reporty" / nazov
+        assert (adresar / NAZOV_DATASETU).exists()
+        doc = Document(adresar / NAZOV_REPORTU)
+        assert "Počet riadkov: 147" in [odsek.text for odsek in doc.paragraphs]
+    assert (tmp_path / "reporty" / "suhrn.csv").exists() and (tmp_path / "reporty" / "suhrn.json").exists()
+
+    # Cache fáz je v priečinku relatívnom k pracovnému adresáru; druhý beh z nej berie všetky fázy
+    assert any((tmp_path / cache_artefaktov.ADRESAR_CACHE).iterdir())
+    zasahy = []
+    obnov = cache_artefaktov.obnov
+
+    def obnov_a_zaznamenaj(kluc, *args, **kwargs):
+        vysledok = obnov(kluc, *args, **kwargs)
+        zasahy.append(vysledok is not None)
+        return vysledok
+
+    monkeypatch.setattr(cache_artefaktov, "obnov", obnov_a_zaznamenaj)
+    suhrn, _ = spusti_hromadny_report(vstupy, "reporty", max_workers=1)
+    assert suhrn["uspesne"] == 2
+    assert len(zasahy) > 0 and all(zasahy)
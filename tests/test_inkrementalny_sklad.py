@@ -0,0 +1,84 @@
+import io
+import os
+import sqlite3
+import pandas as pd
+import pytest
+from analyza_HFE_genu import inkrementalny_sklad
+from analyza_HFE_genu.inkrementalny_sklad import pridaj_davku, nacitaj_statistiky, DATASET, INDEX_ID
+
+HLAVICKA = ('id;;validovany vysledok;;prijem vzorky ;;pohavie;vek;diagnoza MKCH-10;'
+            '"HFE C187G (H63D)\n[HFE]";"HFE A193T (S65C)\n[HFE]";"HFE G845A (C282Y)\n[HFE]";;;')
+
+
+def _surova_davka(ids, extra_stlpec=False):
+    """Malá dávka v tvare surového exportu laboratória."""
+    hlavicka = HLAVICKA + (";poznamka" if extra_stlpec else "")
+    riadky = [
+        f"{i};;07.01.2010;14:36;04.01.2010;;F;59,7;K76.0;normal;heterozygot;normal;;;" + (";x" if extra_stlpec else "")
+        for i in ids
+    ]
+    return pd.read_csv(io.StringIO("\n".join([hlavicka] + riadky)), sep=";", dtype=str)
+
+
+def _pocet_v_indexe(adresar):
+    con = sqlite3.connect(os.path.join(adresar, INDEX_ID))
+    try:
+        return con.execute("SELECT COUNT(*) FROM pacienti").fetchone()[0]
+    finally:
+        con.close()
+
+
+def _pocet_riadkov(adresar):
+    return len(pd.read_csv(os.path.join(adresar, DATASET), sep=";", dtype=str))
+
+
+def test_pridaj_davku_preskoci_duplicity(tmp_path):
+    adresar = str(tmp_path)
+    assert pridaj_davku(_surova_davka(["1", "2", "3"]), adresar) == {"nove": 3, "duplicitne": 0}
+    assert pridaj_davku(_surova_davka(["3", "4"]), adresar) == {"nove": 1, "duplicitne": 1}
+    assert nacitaj_statistiky(adresar)["pocet_pacientov"] == 4
+    assert _pocet_riadkov(adresar) == 4
+    assert _pocet_v_indexe(adresar) == 4
+
+
+def test_prerusene_pridavanie_sa_vrati(tmp_path, monkeypatch):
+    adresar = str(tmp_path)
+    pridaj_davku(_surova_davka(["1", "2"]), adresar)
+
+    # Pád po pripojení riadkov, pred zápisom štatistík
+    def pad(*args):
+        raise OSError("disk plný")
+    monkeypatch.setattr(inkrementalny_sklad, "_uloz_statistiky", pad)
+    with pytest.raises(OSError):
+        pridaj_davku(_surova_davka(["3", "4"]), adresar)
+    monkeypatch.undo()
+    assert _pocet_riadkov(adresar) == 4
+
+    # Nepotvrdené riadky sa odrežú a dávka sa dá pridať znovu
+    assert pridaj_davku(_surova_davka(["3", "4"]), adresar) == {"nove": 2, "duplicitne": 0}
+    assert _pocet_riadkov(adresar) == 4
+    assert nacitaj_statistiky(adresar)["pocet_pacientov"] == 4
+
+
+def test_index_sa_zostavi_z_datasetu(tmp_path):
+    adresar = str(tmp_path)
+    pridaj_davku(_surova_davka(["1", "2", "3"]), adresar)
+
+    # Pád po zápise štatistík, pred potvrdením indexu
+    con = sqlite3.connect(os.path.join(adresar, INDEX_ID))
+    con.execute("DELETE FROM pacienti WHERE id = '3'")
+    con.commit()
+    con.close()
+
+    assert pridaj_davku(_surova_davka(["3"]), adresar) == {"nove": 0, "duplicitne": 1}
+    assert _pocet_v_indexe(adresar) == 3
+    assert _pocet_riadkov(adresar) == 3
+
+
+def test_ine_stlpce_davky(tmp_path):
+    adresar = str(tmp_path)
+    pridaj_davku(_surova_davka(["1"]), adresar)
+    velkost = os.path.getsize(os.path.join(adresar, DATASET))
+    with pytest.raises(ValueError):
+        pridaj_davku(_surova_davka(["2"], extra_stlpec=True), adresar)
+    assert os.path.getsize(os.path.join(adresar, DATASET)) == velkost
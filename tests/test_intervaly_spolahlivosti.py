@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from scipy.stats import binomtest
+from analyza_HFE_genu.intervaly_spolahlivosti import (
+    wilson, clopper_pearson, bootstrap_poctov, interval_podielu, intervaly_genotypov,
+)
+
+PRIPADY = [(0, 10), (1, 10), (5, 10), (10, 10), (3, 250), (120, 250), (7, 3000)]
+
+
+@pytest.mark.parametrize("metoda,funkcia", [("wilson", wilson), ("exact", clopper_pearson)])
+@pytest.mark.parametrize("alfa", [0.05, 0.01])
+def test_interval_ako_scipy(metoda, funkcia, alfa):
+    k, n = np.array(PRIPADY).T
+    dolna, horna = funkcia(k, n, alfa)
+    for i, (ki, ni) in enumerate(PRIPADY):
+        ocakavany = binomtest(ki, ni).proportion_ci(confidence_level=1 - alfa, method=metoda)
+        assert dolna[i] == pytest.approx(ocakavany.low, abs=1e-10)
+        assert horna[i] == pytest.approx(ocakavany.high, abs=1e-10)
+
+
+def test_prazdna_vzorka():
+    assert np.isnan(wilson(0, 0)).all()
+    assert np.isnan(clopper_pearson(0, 0)).all()
+
+
+def test_bootstrap_zachova_pocty_riadkov():
+    pocty = np.array([[50, 30, 20], [0, 0, 0], [9, 1, 0]])
+    replikacie = bootstrap_poctov(pocty, pocet=200, seed=1)
+    assert replikacie.shape == (200, 3, 3)
+    assert (replikacie.sum(axis=-1) == pocty.sum(axis=-1)).all()
+    assert (replikacie[:, 2, 2] == 0).all()
+
+
+def test_bootstrap_blizko_wilsona_pri_velkej_vzorke():
+    dolna, horna = interval_podielu(300, 1000, metoda="bootstrap", pocet_bootstrap=20_000, seed=2)
+    w_dolna, w_horna = wilson(300, 1000)
+    assert dolna == pytest.approx(w_dolna, abs=0.005)
+    assert horna == pytest.approx(w_horna, abs=0.005)
+
+
+def test_intervaly_genotypov_a_alely():
+    pocty = np.array([[700, 250, 50], [980, 20, 0]])
+    intervaly = intervaly_genotypov(pocty, metoda="clopper-pearson")
+    for i, riadok in enumerate(pocty):
+        for g in range(3):
+            ocakavany = binomtest(riadok[g], riadok.sum()).proportion_ci(method="exact")
+            assert intervaly["genotypy"][0][i, g] == pytest.approx(ocakavany.low)
+            assert intervaly["genotypy"][1][i, g] == pytest.approx(ocakavany.high)
+        alela = binomtest(2 * riadok[2] + riadok[1], 2 * riadok.sum()).proportion_ci(method="exact")
+        assert intervaly["alela"][0][i] == pytest.approx(alela.low)
+        assert intervaly["alela"][1][i] == pytest.approx(alela.high)
+
+    with pytest.raises(ValueError):
+        interval_podielu(1, 2, metoda="neznama")
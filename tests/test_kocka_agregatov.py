@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analyza_HFE_genu import kocka_agregatov
+from analyza_HFE_genu.kocka_agregatov import postav_kocku, kocka_pre_riadky, vyrez, tabulka, marginal, NEZNAME
+
+GENOTYPY = {"normal": "wt/wt", "heterozygot": "wt/mut", "mutant": "mut/mut"}
+SKUPINY = {"K": "Gastro a pečeň", "E": "Metabolické", "D": "Hematológia", "B": "Infekcie", "C": "Novotvary",
+           "Z": "Iné zdravotné faktory"}
+
+
+def _popisky_po_riadkoch(df):
+    """Dimenzie kocky pre každého pacienta vypočítané priamo v pandas."""
+    def skupina(kod):
+        return SKUPINY.get(kod[0], "Ostatné/Neznáme") if isinstance(kod, str) else "Ostatné/Neznáme"
+
+    skupina_veku = np.minimum(df["vek"] // 10, 11)
+    return pd.DataFrame({
+        "H63D": df["HFE C187G (H63D) [HFE]"].map(GENOTYPY).fillna(NEZNAME),
+        "C282Y": df["HFE G845A (C282Y) [HFE]"].map(GENOTYPY).fillna(NEZNAME),
+        "pohlavie": df["pohavie"].astype(object).fillna(NEZNAME),
+        "vekova_skupina": skupina_veku.map(lambda s: kocka_agregatov.VEKOVE_SKUPINY[int(s)], na_action="ignore").fillna(NEZNAME),
+        "skupina_diag": df["diagnoza MKCH-10"].map(skupina),
+        "pecen_diag": df["diagnoza MKCH-10"].isin(["K76.0", "K75.9"]),
+        "rok": df["prijem_vzorky"].dt.year.astype("Int64").astype(object).fillna(NEZNAME),
+    })
+
+
+@pytest.mark.parametrize("riadky,stlpce", [
+    ("H63D", None), ("vekova_skupina", None), ("rok", None),
+    ("C282Y", "pecen_diag"), ("skupina_diag", "pohlavie"), ("rok", "H63D"),
+])
+def test_marginaly_ako_groupby(maly_dataset, riadky, stlpce):
+    kocka = postav_kocku(maly_dataset)
+    popisky = _popisky_po_riadkoch(maly_dataset)
+    vysledok = tabulka(kocka, riadky, stlpce, bez_neznamych=False)
+
+    if stlpce is None:
+        ocakavane = popisky.groupby(riadky).size()
+        assert vysledok[vysledok > 0].to_dict() == ocakavane.to_dict()
+    else:
+        ocakavane = popisky.groupby([riadky, stlpce]).size()
+        dlhy = vysledok.stack()
+        assert dlhy[dlhy > 0].to_dict() == ocakavane.to_dict()
+
+
+def test_kocka_pre_riadky_ako_kocka_podmnoziny(maly_dataset):
+    kocka = postav_kocku(maly_dataset)
+    maska = (maly_dataset["vek"] > 50).to_numpy()
+    podmnozina = kocka_pre_riadky(kocka, maska)
+    assert podmnozina["pocty"].sum() == maska.sum()
+    popisky = _popisky_po_riadkoch(maly_dataset[maska])
+    assert tabulka(podmnozina, "C282Y", bez_neznamych=False).loc[["wt/wt", "wt/mut", "mut/mut"]].tolist() == \
+        popisky.groupby("C282Y").size().reindex(["wt/wt", "wt/mut", "mut/mut"], fill_value=0).tolist()
+
+
+def test_vyrez_a_marginal(maly_dataset):
+    kocka = postav_kocku(maly_dataset)
+    popisky = _popisky_po_riadkoch(maly_dataset)
+    rez = vyrez(kocka, pohlavie=["Ž"], pecen_diag=[True])
+    ocakavane = popisky[(popisky["pohlavie"] == "Ž") & popisky["pecen_diag"]].groupby("H63D").size()
+    assert tabulka(rez, "H63D").to_dict() == ocakavane.drop(NEZNAME, errors="ignore").to_dict()
+    # Poradie osí výsledku podľa požiadavky
+    assert (marginal(kocka, ["pecen_diag", "H63D"]) == marginal(kocka, ["H63D", "pecen_diag"]).T).all()
+
+
+def test_vek_s_desatinnou_ciarkou():
+    df = pd.DataFrame({
+        "pohavie": ["M", "F", "F", "M"],
+        "vek": ["45,5", "59,70", "60.0", "abc"],
+        "diagnoza MKCH-10": ["K76.0", "E83.1", "K30", None],
+        "HFE C187G (H63D) [HFE]": ["normal", "heterozygot", "normal", "mutant"],
+    }, dtype=str)
+    vekove_skupiny = tabulka(postav_kocku(df), "vekova_skupina", bez_neznamych=False)
+    assert vekove_skupiny[vekove_skupiny > 0].to_dict() == {"40-49": 1, "50-59": 1, "60-69": 1, NEZNAME: 1}
+
+
+def test_kocka_zo_surovych_retazcov(maly_dataset, tmp_path):
+    # Dataset načítaný len ako reťazce (bez typuj_dataset), vek s desatinnou čiarkou
+    cesta = tmp_path / "dataset.csv"
+    maly_dataset.to_csv(cesta, sep=";", index=False, decimal=",")
+    surovy = pd.read_csv(cesta, sep=";", dtype=str)
+    assert surovy["vek"].str.contains(",").any()
+
+    kocka, ocakavana = postav_kocku(surovy), postav_kocku(maly_dataset)
+    assert kocka["popisky"] == ocakavana["popisky"]
+    assert (kocka["pocty"] == ocakavana["pocty"]).all()
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from analyza_HFE_genu.kodovanie_genotypov import (
+    zakoduj_stlpec, zakoduj_genotypy, bitova_maska, pocty_genotypov, matica_poctov, dekoduj,
+    genotypy, genotyp_map, NEZNAMY, BITOV_NA_LOKUS, LOKUSY,
+)
+
+
+def _kod_po_bunkach(hodnota):
+    if not isinstance(hodnota, str):
+        return NEZNAMY
+    return genotyp_map.get(hodnota.strip().lower(), NEZNAMY)
+
+
+def test_zakoduj_stlpec_ako_po_bunkach():
+    hodnoty = ["normal", " Heterozygot", "MUTANT ", "homozygot", "mutácia", "patogénna", "?", None, "", "normal"]
+    kody = zakoduj_stlpec(pd.Series(hodnoty, dtype=object))
+    assert kody.dtype == np.int8
+    assert kody.tolist() == [_kod_po_bunkach(h) for h in hodnoty]
+
+
+def test_bitova_maska_ako_po_pacientoch():
+    rng = np.random.default_rng(0)
+    kody = rng.integers(-1, 3, size=(500, len(LOKUSY))).astype(np.int8)
+    ocakavana = [
+        sum(1 << (BITOV_NA_LOKUS * i + int(k)) for i, k in enumerate(riadok) if k >= 0)
+        for riadok in kody
+    ]
+    assert bitova_maska(kody).tolist() == ocakavana
+
+
+def test_zakoduj_genotypy_s_chybajucim_stlpcom():
+    df = pd.DataFrame({
+        "HFE C187G (H63D) [HFE]": ["normal", "heterozygot", "mutant"],
+        "HFE G845A (C282Y) [HFE]": ["heterozygot", None, "normal"],
+    })
+    kody = zakoduj_genotypy(df)
+    assert list(kody.columns) == ["H63D", "C282Y", "maska"]
+    # S65C chýba, jeho bity v maske ostanú prázdne (poloha lokusu je pevná)
+    c282y = LOKUSY.index("C282Y")
+    assert kody["maska"].tolist() == [
+        (1 << 0) | (1 << (BITOV_NA_LOKUS * c282y + 1)),
+        1 << 1,
+        (1 << 2) | (1 << (BITOV_NA_LOKUS * c282y)),
+    ]
+
+
+def test_pocty_a_matica_poctov_ako_pandas():
+    rng = np.random.default_rng(1)
+    kody = rng.integers(-1, 3, size=(300, 3)).astype(np.int8)
+    ocakavane = np.array([
+        pd.Series(kody[:, i]).value_counts().reindex(range(len(genotypy)), fill_value=0).to_numpy()
+        for i in range(kody.shape[1])
+    ])
+    assert (matica_poctov(kody) == ocakavane).all()
+    assert (pocty_genotypov(kody[:, 0]) == ocakavane[0]).all()
+
+
+def test_dekoduj():
+    dekodovane = dekoduj(np.array([0, 2, -1, 1], dtype=np.int8))
+    assert list(dekodovane.astype(object)[[0, 1, 3]]) == ["wt/wt", "mut/mut", "wt/mut"]
+    assert pd.isna(dekodovane[2])
@@ -0,0 +1,40 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from analyza_HFE_genu.kodovanie_genotypov import bitova_maska, genotypy, LOKUSY, zakoduj_genotypy
+from analyza_HFE_genu.pravidla_genotypov import (
+    PREDVOLENE_PRAVIDLA, skompiluj_pravidla, vyhodnot_pravidla, pocty_pravidiel,
+)
+
+
+def _plati(pravidlo, genotyp):
+    """Pravidlo v DNF vyhodnotené priamo nad slovníkom mutácia -> genotyp (None = neznámy)."""
+    return any(all(genotyp[mut] in povolene for mut, povolene in konjunkcia.items()) for konjunkcia in pravidlo)
+
+
+def test_pravdivostna_tabulka_pre_vsetky_genotypy():
+    tabulka = skompiluj_pravidla()
+    for kody in itertools.product(range(-1, len(genotypy)), repeat=len(LOKUSY)):
+        maska = bitova_maska(np.array([kody], dtype=np.int8))[0]
+        genotyp = {mut: genotypy[k] if k >= 0 else None for mut, k in zip(LOKUSY, kody)}
+        ocakavane = [_plati(pravidlo, genotyp) for pravidlo in PREDVOLENE_PRAVIDLA.values()]
+        assert tabulka[maska].tolist() == ocakavane
+
+
+def test_vyhodnot_a_pocty_pravidiel(maly_dataset):
+    kody = zakoduj_genotypy(maly_dataset)
+    prislusnost = vyhodnot_pravidla(kody["maska"])
+    assert prislusnost.index.equals(kody.index)
+
+    # Rovnaké pravidlá priamo nad kódmi v pandas
+    predispozicia = (kody["C282Y"] == 2) | ((kody["C282Y"] == 1) & (kody["H63D"] == 1))
+    assert (prislusnost["Predispozícia HH"] == predispozicia).all()
+    assert (pocty_pravidiel(kody["maska"]) == prislusnost.sum()).all()
+
+
+def test_neplatne_pravidlo():
+    with pytest.raises(ValueError):
+        skompiluj_pravidla({"x": [{"E999X": ["wt/mut"]}]})
+    with pytest.raises(ValueError):
+        skompiluj_pravidla({"x": [{"C282Y": ["het"]}]})
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from analyza_HFE_genu.priprava_datasetu import parsuj_datum, normalizuj_datumy, rok_vysetrenia, parsuj_vek
+
+
+def test_parsuj_vek():
+    vek, platne, odmietnute = parsuj_vek(pd.Series(["59,70", "59.7", " 40 ", "-1", "abc", None, "121"]))
+    assert platne.tolist() == [True, True, True, False, False, False, False]
+    assert vek[:3].tolist() == [np.float32(59.7), np.float32(59.7), 40.0]
+    assert odmietnute["dovod"].tolist() == ["mimo rozsahu", "nečíselný", "nečíselný", "mimo rozsahu"]
+
+
+def test_parsuj_vek_ciselny_stlpec():
+    vek, platne, _ = parsuj_vek(pd.Series([12.5, np.nan, 130.0]))
+    assert platne.tolist() == [True, False, False]
+    assert vek.dtype == np.float32
+
+
+def test_parsuj_datum_ako_po_bunkach():
+    hodnoty = pd.Series([
+        " 07.01.2010", "14:36 04.01.2010", "13.01.2010 08:05", "2011-02-03 10:11:12", "2012-12-31",
+        "5/6/2013", "nezmysel", "", None, "14:36 04.01.2010",
+    ], dtype=object)
+    datumy, chybajuce, neparsovatelne = parsuj_datum(hodnoty)
+
+    ocakavane = [
+        pd.Timestamp(d) if d else pd.NaT for d in [
+            "2010-01-07", "2010-01-04 14:36", "2010-01-13 08:05", "2011-02-03 10:11:12", "2012-12-31",
+            "2013-06-05", None, None, None, "2010-01-04 14:36",
+        ]
+    ]
+    assert [d if pd.notna(d) else pd.NaT for d in datumy] == ocakavane
+    assert (chybajuce, neparsovatelne) == (2, 1)
+
+
+def test_parsuj_datum_zachova_index():
+    hodnoty = pd.Series(["07.01.2010", "08.01.2010"], index=[10, 5], name="prijem_vzorky")
+    datumy = parsuj_datum(hodnoty)[0]
+    assert datumy.index.tolist() == [10, 5] and datumy.name == "prijem_vzorky"
+
+
+def test_normalizuj_datumy_a_rok():
+    df = pd.DataFrame({"prijem_vzorky": ["14:36 04.01.2010", "x"], "validovany_vysledok": [" 07.01.2011", None]})
+    hlasenie = {}
+    df = normalizuj_datumy(df, hlasenie)
+    assert pd.api.types.is_datetime64_any_dtype(df["prijem_vzorky"])
+    assert hlasenie["datumy"].loc["prijem_vzorky"].tolist() == [0, 1]
+    assert hlasenie["datumy"].loc["validovany_vysledok"].tolist() == [1, 0]
+    assert rok_vysetrenia(df).tolist()[0] == 2010 and np.isnan(rok_vysetrenia(df).tolist()[1])
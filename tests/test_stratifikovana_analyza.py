@@ -0,0 +1,80 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2
+from analyza_HFE_genu.kocka_agregatov import postav_kocku, VEKOVE_SKUPINY
+from analyza_HFE_genu.kodovanie_genotypov import zakoduj_genotypy
+from analyza_HFE_genu.stratifikovana_analyza import cochran_mantel_haenszel, tabulky_strat, stratifikovana_analyza
+
+
+def _cmh_v_cykle(strata):
+    """CMH a Mantel-Haenszelov OR s RBG rozptylom podľa učebnicových vzorcov, strátum po strátu."""
+    sucet_a = sucet_e = sucet_v = 0.0
+    sucet_r = sucet_s = sucet_pr = sucet_ps_qr = sucet_qs = 0.0
+    for a, b, c, d in strata:
+        n = a + b + c + d
+        if n <= 1:
+            continue
+        sucet_a += a
+        sucet_e += (a + b) * (a + c) / n
+        sucet_v += (a + b) * (c + d) * (a + c) * (b + d) / (n * n * (n - 1))
+        r, s = a * d / n, b * c / n
+        p, q = (a + d) / n, (b + c) / n
+        sucet_r += r
+        sucet_s += s
+        sucet_pr += p * r
+        sucet_ps_qr += p * s + q * r
+        sucet_qs += q * s
+    statistika = (abs(sucet_a - sucet_e) - 0.5) ** 2 / sucet_v
+    odds = sucet_r / sucet_s
+    se = math.sqrt(sucet_pr / (2 * sucet_r ** 2) + sucet_ps_qr / (2 * sucet_r * sucet_s) + sucet_qs / (2 * sucet_s ** 2))
+    return statistika, chi2.sf(statistika, 1), odds, odds * math.exp(-1.959964 * se), odds * math.exp(1.959964 * se)
+
+
+def test_cmh_ako_vzorce_v_cykle():
+    rng = np.random.default_rng(6)
+    tabulky = rng.integers(0, 40, size=(12, 3, 2))
+    tabulky[3] = 0  # prázdne strátum sa vynechá
+    tabulky[5] = [[1, 0], [0, 0], [0, 0]]
+    strata = [
+        (t[1:, 1].sum(), t[1:, 0].sum(), t[0, 1], t[0, 0]) for t in tabulky.astype(float)
+    ]
+    vysledok = cochran_mantel_haenszel(tabulky)
+    statistika, p, odds, dolna, horna = _cmh_v_cykle(strata)
+    assert vysledok["Počet strát"] == 10
+    assert vysledok["CMH chi²"] == pytest.approx(statistika)
+    assert vysledok["p-hodnota"] == pytest.approx(p)
+    assert vysledok["MH OR"] == pytest.approx(odds)
+    assert vysledok["OR 2.5 %"] == pytest.approx(dolna, rel=1e-6)
+    assert vysledok["OR 97.5 %"] == pytest.approx(horna, rel=1e-6)
+
+
+def test_tabulky_strat_ako_groupby(maly_dataset):
+    kocka = postav_kocku(maly_dataset)
+    tabulky, index = tabulky_strat(kocka, ["pohlavie", "vekova_skupina"], "H63D")
+    assert list(index.names) == ["Pohlavie", "Veková skupina"]
+
+    kody = zakoduj_genotypy(maly_dataset)
+    df = pd.DataFrame({
+        "pohlavie": maly_dataset["pohavie"].astype(object),
+        "vek": np.minimum(maly_dataset["vek"] // 10, len(VEKOVE_SKUPINY) - 1),
+        "genotyp": kody["H63D"],
+        "pecen": maly_dataset["diagnoza MKCH-10"].isin(["K76.0", "K75.9"]).astype(int),
+    }).dropna()
+    df = df[df["genotyp"] >= 0]
+    ocakavane = df.groupby(["pohlavie", "vek", "genotyp", "pecen"]).size()
+    for i, (pohlavie, skupina) in enumerate(index):
+        for (g, pecen), pocet in np.ndenumerate(tabulky[i]):
+            assert pocet == ocakavane.get((pohlavie, VEKOVE_SKUPINY.index(skupina), g, pecen), 0)
+
+
+def test_stratifikovana_analyza_sucty(maly_dataset):
+    kocka = postav_kocku(maly_dataset)
+    vysledok = stratifikovana_analyza(kocka, ["pohlavie"])
+    assert list(vysledok["cmh"]["Mutácia"]) == ["H63D", "S65C", "C282Y"]
+    strata = vysledok["strata"]
+    for mut in ["H63D", "S65C", "C282Y"]:
+        zname = zakoduj_genotypy(maly_dataset)[mut] >= 0
+        zname &= maly_dataset["pohavie"].notna()
+        assert strata.loc[strata["Mutácia"] == mut, "n"].sum() == zname.sum()
@@ -0,0 +1,115 @@
+import itertools
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, hypergeom
+from analyza_HFE_genu import suvislost_HFE_mut
+from analyza_HFE_genu.suvislost_HFE_mut import freeman_halton, permutacny_test, otestuj
+
+
+def _tabulky_s_okrajmi(riadky, stlpce):
+    """Všetky tabuľky s danými okrajmi (hrubou silou, len pre malé tabuľky)."""
+    def riadky_od(i, zvysok):
+        if i == len(riadky) - 1:
+            yield [tuple(zvysok)]
+            return
+        for riadok in itertools.product(*(range(min(riadky[i], z) + 1) for z in zvysok)):
+            if sum(riadok) == riadky[i]:
+                for dalsie in riadky_od(i + 1, [z - x for z, x in zip(zvysok, riadok)]):
+                    yield [riadok] + dalsie
+    for tabulka in riadky_od(0, list(stlpce)):
+        yield np.array(tabulka)
+
+
+def _pravdepodobnost(tabulka):
+    riadky, stlpce, n = tabulka.sum(axis=1), tabulka.sum(axis=0), tabulka.sum()
+    log_p = (sum(math.lgamma(x + 1) for x in riadky) + sum(math.lgamma(x + 1) for x in stlpce)
+             - math.lgamma(n + 1) - sum(math.lgamma(x + 1) for x in tabulka.ravel()))
+    return math.exp(log_p)
+
+
+def _chi2(tabulka):
+    ocakavane = np.outer(tabulka.sum(axis=1), tabulka.sum(axis=0)) / tabulka.sum()
+    return ((tabulka - ocakavane) ** 2 / ocakavane).sum()
+
+
+@pytest.mark.parametrize("pocty", [
+    [[3, 0], [1, 4], [0, 2]],
+    [[5, 1], [2, 2], [0, 3], [1, 0]],
+    [[10, 0], [7, 2], [1, 1]],
+])
+def test_freeman_halton_ako_enumeracia(pocty):
+    pocty = np.array(pocty)
+    p_pozorovanej = _pravdepodobnost(pocty)
+    ocakavane = sum(
+        _pravdepodobnost(t) for t in _tabulky_s_okrajmi(pocty.sum(axis=1), pocty.sum(axis=0))
+        if _pravdepodobnost(t) <= p_pozorovanej * (1 + 1e-7)
+    )
+    assert freeman_halton(pocty) == pytest.approx(ocakavane, rel=1e-9)
+
+
+def test_freeman_halton_2x2_ako_hypergeometricke():
+    pocty = np.array([[4, 1], [1, 6]])
+    rozdelenie = hypergeom(pocty.sum(), pocty[:, 0].sum(), pocty[0].sum())
+    x = np.arange(0, pocty[0].sum() + 1)
+    p = rozdelenie.pmf(x)
+    ocakavane = p[p <= rozdelenie.pmf(pocty[0, 0]) * (1 + 1e-7)].sum()
+    assert freeman_halton(pocty) == pytest.approx(ocakavane)
+
+
+def test_freeman_halton_nad_limit():
+    assert freeman_halton(np.array([[50, 1], [50, 2], [60, 0]]), max_tabuliek=100) is None
+
+
+@pytest.mark.parametrize("pocty", [[[3, 0, 1], [1, 2, 0], [0, 2, 3]], [[4, 1], [0, 3], [2, 2]]])
+def test_permutacny_test_ako_exaktne_rozdelenie_chi2(pocty):
+    pocty = np.array(pocty)
+    statistika = _chi2(pocty)
+    exaktne = sum(
+        _pravdepodobnost(t) for t in _tabulky_s_okrajmi(pocty.sum(axis=1), pocty.sum(axis=0))
+        if _chi2(t) >= statistika - 1e-9
+    )
+    assert permutacny_test(pocty, pocet_permutacii=40_000, seed=1) == pytest.approx(exaktne, abs=0.015)
+
+
+def test_otestuj_vyber_testu():
+    assert otestuj(np.array([[200, 150], [180, 170]]))[0] == "Chi²"
+    assert otestuj(np.array([[3, 1], [1, 4]]))[0] == "Fisher"
+    assert otestuj(np.array([[3, 0], [1, 4], [0, 2]]))[0] == "Freeman-Halton"
+    assert otestuj(np.array([[3, 0, 1], [1, 2, 0], [0, 2, 3]]))[0] == "Permutačný"
+    assert otestuj(np.array([[3, 0], [0, 0]]))[0] is None
+
+
+def test_chi2_statistika_ako_scipy():
+    pocty = np.array([[200, 150], [180, 170], [20, 30]])
+    assert otestuj(pocty)[1] == pytest.approx(chi2_contingency(pocty)[0])
+
+
+def test_testuj_tabulky_s_permutacnym_testom():
+    # r x 2 s riedkym riadkom: exaktný test by enumeroval 3 * 1501 * 1501 tabuliek (nad limit),
+    # preto sa použije permutačný test so seedom od testuj_tabulky (SeedSequence pre tabuľku)
+    velka = np.array([[1, 1], [750, 750], [760, 740], [740, 760]])
+    assert freeman_halton(velka) is None
+    tabulky = [velka, np.array([[3, 0, 1], [1, 2, 0], [0, 2, 3]])]
+
+    vysledky = suvislost_HFE_mut.testuj_tabulky(tabulky, pocet_permutacii=2_000, seed=7, max_workers=1)
+    assert [test for test, _, _ in vysledky] == ["Permutačný", "Permutačný"]
+    for _, _, p in vysledky:
+        assert 0 < p <= 1
+
+    # Rovnaký seed dá rovnaké p-hodnoty aj pri behu v procesoch
+    assert suvislost_HFE_mut.testuj_tabulky(tabulky, pocet_permutacii=2_000, seed=7, max_workers=2) == vysledky
+
+
+def test_vsetky_diagnozy_len_na_poziadanie(maly_dataset):
+    zakladny = suvislost_HFE_mut.generate_suvislosti_diag(maly_dataset.copy(), ulozit=False)
+    assert "suvislost_vsetky_diagnozy.csv" not in zakladny["tabulky"]
+
+    vysledok = suvislost_HFE_mut.generate_suvislosti_diag(
+        maly_dataset.copy(), ulozit=False, vsetky_diagnozy=True, max_workers=1
+    )
+    vsetky = vysledok["tabulky"]["suvislost_vsetky_diagnozy.csv"]
+    assert set(vsetky["Mutácia"]) == {"H63D", "S65C", "C282Y"}
+    assert len(vsetky) == 3 * maly_dataset["diagnoza MKCH-10"].nunique()
+    pd.testing.assert_frame_equal(vysledok["tabulky"]["vysledky_suvislosti.csv"], zakladny["tabulky"]["vysledky_suvislosti.csv"])
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+from analyza_HFE_genu.ulozisko_datasetu import zapisovac_datasetu, nacitaj_dataset
+
+pytest.importorskip("pyarrow")
+
+
+def _cast(ids, poznamky):
+    return pd.DataFrame({
+        "id": ids,
+        "vek": ["40"] * len(ids),
+        "diagnoza MKCH-10": ["K76.0"] * len(ids),
+        "poznamka": pd.Series(poznamky, dtype=object),
+    })
+
+
+@pytest.mark.parametrize("pripona", [".parquet", ".feather"])
+def test_prazdny_stlpec_v_prvej_casti(tmp_path, pripona):
+    cesta = str(tmp_path / f"dataset{pripona}")
+    with zapisovac_datasetu(cesta) as zapis:
+        zapis(_cast(["1", "2"], [None, None]))
+        zapis(_cast(["3"], ["text"]))
+
+    df = nacitaj_dataset(cesta)
+    assert df["id"].tolist() == ["1", "2", "3"]
+    assert df["poznamka"].isna().tolist() == [True, True, False]
+    assert df["poznamka"].iloc[2] == "text"